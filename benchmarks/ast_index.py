@@ -0,0 +1,122 @@
+""" Benchmarks the lookup of mutation locations in solc asts
+
+The queries that the solidity mutator makes for every source file (binary operations three times, assignments, void
+calls and modifier invocations) are answered with the single pass AstIndex, and with the jsonpath queries that were
+used before it if jsonpath_rw is installed. Both have to find the same locations.
+
+The asts are read from a hardhat build info file (e.g. of an OpenZeppelin sized project), or generated.
+
+Usage:
+    python benchmarks/ast_index.py --build-info artifacts/build-info/<id>.json --output ast_results.json
+    python benchmarks/ast_index.py --contracts 200 --functions 40
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).absolute().parent.parent))
+
+from stubs import generate_contract  # noqa: E402
+from eth_vertigo.interfaces.hardhat.mutator import HardhatSourceFile, _get_binaryop_info, _get_op_info, \
+    _get_src  # noqa: E402
+
+try:
+    from jsonpath_rw import parse
+except ImportError:
+    parse = None
+
+
+def index_queries(ast: Dict) -> List:
+    source = HardhatSourceFile(ast, Path(ast.get("absolutePath", "")))
+    locations = []
+    for _ in range(3):
+        locations.append(list(source.get_binary_op_locations()))
+    locations.append(list(source.get_assignments()))
+    locations.append(list(source.get_void_calls()))
+    locations.append(list(source.get_modifier_invocations()))
+    return locations
+
+
+def jsonpath_queries(ast: Dict) -> List:
+    """ The queries as they were made before the AstIndex, every query parses the expression and walks the ast """
+    def find(node_type: str):
+        path_expr = parse('*..nodeType.`parent`')
+        for match in path_expr.find(ast):
+            if match.value["nodeType"] == node_type:
+                yield match.value
+
+    def void_calls():
+        for node in find("FunctionCall"):
+            identifier = node["expression"]
+            typedef = identifier["typeDescriptions"]["typeString"]
+            if "returns" in typedef or "function" not in typedef:
+                continue
+            if identifier["typeDescriptions"]["typeIdentifier"].startswith("t_function_event"):
+                continue
+            if "require" in identifier.get("name", "require"):
+                continue
+            yield None, _get_src(node["src"])
+
+    locations = []
+    for _ in range(3):
+        locations.append([_get_binaryop_info(node) for node in find("BinaryOperation")])
+    locations.append([_get_op_info(node) for node in find("Assignment")])
+    locations.append(list(void_calls()))
+    locations.append([(None, _get_src(node["src"])) for node in find("ModifierInvocation")])
+    return locations
+
+
+def load_asts(args) -> List[Dict]:
+    if args.build_info:
+        build_info = json.loads(Path(args.build_info).read_text("utf-8"))
+        return [unit["ast"] for unit in build_info["output"]["sources"].values() if "ast" in unit]
+    return [generate_contract(f"Contract{i}", args.functions, i)[1] for i in range(args.contracts)]
+
+
+def bench(name: str, queries: Callable[[Dict], List], asts: List[Dict], repetitions: int):
+    timings = []
+    locations = None
+    for _ in range(repetitions):
+        begin = perf_counter()
+        locations = [queries(ast) for ast in asts]
+        timings.append(perf_counter() - begin)
+    return {"method": name, "best": min(timings), "mean": sum(timings) / len(timings)}, locations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--build-info", type=str, help="Hardhat build info file with the asts")
+    parser.add_argument("--contracts", type=int, default=200, help="Amount of generated contracts")
+    parser.add_argument("--functions", type=int, default=40, help="Amount of functions per generated contract")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--output", type=str, help="Store the results as json")
+    args = parser.parse_args()
+
+    asts = load_asts(args)
+    print(f"[*] Looking up mutation locations in {len(asts)} source units")
+
+    result, locations = bench("ast index", index_queries, asts, args.repetitions)
+    results = [result]
+    if parse is None:
+        print("[-] jsonpath_rw is not installed, only the ast index is measured")
+    else:
+        result, expected = bench("jsonpath", jsonpath_queries, asts, args.repetitions)
+        if expected != locations:
+            print("[-] The ast index found other locations than the jsonpath queries")
+            sys.exit(1)
+        results.append(result)
+
+    for result in results:
+        print("{method:<12} best {best:8.3f}s  mean {mean:8.3f}s".format(**result))
+    if len(results) > 1:
+        print("[+] Speedup x{:.1f}".format(results[1]["best"] / results[0]["best"]))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"source_units": len(asts), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+""" Benchmarks the sandbox clone backends on a synthetic project
+
+Usage:
+    python benchmarks/clone_backends.py --files 50000 --output clone_results.json
+"""
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+from tempfile import mkdtemp
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).absolute().parent.parent))
+
+from eth_vertigo.interfaces.common.clone import ProjectCloner, CLONE_BACKENDS  # noqa: E402
+from eth_vertigo.interfaces.common.sandbox import make_temp_directory  # noqa: E402
+
+
+def create_project(root: Path, dependency_files: int, files_per_directory: int = 100) -> Path:
+    """ Creates a synthetic project with the given amount of files in node_modules """
+    project = root / "project"
+    (project / "contracts").mkdir(parents=True)
+    (project / "test").mkdir()
+    for i in range(20):
+        (project / "contracts" / f"Contract{i}.sol").write_text(f"contract Contract{i} {{}}\n" * 50)
+        (project / "test" / f"contract{i}.js").write_text("it('works', () => {});\n" * 20)
+    (project / "truffle-config.js").write_text("module.exports = {};\n")
+
+    modules = project / "node_modules"
+    for i in range(dependency_files):
+        directory = modules / f"package{i // files_per_directory}"
+        if i % files_per_directory == 0:
+            directory.mkdir(parents=True)
+        (directory / f"file{i}.js").write_text(f"module.exports = {i};\n" + "// padding\n" * 40)
+    return project
+
+
+def bench(name: str, clone, repetitions: int):
+    timings = []
+    for _ in range(repetitions):
+        begin = perf_counter()
+        target = clone()
+        timings.append(perf_counter() - begin)
+        shutil.rmtree(target)
+    return {"backend": name, "best": min(timings), "mean": sum(timings) / len(timings)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=50000, help="Amount of files in node_modules")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--output", type=str, help="Store the results as json")
+    args = parser.parse_args()
+
+    root = Path(mkdtemp())
+    try:
+        print(f"[*] Creating synthetic project with {args.files} dependency files")
+        project = create_project(root, args.files)
+
+        results = [bench("copy_tree (legacy)", lambda: make_temp_directory(str(project)), args.repetitions)]
+        for name in CLONE_BACKENDS:
+            cloner = ProjectCloner.from_name(name)
+            results.append(bench(name, lambda: make_temp_directory(str(project), cloner), args.repetitions))
+    finally:
+        shutil.rmtree(str(root))
+
+    for result in results:
+        print("{backend:<20} best {best:8.3f}s  mean {mean:8.3f}s".format(**result))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"files": args.files, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
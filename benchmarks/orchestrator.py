@@ -0,0 +1,177 @@
+""" Benchmarks the orchestration overhead of vertigo on a synthetic project, without truffle, hardhat or ganache
+
+The project and the framework executables are generated by stubs.py, the latencies of the stubs are configurable so
+that the time that vertigo adds on top of the framework can be measured. Results are compared against the results of
+an earlier run with --baseline.
+
+Usage:
+    python benchmarks/orchestrator.py --contracts 20 --functions 10 --output orchestrator_results.json
+    python benchmarks/orchestrator.py --contracts 20 --functions 10 --baseline orchestrator_results.json
+"""
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+from tempfile import mkdtemp
+from time import perf_counter
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).absolute().parent.parent))
+
+from stubs import create_project, install_stubs  # noqa: E402
+from eth_vertigo.core.network import DynamicNetworkPool, Ganache, StaticNetworkPool  # noqa: E402
+from eth_vertigo.core.timing import PhaseStatistics  # noqa: E402
+from eth_vertigo.interfaces.hardhat import HardhatCampaign  # noqa: E402
+from eth_vertigo.interfaces.truffle import TruffleCampaign  # noqa: E402
+
+# Stages of a campaign that are measured, in the order in which they run
+STAGES = ["campaign", "mutators", "setup", "get_bytecodes", "valid", "run"]
+
+
+def create_campaign(framework: str, project: Path, stubs: Dict[str, str], args):
+    if args.ganache:
+        networks = [("bench_{}".format(index), args.ganache_port + index) for index in range(args.threads)]
+        network_pool = DynamicNetworkPool(
+            networks, lambda port: Ganache(port, [], stubs["ganache"]), snapshots=args.snapshots
+        )
+    else:
+        network_pool = StaticNetworkPool(["bench_{}".format(index) for index in range(args.threads)])
+
+    if framework == "truffle":
+        return TruffleCampaign(
+            stubs["framework"], project, [], network_pool, mutation_processes=args.mutation_processes
+        )
+    return HardhatCampaign([stubs["framework"]], project, [], network_pool, mutation_processes=args.mutation_processes)
+
+
+def run_once(project: Path, stubs: Dict[str, str], args) -> Dict:
+    """ Runs the stages of a campaign once
+
+    :return: The duration in seconds of every stage, the amount of mutants and the campaign's phase statistics
+    """
+    durations = {}
+
+    def measure(stage: str, function: Callable):
+        begin = perf_counter()
+        value = function()
+        durations[stage] = perf_counter() - begin
+        return value
+
+    campaign = measure("campaign", lambda: create_campaign(args.framework, project, stubs, args))
+    try:
+        mutants = measure("mutators", lambda: [
+            mutation for source in campaign.sources for mutator in campaign.mutators
+            for mutation in mutator.mutate(source, project)
+        ])
+        measure("setup", campaign.setup)
+        measure("get_bytecodes", lambda: campaign.compiler.get_bytecodes(str(project)))
+        if not measure("valid", campaign.valid):
+            raise ValueError("The synthetic project is not valid")
+        campaign.store_compilation_results()
+
+        if args.mutants:
+            campaign.mutations = campaign.mutations[:args.mutants]
+        measure("run", lambda: campaign.run(lambda: None, threads=args.threads))
+    finally:
+        campaign.teardown()
+
+    return {
+        "durations": durations,
+        "mutants": len(mutants),
+        "evaluated": len(campaign.mutations),
+        "phases": PhaseStatistics.from_mutations(campaign.mutations).summary()
+    }
+
+
+def summarize(runs: List[Dict]) -> List[Dict]:
+    results = []
+    for stage in STAGES:
+        timings = [run["durations"][stage] for run in runs]
+        results.append({"stage": stage, "best": min(timings), "mean": sum(timings) / len(timings)})
+    return results
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """ Compares the best durations with those of the baseline
+
+    :return: The stages that became slower than the tolerance allows
+    """
+    previous = {result["stage"]: result for result in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get(result["stage"])
+        if not before or before["best"] <= 0:
+            continue
+        ratio = result["best"] / before["best"]
+        marker = ""
+        if ratio > 1 + tolerance:
+            regressions.append(result["stage"])
+            marker = "  REGRESSION"
+        print("{:<15} {:8.3f}s -> {:8.3f}s  x{:.2f}{}".format(result["stage"], before["best"], result["best"], ratio,
+                                                              marker))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--framework", choices=["hardhat", "truffle"], default="hardhat")
+    parser.add_argument("--contracts", type=int, default=10, help="Amount of generated contracts")
+    parser.add_argument("--functions", type=int, default=5, help="Amount of functions per contract")
+    parser.add_argument("--tests", type=int, default=5, help="Amount of tests per contract")
+    parser.add_argument("--compile-latency", type=float, default=0.0, help="Seconds that a compilation takes")
+    parser.add_argument("--test-latency", type=float, default=0.0, help="Seconds that a test run takes")
+    parser.add_argument("--kill-ratio", type=float, default=0.8, help="Fraction of the mutants that is killed")
+    parser.add_argument("--mutants", type=int, default=50, help="Amount of mutants that are evaluated, 0 for all")
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument("--mutation-processes", type=int, default=1, help="Processes that generate the mutants")
+    parser.add_argument("--ganache", action="store_true", help="Use dynamic networks backed by the ganache stub")
+    parser.add_argument("--ganache-port", type=int, default=18545)
+    parser.add_argument("--snapshots", action="store_true", help="Revert the dynamic networks to a snapshot")
+    parser.add_argument("--repetitions", type=int, default=1)
+    parser.add_argument("--output", type=str, help="Store the results as json")
+    parser.add_argument("--baseline", type=str, help="Results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Fraction by which a stage may be slower than in the baseline")
+    args = parser.parse_args()
+
+    root = Path(mkdtemp())
+    try:
+        print("[*] Creating synthetic {} project with {} contracts".format(args.framework, args.contracts))
+        project = create_project(
+            root, args.framework, args.contracts, args.functions, args.tests, args.compile_latency,
+            args.test_latency, args.kill_ratio
+        )
+        stubs = install_stubs(root / "bin")
+        runs = [run_once(project, stubs, args) for _ in range(args.repetitions)]
+    finally:
+        shutil.rmtree(str(root))
+
+    results = summarize(runs)
+    print("[*] {} mutants generated, {} evaluated".format(runs[-1]["mutants"], runs[-1]["evaluated"]))
+    for result in results:
+        print("{stage:<15} best {best:8.3f}s  mean {mean:8.3f}s".format(**result))
+    for name, summary in runs[-1]["phases"].items():
+        print("{:<25} total {:8.3f}s  p50 {:8.4f}s  p95 {:8.4f}s".format(
+            name, summary["total"], summary["p50"], summary["p95"]))
+
+    report = {
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "mutants": runs[-1]["mutants"],
+        "evaluated": runs[-1]["evaluated"],
+        "results": results,
+        "phases": runs[-1]["phases"]
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    if args.baseline:
+        print("[*] Comparing with {}".format(args.baseline))
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print("[-] Slower than the baseline: {}".format(", ".join(regressions)))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+""" Synthetic projects and stub framework executables for the benchmarks
+
+The synthetic projects hold generated contracts together with the build outputs that truffle or hardhat would create
+for them (artifacts with bytecodes and solc asts, and hardhat build info files). The stub executables stand in for
+truffle, hardhat and ganache:
+
+- `framework compile` writes the build outputs, the bytecodes are derived from the contract sources
+- `framework test` prints the results of the generated tests with mocha's json or json-stream reporter, tests of a
+  mutated contract fail with the project's kill ratio
+- `ganache --port <port>` answers json rpc requests
+
+Each stub sleeps for the latencies that are configured in the project's BENCH_FILE, so that the overhead of vertigo
+can be measured against a framework of a known speed.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Configuration of a synthetic project, it is copied into the sandboxes together with the rest of the project
+BENCH_FILE = "vertigo-bench.json"
+# Build outputs that the framework stub writes on every compilation, with the bytecodes left out
+OUTPUTS_FILE = "vertigo-bench-outputs.json"
+
+_PRAGMA = "pragma solidity ^0.8.0;\n\n"
+_VOID_CALL_TYPE = {
+    "typeIdentifier": "t_function_internal_nonpayable$_t_uint256_$returns$__$",
+    "typeString": "function (uint256)"
+}
+
+_STUB = """#!{python}
+import sys
+sys.path.insert(0, {directory!r})
+from stubs import {entry_point}
+{entry_point}(sys.argv[1:])
+"""
+
+
+class _SourceWriter:
+    """ Writes a source unit while keeping track of the src locations of the ast nodes """
+
+    def __init__(self, file_index: int):
+        self.file_index = file_index
+        self.parts = []  # type: List[str]
+        self.offset = 0
+
+    def write(self, text: str) -> str:
+        start = self.offset
+        self.parts.append(text)
+        self.offset += len(text)
+        return self.span(start)
+
+    def span(self, start: int) -> str:
+        return "{}:{}:{}".format(start, self.offset - start, self.file_index)
+
+    def identifier(self, name: str, **fields) -> Dict:
+        return dict(nodeType="Identifier", name=name, src=self.write(name), **fields)
+
+    def binary(self, left, operator: str, right) -> Dict:
+        start = self.offset
+        left_node = left()
+        self.write(" {} ".format(operator))
+        right_node = right()
+        return {
+            "nodeType": "BinaryOperation",
+            "operator": operator,
+            "leftExpression": left_node,
+            "rightExpression": right_node,
+            "src": self.span(start)
+        }
+
+    def assignment(self, left: str, operator: str, right: str) -> Dict:
+        start = self.offset
+        left_node = self.identifier(left)
+        self.write(" {} ".format(operator))
+        right_node = self.identifier(right)
+        return {
+            "nodeType": "Assignment",
+            "operator": operator,
+            "leftHandSide": left_node,
+            "rightHandSide": right_node,
+            "src": self.span(start)
+        }
+
+    def statement(self, indentation: str, expression) -> Dict:
+        self.write(indentation)
+        start = self.offset
+        node = expression()
+        self.write(";")
+        statement = {"nodeType": "ExpressionStatement", "expression": node, "src": self.span(start)}
+        self.write("\n")
+        return statement
+
+
+def _function(writer: _SourceWriter, index: int) -> Dict:
+    """ Writes a function with an assignment, a condition, a void call, arithmetic and a modifier """
+    writer.write("    ")
+    start = writer.offset
+    writer.write("function f{}(uint256 a, uint256 b) public ".format(index))
+    modifier_start = writer.offset
+    modifier_name = writer.identifier("onlyOwner")
+    modifier = {"nodeType": "ModifierInvocation", "modifierName": modifier_name, "src": writer.span(modifier_start)}
+    writer.write(" returns (uint256) ")
+
+    body_start = writer.offset
+    writer.write("{\n")
+    statements = [writer.statement("        ", lambda: writer.assignment("total", "+=", "a"))]
+
+    writer.write("        ")
+    if_start = writer.offset
+    writer.write("if (")
+    condition = writer.binary(lambda: writer.identifier("a"), "<", lambda: writer.identifier("b"))
+    writer.write(") ")
+    true_start = writer.offset
+    writer.write("{\n")
+
+    def call():
+        call_start = writer.offset
+        expression = writer.identifier("record", typeDescriptions=_VOID_CALL_TYPE)
+        writer.write("(")
+        argument = writer.identifier("a")
+        writer.write(")")
+        return {
+            "nodeType": "FunctionCall", "expression": expression, "arguments": [argument],
+            "src": writer.span(call_start)
+        }
+    true_statements = [writer.statement("            ", call)]
+    writer.write("        }")
+    true_body = {"nodeType": "Block", "statements": true_statements, "src": writer.span(true_start)}
+    statements.append({
+        "nodeType": "IfStatement", "condition": condition, "trueBody": true_body, "src": writer.span(if_start)
+    })
+    writer.write("\n        ")
+
+    return_start = writer.offset
+    writer.write("return ")
+    product = lambda: writer.binary(lambda: writer.identifier("a"), "*", lambda: writer.identifier("b"))
+    literal = lambda: {"nodeType": "Literal", "value": str(index), "src": writer.write(str(index))}
+    expression = writer.binary(product, "+", literal)
+    writer.write(";")
+    statements.append({"nodeType": "Return", "expression": expression, "src": writer.span(return_start)})
+    writer.write("\n    }")
+    body = {"nodeType": "Block", "statements": statements, "src": writer.span(body_start)}
+    function = {
+        "nodeType": "FunctionDefinition",
+        "name": "f{}".format(index),
+        "modifiers": [modifier],
+        "body": body,
+        "src": writer.span(start)
+    }
+    writer.write("\n\n")
+    return function
+
+
+def generate_contract(name: str, functions: int, file_index: int) -> Tuple[str, Dict]:
+    """ Generates the source of a contract and its solc ast
+
+    :param name: Name of the contract, its source is stored at contracts/<name>.sol
+    :param functions: Amount of functions in the contract, each function yields seven mutants
+    :param file_index: Index of the source unit in the compilation
+    :return: (source, ast)
+    """
+    writer = _SourceWriter(file_index)
+    writer.write(_PRAGMA)
+    contract_start = writer.offset
+    writer.write("contract {} {{\n".format(name))
+    writer.write("    address owner;\n    uint256 total;\n    uint256 last;\n\n")
+    writer.write("    modifier onlyOwner() {\n        require(msg.sender == owner);\n        _;\n    }\n\n")
+
+    record_start = writer.offset
+    writer.write("    function record(uint256 value) internal {\n")
+    record_body = [writer.statement("        ", lambda: writer.assignment("last", "=", "value"))]
+    writer.write("    }\n\n")
+    nodes = [{
+        "nodeType": "FunctionDefinition",
+        "name": "record",
+        "modifiers": [],
+        "body": {"nodeType": "Block", "statements": record_body, "src": writer.span(record_start)},
+        "src": writer.span(record_start)
+    }]
+
+    for index in range(functions):
+        nodes.append(_function(writer, index))
+    writer.write("}\n")
+
+    contract = {"nodeType": "ContractDefinition", "name": name, "nodes": nodes, "src": writer.span(contract_start)}
+    ast = {
+        "nodeType": "SourceUnit",
+        "absolutePath": "contracts/{}.sol".format(name),
+        "id": file_index,
+        "nodes": [{"nodeType": "PragmaDirective", "src": "0:{}:{}".format(len(_PRAGMA) - 2, file_index)}, contract],
+        "src": writer.span(0)
+    }
+    return "".join(writer.parts), ast
+
+
+def _fingerprint(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _bytecode(content: bytes) -> str:
+    return "0x6080604052" + _fingerprint(content)
+
+
+def create_project(
+        root: Path,
+        framework: str = "hardhat",
+        contracts: int = 10,
+        functions: int = 5,
+        tests: int = 5,
+        compile_latency: float = 0.0,
+        test_latency: float = 0.0,
+        kill_ratio: float = 0.8
+) -> Path:
+    """ Creates a synthetic truffle or hardhat project together with its build outputs
+
+    :param root: Directory in which the project is created
+    :param framework: Either truffle or hardhat
+    :param contracts: Amount of contracts
+    :param functions: Amount of functions per contract
+    :param tests: Amount of tests per contract
+    :param compile_latency: Seconds that a compilation takes
+    :param test_latency: Seconds that a test run takes
+    :param kill_ratio: Fraction of the mutants that is killed by the tests
+    :return: The project directory
+    """
+    project = root / "project"
+    (project / "contracts").mkdir(parents=True)
+    (project / "test").mkdir()
+
+    names = ["Contract{}".format(index) for index in range(contracts)]
+    units = {}
+    for index, name in enumerate(names):
+        source, ast = generate_contract(name, functions, index)
+        (project / "contracts" / "{}.sol".format(name)).write_text(source, "utf-8")
+        (project / "test" / "{}.js".format(name.lower())).write_text("it('works', () => {});\n", "utf-8")
+        units[name] = (source, ast)
+
+    outputs = {}
+    if framework == "truffle":
+        (project / "truffle-config.js").write_text("module.exports = {};\n", "utf-8")
+        for name, (source, ast) in units.items():
+            outputs["build/contracts/{}.json".format(name)] = {
+                "contractName": name,
+                "source": source,
+                "sourcePath": str((project / ast["absolutePath"]).absolute()),
+                "ast": ast
+            }
+    else:
+        (project / "hardhat.config.js").write_text("module.exports = {solidity: \"0.8.0\"};\n", "utf-8")
+        build_info_id = _fingerprint("".join(source for source, _ in units.values()).encode("utf-8"))[:32]
+        outputs["artifacts/build-info/{}.json".format(build_info_id)] = {
+            "id": build_info_id,
+            "input": {
+                "language": "Solidity",
+                "sources": {ast["absolutePath"]: {"content": source} for source, ast in units.values()},
+                "settings": {"optimizer": {"enabled": False, "runs": 200}}
+            },
+            "output": {
+                "sources": {ast["absolutePath"]: {"id": ast["id"], "ast": ast} for _, ast in units.values()}
+            }
+        }
+        for name, (source, ast) in units.items():
+            directory = "artifacts/{}".format(ast["absolutePath"])
+            outputs["{}/{}.json".format(directory, name)] = {"contractName": name, "sourceName": ast["absolutePath"]}
+            outputs["{}/{}.dbg.json".format(directory, name)] = {
+                "buildInfo": "../../build-info/{}.json".format(build_info_id)
+            }
+    (project / OUTPUTS_FILE).write_text(json.dumps(outputs), "utf-8")
+    _write_outputs(project, outputs)
+
+    configuration = {
+        "framework": framework,
+        "tests": tests,
+        "compile_latency": compile_latency,
+        "test_latency": test_latency,
+        "kill_ratio": kill_ratio,
+        "fingerprints": {
+            "contracts/{}.sol".format(name): _fingerprint(source.encode("utf-8"))
+            for name, (source, _) in units.items()
+        }
+    }
+    (project / BENCH_FILE).write_text(json.dumps(configuration), "utf-8")
+    return project
+
+
+def install_stubs(directory: Path) -> Dict[str, str]:
+    """ Creates the stub executables in the given directory
+
+    :return: The paths of the "framework" and "ganache" stubs
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    stubs = {}
+    for name, entry_point in (("framework", "run_framework"), ("ganache", "run_ganache")):
+        stub = directory / name
+        stub.write_text(_STUB.format(
+            python=sys.executable, directory=str(Path(__file__).absolute().parent), entry_point=entry_point
+        ))
+        os.chmod(str(stub), 0o755)
+        stubs[name] = str(stub)
+    return stubs
+
+
+def _write_outputs(directory: Path, outputs: Dict[str, Dict]) -> None:
+    """ Writes the build outputs, the bytecode of an artifact is derived from the current source of its contract """
+    for relative_path, output in outputs.items():
+        if "contractName" in output:
+            source = directory / "contracts" / "{}.sol".format(output["contractName"])
+            output = dict(output, bytecode=_bytecode(source.read_bytes()))
+        path = directory / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(output), "utf-8")
+
+
+def _compile(directory: Path, configuration: Dict) -> None:
+    time.sleep(configuration["compile_latency"])
+    _write_outputs(directory, json.loads((directory / OUTPUTS_FILE).read_text("utf-8")))
+
+
+def _mocha_options(directory: Path, framework: str) -> Tuple[bool, str]:
+    """ Reads the options that vertigo appended to the configuration
+
+    :return: (whether the json-stream reporter is used, the grep pattern)
+    """
+    config = directory / ("truffle-config.js" if framework == "truffle" else "hardhat.config.js")
+    content = config.read_text("utf-8")
+    stream = content.rfind("json-stream") > content.rfind("reporter: \"json\"")
+    greps = re.findall(r"^module\.exports\.mocha\.grep = (.*);$", content, re.MULTILINE)
+    return stream, json.loads(greps[-1]) if greps else None
+
+
+def _test(directory: Path, configuration: Dict) -> None:
+    time.sleep(configuration["test_latency"])
+    stream, grep = _mocha_options(directory, configuration["framework"])
+
+    results = []
+    duration = configuration["test_latency"] * 1000 / max(configuration["tests"] * len(configuration["fingerprints"]), 1)
+    for relative_path, fingerprint in sorted(configuration["fingerprints"].items()):
+        content = (directory / relative_path).read_bytes()
+        current = _fingerprint(content)
+        killed = current != fingerprint and int(current, 16) % 1000 < configuration["kill_ratio"] * 1000
+        contract = Path(relative_path).stem
+        for index in range(configuration["tests"]):
+            title = "test {}".format(index)
+            full_title = "{} {}".format(contract, title)
+            if grep and not re.search(grep, full_title):
+                continue
+            test = {"title": title, "fullTitle": full_title, "duration": duration}
+            results.append((not (killed and index == 0), test))
+
+    if stream:
+        print(json.dumps(["start", {"total": len(results)}]))
+        for success, test in results:
+            print(json.dumps(["pass" if success else "fail", test]), flush=True)
+        print(json.dumps(["end", {}]))
+        return
+
+    print("Compiling your contracts...")
+    print(json.dumps({
+        "stats": {"tests": len(results)},
+        "failures": [test for success, test in results if not success],
+        "passes": [test for success, test in results if success]
+    }, indent=2))
+
+
+def run_framework(arguments: List[str]) -> None:
+    """ Entry point of the truffle and hardhat stub """
+    directory = Path(os.getcwd())
+    configuration = json.loads((directory / BENCH_FILE).read_text("utf-8"))
+    command = arguments[0] if arguments else None
+    if command == "compile":
+        _compile(directory, configuration)
+    elif command == "test":
+        if "--no-compile" not in arguments and "--compile-none" not in arguments:
+            _compile(directory, configuration)
+        _test(directory, configuration)
+    else:
+        print("Error: unsupported command {}".format(command))
+        sys.exit(1)
+
+
+def run_ganache(arguments: List[str]) -> None:
+    """ Entry point of the ganache stub, it answers every json rpc request """
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+    port = int(arguments[arguments.index("--port") + 1])
+    results = {"net_version": "1337", "evm_snapshot": "0x1", "evm_revert": True}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            result = results.get(request.get("method"))
+            body = json.dumps({"jsonrpc": "2.0", "id": request.get("id"), "result": result}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+    print("Listening on 127.0.0.1:{}".format(port), flush=True)
+    Server(("127.0.0.1", port), Handler).serve_forever()
@@ -2,18 +2,30 @@ import click
 from os import getcwd
 from pathlib import Path
 from eth_vertigo.core import MutationResult
-from eth_vertigo.core.network import DynamicNetworkPool, StaticNetworkPool, Ganache
+from eth_vertigo.core.campaign import CampaignReport
+from eth_vertigo.core.journal import CampaignJournal
+from eth_vertigo.distributed import Coordinator, Worker
+from eth_vertigo.core.scheduler import CostAwareScheduler, CostModel
+from eth_vertigo.core.timeout import TimeoutPolicy, DEFAULT_TIMEOUT_MULTIPLIER, DEFAULT_TIMEOUT_FLOOR
+from eth_vertigo.core.timing import PhaseStatistics
+from eth_vertigo.core.network import DynamicNetworkPool, StaticNetworkPool, Ganache, HardhatNode, \
+    ProcessDynamicNetworkPool, ProcessStaticNetworkPool
 from eth_vertigo.interfaces.truffle import TruffleCampaign
 from eth_vertigo.interfaces.hardhat import HardhatCampaign
 from eth_vertigo.core.filters.sample_filter import SampleFilter
 from eth_vertigo.core.filters.exclude_filter import ExcludeFilter
 from eth_vertigo.test_runner.exceptions import TestRunException
 from eth_vertigo.mutator.universal_mutator import UniversalMutator
+from eth_vertigo.interfaces.common.clone import ProjectCloner, CLONE_BACKENDS
+from eth_vertigo.interfaces.common.compilation_cache import CompilationCache
 
 from eth_vertigo.incremental import IncrementalRecorder, IncrementalMutationStore, IncrementalSuggester
 
 from tqdm import tqdm
 
+# Port of the first standalone hardhat node
+DEFAULT_HARDHAT_PORT = 8600
+
 
 @click.group(help="Mutation testing framework for smart contracts")
 def cli():
@@ -23,29 +35,93 @@ def cli():
 @cli.command(help="Performs a core test campaign")
 @click.option('--output', help="Output core test results to file", nargs=1, type=str)
 @click.option('--network', help="Network names that vertigo can use", multiple=True)
+@click.option('--network-endpoint', help="Json rpc url of a network, used for health checks eg. "
+                                          "development=http://127.0.0.1:8545", multiple=True)
+@click.option('--health-check-interval', help="Seconds between two health checks of the networks", type=float)
 @click.option('--ganache-path', help="Path to ganache binary", type=str, default="ganache-cli")
 @click.option('--ganache-network', help="Dynamic networks that vertigo can use eg. (develop, 8485)",
               multiple=True, type=(str, int))
 @click.option('--ganache-network-options', help="Options to pass to dynamic ganache networks", type=str)
+@click.option('--ganache-snapshots', help="Keep dynamic ganache networks running and revert them to a snapshot "
+                                         "after every mutant", is_flag=True)
+@click.option('--ganache-standby', help="Amount of dynamic ganache networks that are kept started in the background",
+              type=int, default=0)
 @click.option('--hardhat-parallel', help="Amount of networks that hardhat should be using in parallel", type=int)
+@click.option('--hardhat-node', help="Back every parallel hardhat network by a standalone hardhat node",
+              is_flag=True)
+@click.option('--hardhat-port', help="Port of the first standalone hardhat node, the others use the next ports",
+              type=int, default=DEFAULT_HARDHAT_PORT)
 @click.option('--rules', help="Universal Mutator style rules to use in mutation testing", multiple=True)
 @click.option('--truffle-location', help="Location of truffle cli", nargs=1, type=str, default="truffle")
 @click.option('--sample-ratio', help="If this option is set. Vertigo will apply the sample filter with the given ratio", nargs=1, type=float)
 @click.option('--exclude', help="Vertigo won't mutate files in these directories", multiple=True)
 @click.option('--incremental', help="File where incremental mutation state is stored",
               type=str)
+@click.option('--clone-backend', help="Strategy used to clone dependency directories into the sandboxes",
+              type=click.Choice(list(CLONE_BACKENDS.keys())))
+@click.option('--mutation-processes', help="Amount of processes that generate the mutants of the source files",
+              type=int, default=1)
+@click.option('--schemata', help="Compile all mutants at once behind a runtime switch", is_flag=True)
+@click.option('--compilation-cache', help="Directory where compilation results of mutants are cached", type=str)
+@click.option('--compilation-cache-size', help="Maximum size of the compilation cache in megabytes",
+              type=int, default=1024)
+@click.option('--solc', help="Path to a solc binary used for fast trivial compiler equivalence checks", type=str)
+@click.option('--coverage', help="Only run the tests that execute the mutated code (hardhat only)", is_flag=True)
+@click.option('--bail', help="Stop testing a mutant at the first failing test", is_flag=True)
+@click.option('--persistent', help="Keep a warm test process running in every sandbox (hardhat only)", is_flag=True)
+@click.option('--timeout-multiplier', help="Factor by which a mutant's test run may exceed its expected duration",
+              type=float, default=DEFAULT_TIMEOUT_MULTIPLIER)
+@click.option('--timeout-floor', help="Minimal timeout of a mutant's test run in seconds",
+              type=float, default=DEFAULT_TIMEOUT_FLOOR)
+@click.option('--journal', help="File where the result of every mutant is recorded as soon as it is known", type=str)
+@click.option('--resume', help="Journal of an interrupted campaign, only mutants without a result are evaluated",
+              type=str)
+@click.option('--max-survivors', help="Stop the campaign once this many mutants survived", type=int)
+@click.option('--serve', help="Hand out the mutants to vertigo workers that connect to this address (host:port, the "
+                              "host defaults to 127.0.0.1)", type=str)
+@click.option('--processes', help="Evaluate mutants in separate worker processes instead of threads", is_flag=True)
+@click.option('--asyncio', 'use_asyncio', help="Evaluate mutants on an event loop instead of threads", is_flag=True)
+@click.option('--timings', help="File where the time spent in each phase of the mutants' evaluation is written "
+                                "as json", type=str)
+@click.option('--timings-prometheus', help="File where the time spent in each phase of the mutants' evaluation is "
+                                           "written in the prometheus text format", type=str)
 def run(
         output,
         network,
+        network_endpoint,
+        health_check_interval,
         ganache_path,
         ganache_network,
         ganache_network_options,
+        ganache_snapshots,
+        ganache_standby,
         hardhat_parallel,
+        hardhat_node,
+        hardhat_port,
         rules,
         truffle_location,
         sample_ratio,
         exclude,
-        incremental
+        incremental,
+        clone_backend,
+        mutation_processes,
+        schemata,
+        compilation_cache,
+        compilation_cache_size,
+        solc,
+        coverage,
+        bail,
+        persistent,
+        timeout_multiplier,
+        timeout_floor,
+        journal,
+        resume,
+        max_survivors,
+        serve,
+        processes,
+        use_asyncio,
+        timings,
+        timings_prometheus
 ):
     """ Run command """
     click.echo("[*] Starting mutation testing")
@@ -62,7 +138,18 @@ def run(
         click.echo("[-] Can't use dynamic networks and regular networks simultaniously")
         exit(1)
 
+    if processes and (network_endpoint or health_check_interval):
+        click.echo("[-] Networks shared between processes are not health checked, --network-endpoint and "
+                   "--health-check-interval can't be used with --processes")
+        exit(1)
+
+    if processes and use_asyncio:
+        click.echo("[-] Mutants are either evaluated in processes or on an event loop, --processes and --asyncio "
+                   "can't be used together")
+        exit(1)
+
     test_suggesters = []
+    store = None
     if incremental:
         incremental_store_file = Path(incremental)
         if not incremental_store_file.exists():
@@ -94,65 +181,50 @@ def run(
                 um.load_rule(Path(rule_file))
             mutators.append(um)
 
-        network_pool = None
-        if hardhat_parallel:
-            if project_type != "hardhat":
-                click.echo("[+] Not running analysis on hardhat project, ignoring hardhat parallel option")
-            else:
-                network_pool = StaticNetworkPool(["_not_used_anywhere_"] * hardhat_parallel)
-
-        if network_pool and (network or ganache_network):
-            click.echo("[*] Both a hardhat network pool is set up and custom networks. Only using hardhat networks")
-        elif network:
-            network_pool = StaticNetworkPool(network)
-        elif ganache_network:
-            network_pool = DynamicNetworkPool(
-                ganache_network,
-                lambda port: Ganache(port, ganache_network_options.split(' ') if ganache_network_options else [],
-                                     ganache_path)
-            )
+        cloner = ProjectCloner.from_name(clone_backend) if clone_backend else None
+        cache = None
+        if compilation_cache:
+            cache = CompilationCache(Path(compilation_cache), compilation_cache_size * 1024 * 1024)
 
+        hardhat_networks = _hardhat_networks(hardhat_parallel, hardhat_node, hardhat_port)
+        network_pool = _create_network_pool(
+            project_type, network, ganache_path, ganache_network, ganache_network_options, hardhat_networks,
+            processes=processes, snapshots=ganache_snapshots, standby=ganache_standby,
+            endpoints=network_endpoint, health_check_interval=health_check_interval, project_directory=project_path
+        )
         if not network_pool:
             click.echo("[-] Vertigo needs at least one network to run analyses on")
             return
 
-        try:
-            if project_type == "truffle":
-                campaign = TruffleCampaign(
-                    truffle_location=truffle_location,
-                    project_directory=project_path,
-                    mutators=mutators,
-                    network_pool=network_pool,
-                    filters=filters,
-                    suggesters=test_suggesters,
-                )
-            if project_type == "hardhat":
-                campaign = HardhatCampaign(
-                    hardhat_command=["npx", "hardhat"],
-                    project_directory=project_path,
-                    mutators=mutators,
-                    network_pool=network_pool,
-                    filters=filters,
-                    suggesters=test_suggesters,
-                )
-        except:
-            click.echo("[-] Encountered an error while setting up the core campaign")
-            if isinstance(network_pool, DynamicNetworkPool):
-                networks = network_pool.claimed_networks.keys()
-            else:
-                networks = network_pool.claimed_networks[:]
-            for node in networks:
-                click.echo(f"[+] Cleaning up network: {node}")
-                network_pool.yield_network(node)
-            raise
+        campaign = _create_campaign(
+            project_type,
+            project_path,
+            network_pool,
+            truffle_location=truffle_location,
+            mutators=mutators,
+            filters=filters,
+            suggesters=test_suggesters,
+            cloner=cloner,
+            schemata=schemata,
+            compilation_cache=cache,
+            solc_binary=solc,
+            bail=bail,
+            persistent=persistent,
+            network_urls=_network_urls(hardhat_networks),
+            mutation_processes=mutation_processes,
+            timeout_policy=TimeoutPolicy(timeout_multiplier, timeout_floor),
+        )
     else:
         click.echo("[*] Could not find supported project directory in {}".format(working_directory))
         return
 
     click.echo("[*] Initializing campaign run ")
 
+    campaign_journal = None
     try:
         campaign.setup()
+        if campaign.schemata:
+            click.echo("[*] Compiled {} mutants behind a runtime switch".format(campaign.schemata.mutation_count))
         click.echo("[*] Checking validity of project")
         if not campaign.valid():
             click.echo("[-] We couldn't get valid results by running the truffle tests.\n Aborting")
@@ -161,10 +233,47 @@ def run(
         click.echo("[+] The project is valid")
         click.echo("[*] Storing compilation results")
         campaign.store_compilation_results()
-        click.echo("[*] Running analysis on {} mutants".format(len(campaign.mutations)))
-        with tqdm(total=len(campaign.mutations), unit="mutant") as pbar:
-            report = campaign.run(lambda: pbar.update(1) and pbar.refresh(), threads=max(network_pool.size, 1))
+        if coverage:
+            click.echo("[*] Collecting test coverage")
+            if not campaign.collect_coverage():
+                click.echo("[-] Could not collect test coverage, all tests are ran for every mutant")
+        if journal or resume:
+            campaign_journal = CampaignJournal(Path(journal or resume))
+        if resume:
+            restored = CampaignJournal(Path(resume)).restore(campaign.mutations)
+            click.echo("[*] Restored the results of {} mutants from {}".format(restored, resume))
+        slots = max(network_pool.size, 1)
+        schedule = campaign.schedule(CostAwareScheduler(CostModel(campaign.base_run_time, store)), slots)
+        click.echo("[*] Running analysis on {} mutants, expected to take {:.0f} seconds".format(
+            len(campaign.mutations), schedule.expected_makespan))
+        evaluated = [mutation for mutation in campaign.mutations if mutation.result is not None]
+        survivors = len([mutation for mutation in evaluated if mutation.result == MutationResult.LIVED])
+        with tqdm(total=len(campaign.mutations), initial=len(evaluated), unit="mutant") as pbar:
+            if serve:
+                host, _, port = serve.rpartition(":")
+                pending = [mutation for mutation in campaign.mutations if mutation.result is None]
+                coordinator = Coordinator(pending, host or "127.0.0.1", int(port))
+                pbar.write("[*] Handing out mutants to workers on {}:{}".format(*coordinator.address))
+                results = coordinator.stream()
+            else:
+                results = campaign.stream(threads=slots, processes=processes, asynchronous=use_asyncio)
+            for mutation in results:
+                pbar.update(1)
+                if campaign_journal:
+                    campaign_journal.record(mutation)
+                if mutation.result != MutationResult.LIVED:
+                    continue
+                survivors += 1
+                pbar.write("[-] Mutant survived: {}:{}".format(mutation.relative_path, mutation.line_number))
+                if max_survivors is not None and survivors >= max_survivors:
+                    pbar.write("[*] Reached the maximum amount of survivors, stopping the campaign")
+                    results.close()
+                    break
         pbar.close()
+        report = CampaignReport([mutation for mutation in campaign.mutations if mutation.result is not None])
+        if report.mutation_count < len(campaign.mutations):
+            click.echo("[*] {} mutants were not evaluated and are left out of the report".format(
+                len(campaign.mutations) - report.mutation_count))
 
     except TestRunException as e:
         click.echo("[-] Encountered an error while running the framework's test command:")
@@ -174,8 +283,29 @@ def run(
         click.echo("[-] Encountered an error while running the core campaign")
         click.echo(e)
         raise
+    finally:
+        campaign.teardown()
+        if campaign_journal:
+            campaign_journal.close()
 
     click.echo("[*] Done with campaign run")
+    if cache:
+        click.echo(f"[*] Compilation cache: {cache.hits} hits, {cache.misses} misses")
+    claim_waits = getattr(network_pool, "claim_waits", None)
+    if claim_waits:
+        click.echo("[*] Waited {:.1f} seconds on average for a network, at most {:.1f} seconds".format(
+            sum(claim_waits) / len(claim_waits), max(claim_waits)))
+    for name, statistics in sorted(network_pool.statistics.items()):
+        click.echo("[*] Network {}: {} claims, {} failures, {} quarantines, {:.1f} seconds average wait".format(
+            name, statistics.claims, statistics.failures, statistics.quarantines, statistics.average_wait))
+    phase_statistics = PhaseStatistics.from_mutations(report.mutations)
+    for name, summary in phase_statistics.summary().items():
+        click.echo("[*] Phase {}: {:.1f} seconds in total, p50 {:.2f} seconds, p95 {:.2f} seconds".format(
+            name, summary["total"], summary["p50"], summary["p95"]))
+    if timings:
+        phase_statistics.write_json(Path(timings))
+    if timings_prometheus:
+        phase_statistics.write_prometheus(Path(timings_prometheus))
     click.echo("[+] Report:")
     click.echo(report.render())
 
@@ -200,6 +330,235 @@ def run(
     click.echo("[*] Done! ")
 
 
+@cli.command(help="Evaluates mutants that are handed out by a coordinating vertigo run")
+@click.option('--coordinator', help="Url of the coordinating vertigo run, e.g. http://coordinator:8000",
+              type=str, required=True)
+@click.option('--network', help="Network names that vertigo can use", multiple=True)
+@click.option('--network-endpoint', help="Json rpc url of a network, used for health checks eg. "
+                                          "development=http://127.0.0.1:8545", multiple=True)
+@click.option('--health-check-interval', help="Seconds between two health checks of the networks", type=float)
+@click.option('--ganache-path', help="Path to ganache binary", type=str, default="ganache-cli")
+@click.option('--ganache-network', help="Dynamic networks that vertigo can use eg. (develop, 8485)",
+              multiple=True, type=(str, int))
+@click.option('--ganache-network-options', help="Options to pass to dynamic ganache networks", type=str)
+@click.option('--ganache-snapshots', help="Keep dynamic ganache networks running and revert them to a snapshot "
+                                         "after every mutant", is_flag=True)
+@click.option('--ganache-standby', help="Amount of dynamic ganache networks that are kept started in the background",
+              type=int, default=0)
+@click.option('--hardhat-parallel', help="Amount of networks that hardhat should be using in parallel", type=int)
+@click.option('--hardhat-node', help="Back every parallel hardhat network by a standalone hardhat node",
+              is_flag=True)
+@click.option('--hardhat-port', help="Port of the first standalone hardhat node, the others use the next ports",
+              type=int, default=DEFAULT_HARDHAT_PORT)
+@click.option('--rules', help="Universal Mutator style rules to use in mutation testing", multiple=True)
+@click.option('--truffle-location', help="Location of truffle cli", nargs=1, type=str, default="truffle")
+@click.option('--clone-backend', help="Strategy used to clone dependency directories into the sandboxes",
+              type=click.Choice(list(CLONE_BACKENDS.keys())))
+@click.option('--mutation-processes', help="Amount of processes that generate the mutants of the source files",
+              type=int, default=1)
+@click.option('--schemata', help="Compile all mutants at once behind a runtime switch", is_flag=True)
+@click.option('--compilation-cache', help="Directory where compilation results of mutants are cached", type=str)
+@click.option('--compilation-cache-size', help="Maximum size of the compilation cache in megabytes",
+              type=int, default=1024)
+@click.option('--solc', help="Path to a solc binary used for fast trivial compiler equivalence checks", type=str)
+@click.option('--bail', help="Stop testing a mutant at the first failing test", is_flag=True)
+@click.option('--persistent', help="Keep a warm test process running in every sandbox (hardhat only)", is_flag=True)
+@click.option('--timeout-multiplier', help="Factor by which a mutant's test run may exceed its expected duration",
+              type=float, default=DEFAULT_TIMEOUT_MULTIPLIER)
+@click.option('--timeout-floor', help="Minimal timeout of a mutant's test run in seconds",
+              type=float, default=DEFAULT_TIMEOUT_FLOOR)
+def worker(
+        coordinator,
+        network,
+        network_endpoint,
+        health_check_interval,
+        ganache_path,
+        ganache_network,
+        ganache_network_options,
+        ganache_snapshots,
+        ganache_standby,
+        hardhat_parallel,
+        hardhat_node,
+        hardhat_port,
+        rules,
+        truffle_location,
+        clone_backend,
+        mutation_processes,
+        schemata,
+        compilation_cache,
+        compilation_cache_size,
+        solc,
+        bail,
+        persistent,
+        timeout_multiplier,
+        timeout_floor
+):
+    """ Worker command """
+    working_directory = getcwd()
+    project_type = _directory_type(working_directory)
+    if not project_type:
+        click.echo("[*] Could not find supported project directory in {}".format(working_directory))
+        return
+
+    mutators = []
+    if rules:
+        um = UniversalMutator()
+        for rule_file in rules:
+            um.load_rule(Path(rule_file))
+        mutators.append(um)
+
+    cache = None
+    if compilation_cache:
+        cache = CompilationCache(Path(compilation_cache), compilation_cache_size * 1024 * 1024)
+
+    hardhat_networks = _hardhat_networks(hardhat_parallel, hardhat_node, hardhat_port)
+    network_pool = _create_network_pool(
+        project_type, network, ganache_path, ganache_network, ganache_network_options, hardhat_networks,
+        snapshots=ganache_snapshots, standby=ganache_standby,
+        endpoints=network_endpoint, health_check_interval=health_check_interval,
+        project_directory=Path(working_directory)
+    )
+    if not network_pool:
+        click.echo("[-] Vertigo needs at least one network to run analyses on")
+        return
+
+    campaign = _create_campaign(
+        project_type,
+        Path(working_directory),
+        network_pool,
+        truffle_location=truffle_location,
+        mutators=mutators,
+        cloner=ProjectCloner.from_name(clone_backend) if clone_backend else None,
+        schemata=schemata,
+        compilation_cache=cache,
+        solc_binary=solc,
+        bail=bail,
+        persistent=persistent,
+        network_urls=_network_urls(hardhat_networks),
+        mutation_processes=mutation_processes,
+        timeout_policy=TimeoutPolicy(timeout_multiplier, timeout_floor),
+    )
+
+    try:
+        campaign.setup()
+        click.echo("[*] Checking validity of project")
+        if not campaign.valid():
+            click.echo("[-] We couldn't get valid results by running the tests.\n Aborting")
+            return
+        campaign.store_compilation_results()
+
+        click.echo("[*] Evaluating mutants for {}".format(coordinator))
+        evaluated = Worker(coordinator, campaign, threads=max(network_pool.size, 1)).run()
+    finally:
+        campaign.teardown()
+
+    click.echo("[*] Done! Evaluated {} mutants".format(evaluated))
+
+
+def _hardhat_networks(hardhat_parallel, hardhat_node=False, hardhat_port=DEFAULT_HARDHAT_PORT):
+    """ Describes the networks of parallel hardhat runs
+
+    :return: (name, port) of every network, the port is None for hardhat's in-process network
+    """
+    if not hardhat_parallel:
+        return []
+    if hardhat_node:
+        return [(f"vertigo_{index}", hardhat_port + index) for index in range(hardhat_parallel)]
+    return [(f"hardhat_{index}", None) for index in range(hardhat_parallel)]
+
+
+def _network_urls(hardhat_networks):
+    """ Returns the json rpc urls of the standalone hardhat networks """
+    return {name: f"http://127.0.0.1:{port}" for name, port in hardhat_networks if port is not None}
+
+
+def _create_network_pool(project_type, network, ganache_path, ganache_network, ganache_network_options,
+                         hardhat_networks, processes=False, snapshots=False, standby=0, endpoints=(),
+                         health_check_interval=None, project_directory=None):
+    """ Creates the network pool described by the command line options
+
+    With processes set, the pool can be shared by forked worker processes, its networks are not health checked. With
+    snapshots set, dynamic networks are
+    kept running and reverted to their initial state between mutants. Standby is the amount of dynamic networks that
+    are started in the background. Endpoints are name=url pairs of static networks that are health checked.
+    Standalone hardhat networks are started in the project directory, and are always reverted to a snapshot unless
+    processes is set.
+    """
+    endpoints = dict(endpoint.split("=", 1) for endpoint in endpoints)
+    if processes:
+        static_pool = ProcessStaticNetworkPool
+    else:
+        static_pool = lambda networks: StaticNetworkPool(
+            networks, endpoints=endpoints, health_check_interval=health_check_interval
+        )
+    network_pool = None
+    if hardhat_networks:
+        if project_type != "hardhat":
+            click.echo("[+] Not running analysis on hardhat project, ignoring hardhat parallel option")
+        elif hardhat_networks[0][1] is None:
+            network_pool = static_pool([name for name, _ in hardhat_networks])
+        else:
+            builder = lambda port: HardhatNode(["npx", "hardhat"], port, str(project_directory))
+            if processes:
+                network_pool = ProcessDynamicNetworkPool(hardhat_networks, builder)
+            else:
+                network_pool = DynamicNetworkPool(
+                    hardhat_networks, builder, snapshots=True, health_check_interval=health_check_interval
+                )
+
+    if network_pool and (network or ganache_network):
+        click.echo("[*] Both a hardhat network pool is set up and custom networks. Only using hardhat networks")
+    elif network:
+        network_pool = static_pool(network)
+    elif ganache_network:
+        builder = lambda port: Ganache(port, ganache_network_options.split(' ') if ganache_network_options else [],
+                                       ganache_path)
+        if processes:
+            if snapshots or standby:
+                click.echo("[*] Dynamic networks are not shared between processes, ignoring snapshots and standby")
+            network_pool = ProcessDynamicNetworkPool(ganache_network, builder)
+        else:
+            network_pool = DynamicNetworkPool(
+                ganache_network, builder, snapshots=snapshots, standby=standby,
+                health_check_interval=health_check_interval
+            )
+    return network_pool
+
+
+def _create_campaign(project_type, project_path, network_pool, truffle_location="truffle", network_urls=None,
+                     **options):
+    """ Creates the campaign for the project, options are passed on to the campaign
+
+    Network urls are the json rpc urls of standalone hardhat networks, they are only used by hardhat campaigns.
+    """
+    try:
+        if project_type == "truffle":
+            return TruffleCampaign(
+                truffle_location=truffle_location,
+                project_directory=project_path,
+                network_pool=network_pool,
+                **options
+            )
+        if project_type == "hardhat":
+            return HardhatCampaign(
+                hardhat_command=["npx", "hardhat"],
+                project_directory=project_path,
+                network_pool=network_pool,
+                network_urls=network_urls,
+                **options
+            )
+    except:
+        click.echo("[-] Encountered an error while setting up the core campaign")
+        if isinstance(network_pool, DynamicNetworkPool):
+            networks = network_pool.claimed_networks.keys()
+        else:
+            networks = network_pool.claimed_networks[:]
+        for node in networks:
+            click.echo(f"[+] Cleaning up network: {node}")
+            network_pool.yield_network(node)
+        raise
+
+
 def _directory_type(working_directory: str):
     """ Determines the current framework in the current directory """
     wd = Path(working_directory)
@@ -1,27 +1,43 @@
+import asyncio
 import logging
+import multiprocessing
 from abc import abstractmethod, ABC
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
+from queue import Queue
 from time import time
-from typing import List, Callable
+from typing import AsyncIterator, Dict, Iterator, List, Callable, Optional, Tuple
 
 from jinja2 import PackageLoader, Environment
 
 from eth_vertigo.core import Mutation, MutationResult
 from eth_vertigo.core import TestSuggester
 from eth_vertigo.core.filter import MutationFilter
+from eth_vertigo.coverage import CoverageIndex, CoverageInstrumentation, CoverageSuggester
 from eth_vertigo.core.network import NetworkPool
+from eth_vertigo.core.scheduler import CostAwareScheduler, Schedule
+from eth_vertigo.core.timeout import TimeoutPolicy
+from eth_vertigo.core.timing import phase, NETWORK_WAIT
+from eth_vertigo.interfaces.common.solc import SolcEquivalenceChecker, SolcSource
 from eth_vertigo.interfaces.generics import Compiler, Tester
 from eth_vertigo.mutator.mutator import Mutator
+from eth_vertigo.mutator.schemata import MutantSchemata
 from eth_vertigo.mutator.solidity.solidity_mutator import SolidityMutator
 from eth_vertigo.mutator.source_file import SourceFile
 from eth_vertigo.test_runner.exceptions import EquivalentMutant
 from eth_vertigo.test_runner.exceptions import TestRunException, TimedOut
+from eth_vertigo.test_runner.test_result import TestResult
 
 environment = Environment(
         loader=PackageLoader("eth_vertigo.core"), trim_blocks=True
     )
 
+# Times that a mutation is evaluated before it is given up on, a mutation is evaluated again when no network could be
+# claimed for it
+EVALUATION_ATTEMPTS = 3
+
 
 class CampaignReport:
     def __init__(self, mutations):
@@ -56,6 +72,65 @@ class CampaignReport:
         )
 
 
+# The campaign that the current worker process works for, inherited from the parent when it forks
+_process_campaign = None  # type: Campaign
+
+
+def _initialize_process(slots) -> None:
+    _process_campaign.bind_worker(slots.get())
+
+
+def _test_mutation_in_process(index: int) -> Tuple[Optional[str], List[str], float, Dict[str, float]]:
+    """ Evaluates the mutation with the given index, and returns its result as plain picklable values """
+    mutation = _process_campaign.mutations[index]
+    _process_campaign.evaluate_mutation(mutation)
+    result = mutation.result.name if mutation.result else None
+    return result, mutation.crime_scenes, mutation.duration, mutation.timings
+
+
+def _generate_mutations_in_process(index: int) -> List[Tuple[Tuple[int, int, int], str]]:
+    """ Generates the mutations of the source with the given index, and returns them as (location, value) pairs """
+    source = _process_campaign.sources[index]
+    return [
+        (mutation.location, mutation.value)
+        for mutator in _process_campaign.mutators
+        for mutation in mutator.mutate(source, _process_campaign.project_directory)
+    ]
+
+
+def _iterate_async(generator: AsyncIterator) -> Iterator:
+    """ Iterates over an asynchronous generator, driving it on a private event loop
+
+    Closing the iterator (or an interrupt while waiting for the next item) closes the asynchronous generator.
+    """
+    async def next_item():
+        return await generator.__anext__()
+
+    loop = asyncio.new_event_loop()
+    # Blocking calls of the evaluations run on this executor, it is shut down when the iteration ends
+    executor = ThreadPoolExecutor()
+    loop.set_default_executor(executor)
+    # Before python 3.8 the child watcher needs the current event loop to wait for test processes
+    asyncio.set_event_loop(loop)
+    step = None
+    try:
+        while True:
+            step = loop.create_task(next_item())
+            try:
+                item = loop.run_until_complete(step)
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        if step is not None and not step.done():
+            step.cancel()
+            loop.run_until_complete(asyncio.gather(step, return_exceptions=True))
+        loop.run_until_complete(generator.aclose())
+        executor.shutdown(wait=True)
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
 class Campaign:
     """
     A core campaign class orchestrates and manages a core testing run
@@ -73,22 +148,193 @@ class Campaign:
         """ Sets up the campaign for execution"""
         raise NotImplementedError
 
-    def run(self, progress_callback: Callable, threads=1):
+    def run(self, progress_callback: Callable, threads=1, processes=False, asynchronous=False):
         """ Starts a core testing campaign"""
         if not self.is_set_up:
             raise ValueError("This campaign is not setup yet")
 
-        report = CampaignReport(self.mutations)
-        with ThreadPoolExecutor(max_workers=threads) as e:
-            for mutation in self.mutations:
-                e.submit(self.test_mutation, mutation, progress_callback)
-            e.shutdown()
-        return report
+        for _ in self.stream(threads=threads, processes=processes, asynchronous=asynchronous):
+            progress_callback()
+        return CampaignReport(self.mutations)
+
+    def schedule(self, scheduler: CostAwareScheduler, slots: int) -> Schedule:
+        """ Reorders the mutations of this campaign according to the scheduler
+
+        Only mutations without a result are scheduled, mutations that already have a result are kept in front.
+
+        :param scheduler: The scheduler that determines the order
+        :param slots: Amount of mutations that are evaluated in parallel
+        :return: The resulting schedule
+        """
+        evaluated = [mutation for mutation in self.mutations if mutation.result is not None]
+        schedule = scheduler.schedule([mutation for mutation in self.mutations if mutation.result is None], slots)
+        self.mutations = evaluated + schedule.mutations
+        return schedule
+
+    def stream(self, threads=1, processes=False, asynchronous=False) -> Iterator[Mutation]:
+        """ Starts a core testing campaign, yielding every mutation as soon as its result is known
+
+        Mutations are yielded in the order in which they complete. Mutations that already have a result (e.g. because
+        they were restored from a journal) are not evaluated again. Mutations that could not be evaluated because no
+        network was available are yielded without a result. Closing the generator stops the campaign, the mutations
+        that are still being tested are finished and the remaining ones are skipped.
+
+        :param threads: Amount of mutations that are evaluated in parallel
+        :param processes: Whether the mutations are evaluated in forked worker processes instead of threads, this
+            requires a network pool that can be shared between processes
+        :param asynchronous: Whether the mutations are evaluated by tasks on an event loop instead of threads, see
+            stream_async
+        """
+        if not self.is_set_up:
+            raise ValueError("This campaign is not setup yet")
+
+        if processes:
+            yield from self._stream_processes(threads)
+            return
+        if asynchronous:
+            yield from _iterate_async(self.stream_async(threads))
+            return
+
+        executor = ThreadPoolExecutor(max_workers=threads)
+        futures = {
+            executor.submit(self.evaluate_mutation, mutation): mutation
+            for mutation in self.mutations if mutation.result is None
+        }
+        try:
+            for future in as_completed(futures):
+                yield futures[future]
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    async def stream_async(self, concurrency=1) -> AsyncIterator[Mutation]:
+        """ Asynchronous variant of stream, the mutations are evaluated by tasks on the running event loop
+
+        Test processes are awaited instead of occupying a thread each. Closing the generator cancels the evaluations
+        that are still running, which kills their test processes.
+
+        :param concurrency: Amount of mutations that are evaluated concurrently
+        """
+        if not self.is_set_up:
+            raise ValueError("This campaign is not setup yet")
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def evaluate(mutation: Mutation) -> Mutation:
+            async with semaphore:
+                begin = time()
+                try:
+                    for _ in range(EVALUATION_ATTEMPTS):
+                        await self.test_mutation_async(mutation)
+                        if mutation.result is not None:
+                            break
+                    else:
+                        logging.warning(f"Could not evaluate mutation {mutation.identity}, no network was available")
+                except Exception as e:
+                    logging.warning(f"Could not evaluate mutation: {e}")
+                    mutation.result = MutationResult.ERROR
+                finally:
+                    mutation.duration = time() - begin
+            return mutation
+
+        tasks = [asyncio.ensure_future(evaluate(mutation)) for mutation in self.mutations if mutation.result is None]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _stream_processes(self, processes: int) -> Iterator[Mutation]:
+        """ Evaluates the mutations in forked worker processes
+
+        The worker processes inherit the campaign when they are forked, so a work item is just the index of a mutation
+        and a result is a tuple of plain values. Each worker process is bound to its own slot of the campaign's
+        resources (e.g. a sandbox). At most one work item per process is handed to the pool at a time, such that
+        closing the generator only has to wait for the mutations that are being tested.
+        """
+        global _process_campaign
+        context = multiprocessing.get_context("fork")
+        slots = context.Queue()
+        for slot in range(processes):
+            slots.put(slot)
+
+        _process_campaign = self
+        pool = context.Pool(processes, _initialize_process, (slots,))
+        finished = Queue()
+        pending = deque(index for index, mutation in enumerate(self.mutations) if mutation.result is None)
+
+        def submit():
+            index = pending.popleft()
+            pool.apply_async(
+                _test_mutation_in_process, (index,),
+                callback=lambda values: finished.put((index, values, None)),
+                error_callback=lambda error: finished.put((index, None, error))
+            )
+
+        running = 0
+        try:
+            while pending and running < processes:
+                submit()
+                running += 1
+            while running:
+                index, values, error = finished.get()
+                running -= 1
+                if pending:
+                    submit()
+                    running += 1
+
+                mutation = self.mutations[index]
+                if error is None:
+                    result, crime_scenes, duration, timings = values
+                    # Without a result the mutation could not be evaluated, because no network was available
+                    mutation.result = MutationResult[result] if result else None
+                    mutation.crime_scenes = crime_scenes
+                    mutation.duration = duration
+                    mutation.timings = timings
+                else:
+                    logging.warning(f"Worker process failed to evaluate a mutation: {error}")
+                    mutation.result = MutationResult.ERROR
+                yield mutation
+        finally:
+            pool.close()
+            pool.join()
+            _process_campaign = None
+
+    def bind_worker(self, index: int):
+        """ Restricts this campaign to the resources of the worker process with the given index """
+        pass
+
+    def evaluate_mutation(self, mutation: Mutation):
+        """ Evaluates the mutation, again if no network could be claimed for it
+
+        A mutation that could not be evaluated within the EVALUATION_ATTEMPTS keeps None as its result, such that it
+        does not count towards the mutation score.
+        """
+        begin = time()
+        try:
+            for _ in range(EVALUATION_ATTEMPTS):
+                self.test_mutation(mutation, lambda: None)
+                if mutation.result is not None:
+                    break
+            else:
+                logging.warning(f"Could not evaluate mutation {mutation.identity}, no network was available")
+        finally:
+            mutation.duration = time() - begin
 
     def test_mutation(self, mutation: Mutation, done_callback: Callable):
-        """ Run the test suite using a core and check for murders """
+        """ Run the test suite using a core and check for murders
+
+        The result of the mutation is left None if it could not be evaluated, e.g. because no network was available.
+        """
         raise NotImplementedError
 
+    async def test_mutation_async(self, mutation: Mutation):
+        """ Asynchronous variant of test_mutation, by default test_mutation is executed on a thread """
+        await asyncio.get_event_loop().run_in_executor(None, partial(self.test_mutation, mutation, lambda: None))
+
     def valid(self):
         """ Checks whether the current project is valid """
         raise NotImplementedError
@@ -97,6 +343,10 @@ class Campaign:
         """ Stores compilation results for trivial compiler equivalence"""
         raise NotImplementedError
 
+    def teardown(self):
+        """ Releases the resources that were acquired during setup """
+        pass
+
 
 class BaseCampaign(ABC, Campaign):
     def __init__(
@@ -110,7 +360,11 @@ class BaseCampaign(ABC, Campaign):
             source_file_builder: Callable[[Path, str], SourceFile],
 
             filters=None,
-            suggesters=None
+            suggesters=None,
+            schemata: bool = False,
+            solc_binary: str = None,
+            timeout_policy: TimeoutPolicy = None,
+            mutation_processes: int = 1
     ):
         super().__init__(filters=filters, suggesters=suggesters)
 
@@ -123,17 +377,29 @@ class BaseCampaign(ABC, Campaign):
 
         self.sources = list(self._get_sources())
         self.base_run_time = None
+        self.baseline_results = {}  # type: Dict[str, TestResult]
         self.network_pool = network_pool
         self.bytecodes = {}
 
         self.mutators = mutators
         self.mutators.append(SolidityMutator())
 
+        self.use_schemata = schemata
+        self.schemata = None  # type: MutantSchemata
+        self.solc_binary = solc_binary
+        self.timeout_policy = timeout_policy or TimeoutPolicy()
+        # Amount of processes that generate the mutations of the source files in parallel
+        self.mutation_processes = mutation_processes
+
     @abstractmethod
     def _get_sources(self, dir=None):
         """ Implements basic mutator file discovery """
         pass
 
+    def _get_solc_sources(self) -> Dict[str, SolcSource]:
+        """ Returns the source units of the project as they were passed to the compiler """
+        return {}
+
     def valid(self):
         """ Checks whether the current project is valid """
         begin = time()
@@ -152,58 +418,137 @@ class BaseCampaign(ABC, Campaign):
         self.base_run_time = time() - begin
         if test_result is None:
             return False
+        self.baseline_results = test_result
+        # A mutant holds its network for at most two test runs (the suggested tests, then the strict suggestions)
+        self.network_pool.limit_claim_wait(2 * self._timeout())
 
         return all([result.success for result in test_result.values()])
 
     def setup(self):
-        for source in self.sources:
-            for mutator in self.mutators:
-                self.mutations += mutator.mutate(source, self.project_directory)
+        self.mutations += self._generate_mutations()
         for f in self.filters:
             self.mutations = f.apply(self.mutations)
+        if self.use_schemata:
+            self.schemata = MutantSchemata.build(self.mutations)
+        self.tester.prepare(max(self.network_pool.size, 1), self.schemata)
         self.is_set_up = True
 
+    def _generate_mutations(self) -> List[Mutation]:
+        """ Generates the mutations of all sources, ordered by source and then by mutator
+
+        With more than one mutation process, every source file is a task for a forked worker process. The workers
+        inherit the sources and mutators, and only send back the location and value of each mutation. The order does
+        not depend on the amount of processes, so sampling and incremental matching stay reproducible.
+        """
+        if self.mutation_processes <= 1 or len(self.sources) <= 1:
+            return [
+                mutation
+                for source in self.sources
+                for mutator in self.mutators
+                for mutation in mutator.mutate(source, self.project_directory)
+            ]
+
+        global _process_campaign
+        _process_campaign = self
+        try:
+            pool = multiprocessing.get_context("fork").Pool(self.mutation_processes)
+            try:
+                chunk_size = max(len(self.sources) // (self.mutation_processes * 4), 1)
+                descriptions = pool.map(_generate_mutations_in_process, range(len(self.sources)), chunk_size)
+            finally:
+                pool.close()
+                pool.join()
+        finally:
+            _process_campaign = None
+
+        return [
+            Mutation(location, source, value, self.project_directory)
+            for source, described in zip(self.sources, descriptions)
+            for location, value in described
+        ]
+
+    def teardown(self):
+        """ Removes the sandboxes that were created during setup, and stops the networks that are kept running """
+        self.tester.cleanup()
+        self.network_pool.close()
+
+    def bind_worker(self, index: int):
+        """ Restricts this campaign to the resources of the worker process with the given index """
+        self.tester.bind_worker(index)
+
+
+    def _timeout(self, test_names: List[str] = None) -> float:
+        return self.timeout_policy.timeout(self.base_run_time, self.baseline_results, test_names)
+
+    def _suggest_tests(self, mutation: Mutation) -> Tuple[List[str], Optional[List[str]]]:
+        """ Collects the test suggestions for the mutation
+
+        :return: (tests to run first, the only tests to run or None if all tests should be ran)
+        """
+        suggestions = []
+        strict_suggestions = None
+        for suggester in self.suggesters:
+            suggested = suggester.suggest_tests(mutation)
+            if not suggester.is_strict:
+                suggestions.extend(suggested)
+            elif suggested is not None:
+                strict_suggestions = sorted(set(suggested).union(strict_suggestions or []))
+
+        if strict_suggestions is not None:
+            suggestions = [test for test in suggestions if test in strict_suggestions]
+        return suggestions, strict_suggestions
+
+    @staticmethod
+    def _record_killers(mutation: Mutation, test_result: Dict[str, TestResult]) -> bool:
+        """ Marks the mutation as killed if any of the tests failed
+
+        :return: Whether the mutation was killed
+        """
+        killers = [test for test in test_result.values() if not test.success]
+        if killers:
+            mutation.result = MutationResult.KILLED
+            mutation.crime_scenes = [killer.full_title for killer in killers]
+        return bool(killers)
 
     def test_mutation(self, mutation: Mutation, done_callback: Callable):
         """ Run the test suite using a core and check for murders """
         mutation.result = MutationResult.LIVED
+        mutation.timings = {}
+        suggestions, strict_suggestions = self._suggest_tests(mutation)
+        if strict_suggestions is not None and not strict_suggestions:
+            # None of the tests execute the mutated code
+            done_callback()
+            return
+
         try:
-            network = self.network_pool.claim()
-        except ValueError:
-            mutation.result = MutationResult.ERROR
+            with phase(mutation.timings, NETWORK_WAIT):
+                network = self.network_pool.claim()
+        except ValueError as e:
+            # The mutation was not tested, so it is left without a result instead of counting as an error
+            logging.warning(f"Could not claim a network: {e}")
+            mutation.result = None
+            done_callback()
             return
-        suggestions = []
-        for suggester in self.suggesters:
-            if suggester.is_strict:
-                # Not yet Implemented
-                continue
-            suggestions.extend(suggester.suggest_tests(mutation))
 
         try:
             try:
                 test_result = self.tester.run_tests(
                     mutation=mutation,
-                    timeout=int(self.base_run_time) * 2,
+                    timeout=self._timeout(suggestions or strict_suggestions),
                     network=network,
                     original_bytecode=self.bytecodes,
-                    keep_test_names=suggestions if suggestions else None
+                    keep_test_names=suggestions or strict_suggestions
                 )
-                killers = [test for test in test_result.values() if not test.success]
-                if killers:
-                    mutation.result = MutationResult.KILLED
-                    mutation.crime_scenes = [killer.full_title for killer in killers]
-                elif suggestions:
+                if not self._record_killers(mutation, test_result) and suggestions:
                     # If the suggestions didn't lead to a killer
                     test_result = self.tester.run_tests(
                         mutation=mutation,
-                        timeout=int(self.base_run_time) * 2,
+                        timeout=self._timeout(strict_suggestions),
                         network=network,
                         original_bytecode=self.bytecodes,
+                        keep_test_names=strict_suggestions
                     )
-                    killers = [test for test in test_result.values() if not test.success]
-                    if killers:
-                        mutation.result = MutationResult.KILLED
-                        mutation.crime_scenes = [killer.full_title for killer in killers]
+                    self._record_killers(mutation, test_result)
             except EquivalentMutant:
                 mutation.result = MutationResult.EQUIVALENT
         except TimedOut:
@@ -214,10 +559,103 @@ class BaseCampaign(ABC, Campaign):
         except Exception as e:
             print(e)
         finally:
+            if mutation.result in (MutationResult.ERROR, MutationResult.TIMEDOUT):
+                self.network_pool.report_failure(network)
             self.network_pool.yield_network(network)
             done_callback()
             return
 
+    async def test_mutation_async(self, mutation: Mutation):
+        """ Asynchronous variant of test_mutation, the network and test runs are awaited """
+        mutation.result = MutationResult.LIVED
+        mutation.timings = {}
+        suggestions, strict_suggestions = self._suggest_tests(mutation)
+        if strict_suggestions is not None and not strict_suggestions:
+            # None of the tests execute the mutated code
+            return
+
+        try:
+            with phase(mutation.timings, NETWORK_WAIT):
+                network = await self.network_pool.claim_async()
+        except ValueError as e:
+            # The mutation was not tested, so it is left without a result instead of counting as an error
+            logging.warning(f"Could not claim a network: {e}")
+            mutation.result = None
+            return
+
+        try:
+            test_result = await self.tester.run_tests_async(
+                mutation=mutation,
+                timeout=self._timeout(suggestions or strict_suggestions),
+                network=network,
+                original_bytecode=self.bytecodes,
+                keep_test_names=suggestions or strict_suggestions
+            )
+            if not self._record_killers(mutation, test_result) and suggestions:
+                # If the suggestions didn't lead to a killer
+                test_result = await self.tester.run_tests_async(
+                    mutation=mutation,
+                    timeout=self._timeout(strict_suggestions),
+                    network=network,
+                    original_bytecode=self.bytecodes,
+                    keep_test_names=strict_suggestions
+                )
+                self._record_killers(mutation, test_result)
+        except EquivalentMutant:
+            mutation.result = MutationResult.EQUIVALENT
+        except TimedOut:
+            mutation.result = MutationResult.TIMEDOUT
+        except TestRunException as e:
+            logging.warning(str(e))
+            mutation.result = MutationResult.ERROR
+        finally:
+            if mutation.result in (MutationResult.ERROR, MutationResult.TIMEDOUT):
+                self.network_pool.report_failure(network)
+            await self.network_pool.yield_network_async(network)
+
+    def collect_coverage(self) -> bool:
+        """ Runs the test suite once on instrumented sources to find out which tests execute which statements
+
+        Afterwards only the tests that execute the mutated statement are ran for each mutation, mutations of statements
+        that no test executes are considered to have lived.
+
+        :return: Whether coverage could be collected
+        """
+        instrumentation = CoverageInstrumentation()
+        for source in {source.file: source for source in self.sources}.values():
+            ast = getattr(source, "ast", None)
+            if not isinstance(ast, dict):
+                continue
+            relative_path = str(source.file.relative_to(self.project_directory))
+            instrumentation.instrument(relative_path, ast, source.file.read_text("utf-8"))
+        if not instrumentation.sources:
+            return False
+
+        try:
+            network = self.network_pool.claim()
+        except ValueError:
+            return False
+        try:
+            report = self.tester.run_coverage(instrumentation.sources, network=network)
+        except (TestRunException, TimedOut) as e:
+            logging.warning(f"Could not collect coverage: {e}")
+            report = None
+        finally:
+            self.network_pool.yield_network(network)
+
+        if report is None:
+            return False
+        index = CoverageIndex.from_report(instrumentation, report, self.baseline_results.keys())
+        if index.hit_count == 0:
+            # The network does not support console.log, so none of the probes reported back
+            logging.warning("The coverage run did not report any executed statements")
+            return False
+
+        self.suggesters.append(CoverageSuggester(index))
+        return True
+
     def store_compilation_results(self):
         """ Stores compilation results for trivial compiler equivalence"""
         self.bytecodes = self.compiler.get_bytecodes(working_directory=str(self.project_directory))
+        if self.solc_binary:
+            self.tester.equivalence_checker = SolcEquivalenceChecker(self.solc_binary, self._get_solc_sources())
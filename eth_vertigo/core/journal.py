@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+from eth_vertigo.core.mutation import Mutation, MutationResult
+
+
+class CampaignJournal:
+    """ Append-only journal of mutation results
+
+    Every result is written as a json line and flushed to disk as soon as the mutation is evaluated. A campaign that
+    is interrupted can be resumed from its journal, only the mutations without a result are evaluated again.
+    """
+
+    def __init__(self, file: Path):
+        """ Initializes the journal
+
+        :param file: The journal file, it is created if it does not exist yet
+        """
+        self.file = Path(file)
+        self.lock = threading.Lock()
+        self._handle = None
+
+    def load(self) -> Dict[str, Dict]:
+        """ Reads the results in the journal, indexed by mutation identity
+
+        A line that was only partially written (e.g. because vertigo was killed) is ignored.
+        """
+        records = {}
+        if not self.file.is_file():
+            return records
+        for line in self.file.read_text("utf-8").splitlines():
+            try:
+                record = json.loads(line)
+                records[record["identity"]] = record
+            except (ValueError, KeyError, TypeError):
+                continue
+        return records
+
+    def restore(self, mutations: List[Mutation]) -> int:
+        """ Restores the results of the given mutations from the journal
+
+        :return: The amount of mutations that were restored
+        """
+        records = self.load()
+        restored = 0
+        for mutation in mutations:
+            record = records.get(mutation.identity)
+            if record is None or record.get("result") not in MutationResult.__members__:
+                continue
+            mutation.result = MutationResult[record["result"]]
+            mutation.crime_scenes = record.get("crime_scenes", [])
+            mutation.duration = record.get("duration")
+            restored += 1
+        return restored
+
+    def record(self, mutation: Mutation) -> None:
+        """ Appends the result of the mutation to the journal """
+        line = json.dumps({
+            "identity": mutation.identity,
+            "file": mutation.relative_path,
+            "location": list(mutation.location),
+            "value": mutation.value,
+            "result": mutation.result.name if mutation.result else None,
+            "crime_scenes": mutation.crime_scenes,
+            "duration": mutation.duration,
+        })
+        with self.lock:
+            if self._handle is None:
+                self._handle = self.file.open("a", encoding="utf-8")
+                # Start on a fresh line in case the last write was interrupted
+                if self._handle.tell() > 0 and not self.file.read_bytes().endswith(b"\n"):
+                    self._handle.write("\n")
+            self._handle.write(line + "\n")
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        with self.lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
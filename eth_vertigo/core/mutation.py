@@ -1,3 +1,4 @@
+import hashlib
 from pathlib import Path
 from eth_vertigo.mutator.source_file import SourceFile
 from typing import Tuple
@@ -50,9 +51,32 @@ class Mutation:
         self.project_directory = project_directory
         self.value = value
 
+        # Value of the mutant switch that enables this mutation in a schematized build, see MutantSchemata
+        self.schema_id = None
+
         # The following parameters are used to track how and when this core was killed
         self.result = None
         self.crime_scenes = []
+        # Time in seconds that it took to evaluate this mutation
+        self.duration = None
+        # Time in seconds that the evaluation spent in each of its phases, see eth_vertigo.core.timing
+        self.timings = {}
+        self._identity = None
+
+    @property
+    def identity(self) -> str:
+        """ Identifier of this mutation that is stable across campaigns on the same sources
+
+        It is derived from the content of the mutated file, the location of the mutation and the replacement.
+        """
+        if self._identity is None:
+            digest = hashlib.sha256()
+            digest.update(self.relative_path.encode("utf-8") + b"\0")
+            digest.update(hashlib.sha256(self.source.file.read_bytes()).digest())
+            digest.update("{}:{}".format(self.location[0], self.location[1]).encode("utf-8") + b"\0")
+            digest.update(self.value.encode("utf-8"))
+            self._identity = digest.hexdigest()
+        return self._identity
 
     @property
     def relative_path(self):
@@ -1,3 +1,6 @@
+from eth_vertigo.core.network.node import LocalNode, NetworkStartError
 from eth_vertigo.core.network.ganache import Ganache
+from eth_vertigo.core.network.hardhat import HardhatNode
 
-from eth_vertigo.core.network.pool import NetworkPool, StaticNetworkPool, DynamicNetworkPool
\ No newline at end of file
+from eth_vertigo.core.network.pool import NetworkPool, StaticNetworkPool, DynamicNetworkPool, \
+    ProcessStaticNetworkPool, ProcessDynamicNetworkPool
@@ -1,13 +1,12 @@
-from subprocess import Popen, run, getoutput,  PIPE
-from typing import Optional
-from tempfile import TemporaryFile
-from time import sleep
-from loguru import logger
+from eth_vertigo.core.network.node import LocalNode, NetworkStartError, NODE_START_TIMEOUT
+
 DEFAULT_GANACHE_PARAMETERS = []  # ["--dbMemdown"]
+# Seconds that ganache may take to start listening
+GANACHE_START_TIMEOUT = NODE_START_TIMEOUT
 
 
-class Ganache:
-    def __init__(self, port, parameters, ganache_binary="ganache"):
+class Ganache(LocalNode):
+    def __init__(self, port, parameters, ganache_binary="ganache", start_timeout=GANACHE_START_TIMEOUT):
         # Remove any pre-set port options
         self.parameters = parameters
         self.parameters.extend(["--port", str(port)])
@@ -18,28 +17,4 @@ class Ganache:
             self.parameters.append(param)
 
         self.ganache_binary = ganache_binary
-        self.process = None  # type: Optional[subprocess.Popen]
-
-    def start(self):
-        if self.process is not None:
-            raise ValueError("Process has already been terminated")
-
-        self.process = Popen(
-            [self.ganache_binary] + self.parameters,
-            stderr=PIPE, stdout=PIPE
-        )
-
-        while True:
-            line = self.process.stdout.readline()
-            if "Listening on" in str(line):
-                break
-
-        if self.process.poll() is not None:
-            raise Exception("Could not create ganache network")
-
-    def stop(self):
-        if self.process is None:
-            raise ValueError("Process has not yet been started")
-        if self.process.poll():
-            raise ValueError("Process has already terminated")
-        self.process.terminate()
+        super().__init__([ganache_binary] + self.parameters, port, start_timeout=start_timeout)
@@ -0,0 +1,16 @@
+from typing import List
+
+from eth_vertigo.core.network.node import LocalNode, NODE_START_TIMEOUT
+
+
+class HardhatNode(LocalNode):
+    """ A standalone hardhat network, started with `hardhat node` in the project directory """
+
+    def __init__(self, hardhat_command: List[str], port: int, project_directory: str,
+                 start_timeout=NODE_START_TIMEOUT):
+        super().__init__(
+            hardhat_command + ["node", "--hostname", "127.0.0.1", "--port", str(port)],
+            port,
+            cwd=project_directory,
+            start_timeout=start_timeout
+        )
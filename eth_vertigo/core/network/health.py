@@ -0,0 +1,41 @@
+from time import time
+from typing import Optional
+
+from eth_vertigo.core.network.rpc import rpc_call, RpcError
+
+# Seconds that a healthy network may take to answer a ping
+DEFAULT_MAX_LATENCY = 5.0
+
+
+class NetworkStatistics:
+    """ Usage statistics of a single network """
+
+    def __init__(self):
+        self.claims = 0
+        # Test runs on the network that errored or timed out
+        self.failures = 0
+        # Total seconds that claims waited for the network
+        self.wait = 0.0
+        self.quarantines = 0
+        # Seconds that the last successful ping took
+        self.latency = None  # type: Optional[float]
+
+    @property
+    def average_wait(self) -> float:
+        return self.wait / self.claims if self.claims else 0.0
+
+
+def ping(url: str, max_latency: float = DEFAULT_MAX_LATENCY) -> Optional[float]:
+    """ Pings the network at the given url
+
+    :param url: Url of the network's json rpc endpoint
+    :param max_latency: Seconds that the network may take to answer
+    :return: The latency in seconds, or None if the network is unhealthy
+    """
+    begin = time()
+    try:
+        rpc_call(url, "net_version", timeout=max_latency)
+    except RpcError:
+        return None
+    latency = time() - begin
+    return latency if latency <= max_latency else None
@@ -0,0 +1,119 @@
+import socket
+from collections import deque
+from subprocess import Popen, PIPE, STDOUT, TimeoutExpired
+from threading import Thread
+from time import sleep, time
+from typing import List, Optional
+
+from eth_vertigo.core.network.rpc import rpc_request, RpcError
+
+# Seconds that a node may take to start listening
+NODE_START_TIMEOUT = 60
+# Seconds between two readiness probes
+PROBE_INTERVAL = 0.1
+# Seconds that a node has to keep running after it first answered, before it is considered started
+STARTUP_GRACE_PERIOD = 0.2
+
+
+class NetworkStartError(ValueError):
+    """ Raised when a network does not become ready, starting it again might succeed """
+    pass
+
+
+class LocalNode:
+    """ A network that runs as a local process and answers json rpc requests on a port """
+
+    def __init__(self, command: List[str], port: int, cwd: str = None, start_timeout=NODE_START_TIMEOUT):
+        """ Initializes the node
+
+        :param command: Command that starts the node
+        :param port: Port on which the node answers json rpc requests
+        :param cwd: Working directory of the node
+        :param start_timeout: Seconds that the node may take to start answering
+        """
+        self.command = command
+        self.port = port
+        self.cwd = cwd
+        self.start_timeout = start_timeout
+        self.process = None  # type: Optional[Popen]
+        self._output = deque(maxlen=20)
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+    def start(self):
+        """ Starts the node and waits until it answers json rpc requests
+
+        Raises a NetworkStartError if the port is already in use, or if the node exits or does not answer within the
+        start timeout, in which case the process is stopped and start can be called again.
+        """
+        if self.process is not None:
+            raise ValueError("Process has already been terminated")
+        # An answer from a node that is still running on the port (e.g. left over from a crashed run) would otherwise
+        # be mistaken for this node's readiness
+        if self._port_in_use():
+            raise NetworkStartError(f"Could not start {self.name}, port {self.port} is already in use")
+
+        self._output = deque(maxlen=20)
+        try:
+            self.process = Popen(self.command, stderr=STDOUT, stdout=PIPE, cwd=self.cwd)
+        except OSError as e:
+            raise NetworkStartError(f"Could not start {self.name}: {e}")
+        # Nodes log every request, the output has to be read or the node blocks once the pipe is full
+        reader = Thread(target=self._drain, args=(self.process, self._output), daemon=True)
+        reader.start()
+
+        deadline = time() + self.start_timeout
+        while True:
+            if self.process.poll() is not None:
+                reader.join(timeout=1)
+                self._abort()
+                raise NetworkStartError(f"{self.name} exited during startup:\n" + "\n".join(self._output))
+            try:
+                rpc_request(self.port, "net_version", timeout=1)
+            except RpcError:
+                pass
+            else:
+                # The node answered, make sure it is this process that did
+                sleep(STARTUP_GRACE_PERIOD)
+                if self.process.poll() is None:
+                    return
+                continue
+            if time() > deadline:
+                self._abort()
+                raise NetworkStartError(
+                    f"{self.name} did not answer on port {self.port} within {self.start_timeout}s"
+                )
+            sleep(PROBE_INTERVAL)
+
+    def stop(self):
+        if self.process is None:
+            raise ValueError("Process has not yet been started")
+        if self.process.poll() is not None:
+            raise ValueError("Process has already terminated")
+        self.process.terminate()
+        try:
+            # The port is only free once the process is gone
+            self.process.wait(timeout=10)
+        except TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def _port_in_use(self) -> bool:
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                return True
+        except OSError:
+            return False
+
+    def _abort(self):
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    @staticmethod
+    def _drain(process: Popen, output: deque):
+        for line in process.stdout:
+            output.append(line.decode("utf-8", errors="replace").rstrip())
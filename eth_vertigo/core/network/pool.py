@@ -1,16 +1,48 @@
 from abc import abstractmethod, ABC
+from functools import partial
+from queue import Empty
+from time import time
 from typing import Tuple, Callable, List, Dict
 
+import asyncio
+import multiprocessing
 import threading
 
+from loguru import logger
+
+from eth_vertigo.core.network.node import NetworkStartError
+from eth_vertigo.core.network.health import NetworkStatistics, ping, DEFAULT_MAX_LATENCY
+from eth_vertigo.core.network.rpc import rpc_request, RpcError
+
+# Minimal seconds that a process waits for another process to yield a network
+CLAIM_TIMEOUT = 5
+# Times that starting a dynamic network is attempted before a claim fails
+START_ATTEMPTS = 3
+
 class Network:
     def __init__(self, name: str, port: int, provider=None):
         self.name = name
         self.port = port
         self.provider = provider
+        # Id of the snapshot of the network's initial state
+        self.snapshot = None
+        # Whether the provider is running and the network is in its initial state
+        self.ready = False
 
 
 class NetworkPool(ABC):
+    def __init__(self, health_check_interval: float = None):
+        """ Initializes the statistics and the health monitor of the pool
+
+        :param health_check_interval: Seconds between two health checks of the networks that are not claimed, by
+            default the networks are only checked when they are yielded
+        """
+        self.statistics = {}  # type: Dict[str, NetworkStatistics]
+        self._statistics_lock = threading.Lock()
+        self._monitor_stopped = threading.Event()
+        if health_check_interval:
+            threading.Thread(target=self._monitor, args=(health_check_interval,), daemon=True).start()
+
     @abstractmethod
     def claim(self) -> str:
         pass
@@ -24,73 +56,246 @@ class NetworkPool(ABC):
     def size(self):
         pass
 
+    def close(self):
+        """ Releases the networks that the pool keeps running """
+        self._monitor_stopped.set()
+
+    def limit_claim_wait(self, seconds: float):
+        """ Sets how long a claim waits for a network to be yielded, pools whose claims do not time out ignore this
+
+        :param seconds: The longest that a network is expected to be claimed
+        """
+        pass
+
+    def report_failure(self, network: str):
+        """ Reports that a test run on the claimed network errored or timed out """
+        self._record(network, failures=1)
+
+    def check_health(self):
+        """ Checks the health of the networks that are not claimed """
+        pass
+
+    def _monitor(self, interval: float):
+        while not self._monitor_stopped.wait(interval):
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.warning(f"Could not check the health of the networks: {e}")
+
+    def _record(self, network: str, claims: int = 0, failures: int = 0, wait: float = 0.0, quarantines: int = 0):
+        with self._statistics_lock:
+            statistics = self.statistics.setdefault(network, NetworkStatistics())
+            statistics.claims += claims
+            statistics.failures += failures
+            statistics.wait += wait
+            statistics.quarantines += quarantines
+
+    def _ping(self, network: str, url: str, max_latency: float) -> bool:
+        """ Pings the network and records its latency
+
+        :return: Whether the network is healthy
+        """
+        latency = ping(url, max_latency)
+        if latency is not None:
+            with self._statistics_lock:
+                self.statistics.setdefault(network, NetworkStatistics()).latency = latency
+        return latency is not None
+
+    async def claim_async(self) -> str:
+        """ Asynchronous variant of claim """
+        return self.claim()
+
+    async def yield_network_async(self, network: str):
+        """ Asynchronous variant of yield_network """
+        self.yield_network(network)
+
 
 class StaticNetworkPool(NetworkPool):
-    def __init__(self, networks: List[str]):
+    def __init__(
+            self,
+            networks: List[str],
+            endpoints: Dict[str, str] = None,
+            max_latency: float = DEFAULT_MAX_LATENCY,
+            health_check_interval: float = None
+    ):
+        """ Initializes the pool
+
+        :param networks: Names of the networks
+        :param endpoints: Json rpc urls of the networks, networks with an url are health checked and quarantined while
+            they do not respond
+        :param max_latency: Seconds that a healthy network may take to answer a ping
+        :param health_check_interval: Seconds between two health checks of the networks that are not claimed
+        """
         self.available_networks = list(networks)
         self.claimed_networks = []
-        self.lock = threading.Lock()
+        self.quarantined_networks = []
+        self.endpoints = endpoints or {}
+        self.max_latency = max_latency
+        self.lock = threading.Condition()
+        super().__init__(health_check_interval if self.endpoints else None)
 
     def claim(self) -> str:
+        """ Claims a network, waiting for one to be yielded or released from quarantine if none is available
+
+        :raises ValueError: If every network of the pool is quarantined
+        """
         self.lock.acquire()
         try:
-            if not self.available_networks:
-                raise ValueError("No network available")
+            while not self.available_networks:
+                if not self.claimed_networks:
+                    raise ValueError("No network available")
+                # The claimed networks are yielded, or quarantined, eventually
+                self.lock.wait()
 
             network = self.available_networks.pop()
             self.claimed_networks.append(network)
-            return network
         finally:
             self.lock.release()
+        self._record(network, claims=1)
+        return network
 
     def yield_network(self, network: str):
         self.lock.acquire()
         try:
             if network not in self.claimed_networks:
                 raise ValueError("Trying to yield unclaimed network")
+        finally:
+            self.lock.release()
+
+        healthy = network not in self.endpoints or self._ping(network, self.endpoints[network], self.max_latency)
+        self.lock.acquire()
+        try:
+            # The network stays claimed during the ping, so concurrent claims wait for it instead of failing
             self.claimed_networks.remove(network)
-            self.available_networks.append(network)
+            if healthy:
+                self.available_networks.append(network)
+            else:
+                self._quarantine(network)
+            self.lock.notify_all()
+        finally:
+            self.lock.release()
+
+    def check_health(self):
+        """ Quarantines the available networks that do not respond, and releases the quarantined ones that do """
+        self.lock.acquire()
+        try:
+            candidates = [n for n in self.available_networks + self.quarantined_networks if n in self.endpoints]
         finally:
             self.lock.release()
 
+        for network in candidates:
+            healthy = self._ping(network, self.endpoints[network], self.max_latency)
+            self.lock.acquire()
+            try:
+                if not healthy and network in self.available_networks:
+                    self.available_networks.remove(network)
+                    self._quarantine(network)
+                elif healthy and network in self.quarantined_networks:
+                    logger.info(f"Network {network} responds again, releasing it from quarantine")
+                    self.quarantined_networks.remove(network)
+                    self.available_networks.append(network)
+                    self.lock.notify_all()
+            finally:
+                self.lock.release()
+
+    def _quarantine(self, network: str):
+        logger.warning(f"Network {network} does not respond, quarantining it")
+        self.quarantined_networks.append(network)
+        self._record(network, quarantines=1)
+
     @property
     def size(self):
         self.lock.acquire()
         try:
-            return len(self.available_networks) + len(self.claimed_networks)
+            return len(self.available_networks) + len(self.claimed_networks) + len(self.quarantined_networks)
         finally:
             self.lock.release()
 
 
 class DynamicNetworkPool(NetworkPool):
-    def __init__(self, networks: List[Tuple[str, int]], builder: Callable):
+    def __init__(
+            self,
+            networks: List[Tuple[str, int]],
+            builder: Callable,
+            snapshots: bool = False,
+            standby: int = 0,
+            max_latency: float = DEFAULT_MAX_LATENCY,
+            health_check_interval: float = None
+    ):
+        """ Initializes the pool
+
+        :param networks: Names and ports of the networks
+        :param builder: Creates the provider that runs the network on the given port
+        :param snapshots: Keep the networks running, and revert them to a snapshot of their initial state when they
+            are yielded instead of restarting them
+        :param standby: Amount of networks that are started in the background, such that a claim does not have to
+            wait for a network to start
+        :param max_latency: Seconds that a healthy network may take to answer a ping
+        :param health_check_interval: Seconds between two health checks of the running networks that are not claimed,
+            networks that do not respond are restarted
+        """
         self.available_networks = {n[0]: Network(n[0], n[1]) for n in networks}  # type: Dict
         self.claimed_networks = {}
         self.builder = builder
-        self.lock = threading.Lock()
+        self.snapshots = snapshots
+        self.standby = standby
+        # Seconds that each claim waited for its network
+        self.claim_waits = []  # type: List[float]
+        self.max_latency = max_latency
+        self.lock = threading.Condition()
+        self._warming = set()
+        self._closed = False
+        super().__init__(health_check_interval)
+        self._prewarm()
 
     def claim(self) -> str:
+        begin = time()
         self.lock.acquire()
         try:
-            if not self.available_networks:
-                raise ValueError("No network available")
+            while True:
+                ready = [n for n in self.available_networks.values() if n.ready]
+                cold = [n for n in self.available_networks.values() if not n.ready and n.name not in self._warming]
+                if ready or cold:
+                    break
+                if not self._warming:
+                    raise ValueError("No network available")
+                # All available networks are starting in the background
+                self.lock.wait()
 
-            # Claim one network from the available networks
-            network = self.available_networks.pop(list(self.available_networks.keys())[0])
+            # Claim one network from the available networks, preferring the ones that are already running
+            network = self.available_networks.pop((ready or cold)[0].name)
 
             # Put it in the claimed networks
             self.claimed_networks[network.name] = network
-            network.provider = self.builder(network.port)
+            if not network.ready:
+                network.provider = self.builder(network.port)
         finally:
             self.lock.release()
-        # Spin up the dynamic network
+
+        if not network.ready:
+            # Spin up the dynamic network
+            try:
+                self._start(network)
+            except Exception:
+                self.lock.acquire()
+                try:
+                    self.claimed_networks.pop(network.name)
+                    self.available_networks[network.name] = network
+                    self.lock.notify_all()
+                finally:
+                    self.lock.release()
+                raise
+        network.ready = False
+
+        self.lock.acquire()
         try:
-            network.provider.start()
-        except ValueError:
-            raise
+            self.claim_waits.append(time() - begin)
+        finally:
+            self.lock.release()
+        self._record(network.name, claims=1, wait=time() - begin)
+        self._prewarm()
         return network.name
 
-
     def yield_network(self, network: str):
         self.lock.acquire()
         try:
@@ -98,16 +303,152 @@ class DynamicNetworkPool(NetworkPool):
                 raise ValueError("Network not claimed")
 
             network = self.claimed_networks.pop(network)
+        finally:
+            self.lock.release()
 
+        if network.snapshot is not None and not (self._revert(network) and self._healthy(network)):
+            network.snapshot = None
+        if network.snapshot is None:
             # Spin down the dynamic network
             try:
                 network.provider.stop()
             except ValueError:
-                raise
+                if not self.snapshots:
+                    raise
+
+        # Yield the network back
+        self.lock.acquire()
+        try:
+            network.ready = network.snapshot is not None
             self.available_networks[network.name] = network
+            self.lock.notify_all()
         finally:
             self.lock.release()
-        # Yield the network back
+        self._prewarm()
+
+    def _healthy(self, network: Network) -> bool:
+        if self._ping(network.name, f"http://127.0.0.1:{network.port}", self.max_latency):
+            return True
+        logger.warning(f"Network {network.name} does not respond, restarting it")
+        self._record(network.name, quarantines=1)
+        return False
+
+    def check_health(self):
+        """ Stops the running networks that do not respond, such that they are restarted """
+        self.lock.acquire()
+        try:
+            candidates = [n for n in self.available_networks.values() if n.ready]
+        finally:
+            self.lock.release()
+
+        for network in candidates:
+            if self._healthy(network):
+                continue
+            self.lock.acquire()
+            try:
+                if self.available_networks.get(network.name) is not network or not network.ready:
+                    # The network was claimed in the meantime
+                    continue
+                network.ready = False
+                network.snapshot = None
+                try:
+                    network.provider.stop()
+                except ValueError:
+                    pass
+            finally:
+                self.lock.release()
+        self._prewarm()
+
+    def _start(self, network: Network):
+        for attempt in range(1, START_ATTEMPTS + 1):
+            try:
+                network.provider.start()
+                break
+            except NetworkStartError as e:
+                if attempt == START_ATTEMPTS:
+                    raise
+                logger.warning(f"Could not start network {network.name}, retrying: {e}")
+        if self.snapshots:
+            try:
+                network.snapshot = rpc_request(network.port, "evm_snapshot")
+            except RpcError as e:
+                logger.warning(f"Could not take a snapshot of network {network.name}: {e}")
+
+    def _prewarm(self):
+        """ Starts networks in the background, until there are standby networks ready to be claimed """
+        self.lock.acquire()
+        try:
+            if self._closed:
+                return
+            ready = len([n for n in self.available_networks.values() if n.ready])
+            cold = [n for n in self.available_networks.values() if not n.ready and n.name not in self._warming]
+            for network in cold[:max(self.standby - ready - len(self._warming), 0)]:
+                self._warming.add(network.name)
+                network.provider = self.builder(network.port)
+                threading.Thread(target=self._warm, args=(network,), daemon=True).start()
+        finally:
+            self.lock.release()
+
+    def _warm(self, network: Network):
+        try:
+            self._start(network)
+            ready = True
+        except Exception as e:
+            logger.warning(f"Could not start network {network.name} in the background: {e}")
+            ready = False
+
+        self.lock.acquire()
+        try:
+            self._warming.discard(network.name)
+            if ready and self._closed:
+                network.snapshot = None
+                network.provider.stop()
+                ready = False
+            network.ready = ready
+            self.lock.notify_all()
+        finally:
+            self.lock.release()
+
+    @staticmethod
+    def _revert(network: Network) -> bool:
+        """ Reverts the network to its initial state, a snapshot can only be reverted to once so a new one is taken
+
+        :return: Whether the network was reverted
+        """
+        try:
+            if rpc_request(network.port, "evm_revert", [network.snapshot]) is not True:
+                raise RpcError("evm_revert was refused")
+            network.snapshot = rpc_request(network.port, "evm_snapshot")
+            return True
+        except RpcError as e:
+            logger.warning(f"Restarting network {network.name}: {e}")
+            return False
+
+    def close(self):
+        """ Stops the networks that are kept running """
+        super().close()
+        self.lock.acquire()
+        try:
+            self._closed = True
+            for network in self.available_networks.values():
+                if not network.ready:
+                    continue
+                network.ready = False
+                network.snapshot = None
+                try:
+                    network.provider.stop()
+                except ValueError:
+                    pass
+        finally:
+            self.lock.release()
+
+    async def claim_async(self) -> str:
+        """ Claims a network, the dynamic network is started on a thread """
+        return await asyncio.get_event_loop().run_in_executor(None, self.claim)
+
+    async def yield_network_async(self, network: str):
+        """ Yields a network, the dynamic network is stopped on a thread """
+        await asyncio.get_event_loop().run_in_executor(None, partial(self.yield_network, network))
 
     @property
     def size(self):
@@ -116,3 +457,119 @@ class DynamicNetworkPool(NetworkPool):
             return len(self.available_networks) + len(self.claimed_networks)
         finally:
             self.lock.release()
+
+
+class ProcessStaticNetworkPool(StaticNetworkPool):
+    """ Static network pool that can be shared by worker processes
+
+    The available networks are kept in a multiprocessing queue, so the pool must be created before the worker
+    processes are forked. Every process only keeps track of the networks that it claimed itself.
+    """
+
+    def __init__(self, networks: List[str], context=None):
+        """ Initializes the pool
+
+        Networks are not health checked, a process can not release a network that another process quarantined.
+
+        :param networks: Names of the networks
+        :param context: Multiprocessing context that the worker processes are forked with
+        """
+        super().__init__([])
+        context = context or multiprocessing.get_context("fork")
+        self._size = len(networks)
+        self.available_networks = context.Queue()
+        for network in networks:
+            self.available_networks.put(network)
+        self.claim_timeout = CLAIM_TIMEOUT
+
+    def limit_claim_wait(self, seconds: float):
+        self.claim_timeout = max(seconds, CLAIM_TIMEOUT)
+
+    def claim(self) -> str:
+        try:
+            network = self.available_networks.get(timeout=self.claim_timeout)
+        except Empty:
+            raise ValueError("No network was yielded within {:.0f} seconds".format(self.claim_timeout))
+        with self.lock:
+            self.claimed_networks.append(network)
+        self._record(network, claims=1)
+        return network
+
+    def yield_network(self, network: str):
+        with self.lock:
+            if network not in self.claimed_networks:
+                raise ValueError("Trying to yield unclaimed network")
+            self.claimed_networks.remove(network)
+        self.available_networks.put(network)
+
+    async def claim_async(self) -> str:
+        return await asyncio.get_event_loop().run_in_executor(None, self.claim)
+
+    @property
+    def size(self):
+        return self._size
+
+
+class ProcessDynamicNetworkPool(DynamicNetworkPool):
+    """ Dynamic network pool that can be shared by worker processes
+
+    Only the names and ports of the available networks are shared between processes. A network is started by the
+    process that claims it, and stopped again when that process yields it.
+    """
+
+    def __init__(self, networks: List[Tuple[str, int]], builder: Callable, context=None):
+        """ Initializes the pool
+
+        Networks are neither snapshotted, pre-warmed nor health checked, since every process runs its own networks.
+
+        :param networks: Names and ports of the networks
+        :param builder: Creates the provider that runs the network on the given port
+        :param context: Multiprocessing context that the worker processes are forked with
+        """
+        super().__init__([], builder)
+        context = context or multiprocessing.get_context("fork")
+        self._size = len(networks)
+        self.available_networks = context.Queue()
+        for name, port in networks:
+            self.available_networks.put((name, port))
+        self.claim_timeout = CLAIM_TIMEOUT
+
+    def limit_claim_wait(self, seconds: float):
+        self.claim_timeout = max(seconds, CLAIM_TIMEOUT)
+
+    def claim(self) -> str:
+        begin = time()
+        try:
+            name, port = self.available_networks.get(timeout=self.claim_timeout)
+        except Empty:
+            raise ValueError("No network was yielded within {:.0f} seconds".format(self.claim_timeout))
+
+        network = Network(name, port, self.builder(port))
+        try:
+            self._start(network)
+        except Exception:
+            self.available_networks.put((name, port))
+            raise
+        with self.lock:
+            self.claimed_networks[name] = network
+            self.claim_waits.append(time() - begin)
+        self._record(name, claims=1, wait=time() - begin)
+        return name
+
+    def yield_network(self, network: str):
+        with self.lock:
+            if network not in self.claimed_networks:
+                raise ValueError("Network not claimed")
+            network = self.claimed_networks.pop(network)
+        try:
+            network.provider.stop()
+        finally:
+            self.available_networks.put((network.name, network.port))
+
+    def close(self):
+        """ Networks are stopped when they are yielded, so there is nothing to release """
+        NetworkPool.close(self)
+
+    @property
+    def size(self):
+        return self._size
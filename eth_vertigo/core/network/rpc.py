@@ -0,0 +1,42 @@
+import json
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+
+class RpcError(Exception):
+    """ Raised when a json rpc request to a network fails """
+    pass
+
+
+def rpc_request(port: int, method: str, params: list = None, host: str = "127.0.0.1", timeout: float = 10.0):
+    """ Sends a json rpc request to the network that listens on the given port
+
+    :param port: Port of the network
+    :param method: The rpc method, e.g. evm_snapshot
+    :param params: Parameters of the method
+    :param host: Host of the network
+    :param timeout: Seconds to wait for the network to respond
+    :return: The result of the request
+    """
+    return rpc_call(f"http://{host}:{port}", method, params, timeout)
+
+
+def rpc_call(url: str, method: str, params: list = None, timeout: float = 10.0):
+    """ Sends a json rpc request to the network at the given url
+
+    :param url: Url of the network's json rpc endpoint
+    :param method: The rpc method, e.g. evm_snapshot
+    :param params: Parameters of the method
+    :param timeout: Seconds to wait for the network to respond
+    :return: The result of the request
+    """
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params or []}).encode("utf-8")
+    request = Request(url, data=body, headers={"Content-Type": "application/json"})
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            reply = json.loads(response.read().decode("utf-8"))
+    except (URLError, OSError, ValueError) as e:
+        raise RpcError(f"{method} failed: {e}")
+    if "error" in reply:
+        raise RpcError(f"{method} failed: {reply['error']}")
+    return reply.get("result")
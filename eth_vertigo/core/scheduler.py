@@ -0,0 +1,102 @@
+import heapq
+from typing import Dict, List, Tuple
+
+from eth_vertigo.core.mutation import Mutation
+from eth_vertigo.incremental.store import IncrementalMutationStore, MutationRecord
+
+
+class CostModel:
+    """ Predicts how long it takes to evaluate a mutation and how likely it is to be killed
+
+    Without any history, every mutation is expected to take as long as the baseline test run. Mutations that were
+    killed before are expected to take as long as they did back then, since the tests that killed them are executed
+    first. Other mutations are weighed by the kill rate of their file: a killed mutation takes as long as the killed
+    mutations in that file did, a surviving one runs the whole test suite. Files without a kill rate fall back to the
+    average duration of their mutations.
+    """
+
+    def __init__(self, base_run_time: float, store: IncrementalMutationStore = None):
+        """ Initializes the cost model
+
+        :param base_run_time: Duration of the baseline test run
+        :param store: Incremental mutation store with the results of an earlier campaign
+        """
+        self.base_run_time = base_run_time or 0.0
+        self.file_durations = dict(store.file_durations) if store else {}  # type: Dict[str, float]
+        self.file_kill_rates = dict(store.file_kill_rates) if store else {}  # type: Dict[str, float]
+        self._killed = {}  # type: Dict[Tuple, MutationRecord]
+        kill_durations = {}  # type: Dict[str, List[float]]
+        for record in (store.known_mutations if store else []):
+            if record.duration is not None:
+                key = (record.source_file_name, record.original_text, record.new_text, record.line_number)
+                self._killed[key] = record
+                kill_durations.setdefault(record.source_file_name, []).append(record.duration)
+        self._kill_durations = {
+            name: sum(values) / len(values) for name, values in kill_durations.items()
+        }  # type: Dict[str, float]
+
+    def _record(self, mutation: Mutation):
+        key = (mutation.source_file_name, mutation.original_value, mutation.value, mutation.line_number)
+        return self._killed.get(key)
+
+    def kill_probability(self, mutation: Mutation) -> float:
+        """ Returns the probability that the given mutation is killed
+
+        Mutations that were killed before are expected to be killed again, others are killed as often as the
+        mutations in their file were. Without history a mutation is assumed to survive.
+        """
+        if self._record(mutation) is not None:
+            return 1.0
+        return self.file_kill_rates.get(mutation.source_file_name, 0.0)
+
+    def predict(self, mutation: Mutation) -> float:
+        """ Returns the expected duration in seconds of the evaluation of the given mutation """
+        record = self._record(mutation)
+        if record is not None:
+            return record.duration
+
+        file_name = mutation.source_file_name
+        if file_name in self.file_kill_rates and file_name in self._kill_durations:
+            kill_rate = self.file_kill_rates[file_name]
+            return kill_rate * self._kill_durations[file_name] + (1 - kill_rate) * self.base_run_time
+        return self.file_durations.get(file_name, self.base_run_time)
+
+
+class Schedule:
+    """ An ordering of mutations together with its predicted duration """
+
+    def __init__(self, mutations: List[Mutation], costs: List[float], expected_makespan: float):
+        """ Initializes the schedule
+
+        :param mutations: The mutations in the order in which they should be evaluated
+        :param costs: The predicted duration of each mutation
+        :param expected_makespan: The predicted duration of the whole campaign
+        """
+        self.mutations = mutations
+        self.costs = costs
+        self.expected_makespan = expected_makespan
+
+
+class CostAwareScheduler:
+    """ Orders mutations longest processing time first
+
+    Workers take the next mutation whenever they are done with their current one, handing out the most expensive
+    mutations first keeps a few long mutations from running on their own at the end of a campaign. Among mutations
+    with the same predicted duration, the ones that are least likely to be killed go first, their duration is the
+    least likely to be cut short.
+    """
+
+    def __init__(self, cost_model: CostModel):
+        self.cost_model = cost_model
+
+    def schedule(self, mutations: List[Mutation], slots: int) -> Schedule:
+        """ Orders the mutations for evaluation on the given amount of parallel slots """
+        costs = [self.cost_model.predict(mutation) for mutation in mutations]
+        survival = [1 - self.cost_model.kill_probability(mutation) for mutation in mutations]
+        order = sorted(range(len(mutations)), key=lambda i: (costs[i], survival[i]), reverse=True)
+
+        loads = [0.0] * max(slots, 1)
+        for i in order:
+            heapq.heappush(loads, heapq.heappop(loads) + costs[i])
+
+        return Schedule([mutations[i] for i in order], [costs[i] for i in order], max(loads))
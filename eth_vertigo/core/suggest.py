@@ -27,6 +27,6 @@ class TestSuggester(ABC):
 
         :param mutation: The subject mutation
 
-        :return List of tests to run
+        :return List of tests to run, strict suggesters return None if they can't restrict the tests to run
         """
         pass
@@ -0,0 +1,50 @@
+from typing import Dict, Iterable, Optional
+
+from eth_vertigo.test_runner.test_result import TestResult
+
+DEFAULT_TIMEOUT_MULTIPLIER = 2.0
+DEFAULT_TIMEOUT_FLOOR = 5.0
+
+
+class TimeoutPolicy:
+    """ Determines how long a mutant's test run may take
+
+    The expected duration of a test run is the fixed overhead of the baseline run (compilation, deployment, ...)
+    plus the baseline durations of the selected tests. The timeout is a multiple of this, but never less than the
+    floor.
+    """
+
+    def __init__(self, multiplier: float = DEFAULT_TIMEOUT_MULTIPLIER, floor: float = DEFAULT_TIMEOUT_FLOOR):
+        """ Initializes the timeout policy
+
+        :param multiplier: Factor by which a test run may exceed its expected duration
+        :param floor: Minimal timeout in seconds
+        """
+        self.multiplier = multiplier
+        self.floor = floor
+
+    def timeout(
+            self,
+            base_run_time: float,
+            baseline_results: Dict[str, TestResult],
+            test_names: Optional[Iterable[str]] = None
+    ) -> float:
+        """ Computes the timeout for a test run
+
+        :param base_run_time: Duration in seconds of the baseline run of the whole test suite
+        :param baseline_results: The results of the baseline run
+        :param test_names: The tests that are selected for the run, None if all tests run
+        :return: The timeout in seconds
+        """
+        durations = {name: (result.duration or 0) / 1000 for name, result in baseline_results.items()}
+        total = sum(durations.values())
+        overhead = max((base_run_time or 0) - total, 0)
+
+        expected = total
+        if test_names is not None:
+            test_names = list(test_names)
+            # Tests that were not part of the baseline have an unknown duration
+            if all(name in durations for name in test_names):
+                expected = sum(durations[name] for name in test_names)
+
+        return max((overhead + expected) * self.multiplier, self.floor)
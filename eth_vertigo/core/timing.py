@@ -0,0 +1,99 @@
+import json
+from contextlib import contextmanager
+from math import ceil
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional
+
+# Phases of a mutant's evaluation, in the order in which they happen
+SANDBOX_COPY = "sandbox_copy"
+INSTRUMENT_CONFIGURATION = "instrument_configuration"
+APPLY_MUTATION = "apply_mutation"
+COMPILE = "compile"
+TEST_COMMAND = "test_command"
+PARSE_OUTPUT = "parse_output"
+NETWORK_WAIT = "network_wait"
+CLEANUP = "cleanup"
+
+PHASES = [
+    NETWORK_WAIT, SANDBOX_COPY, INSTRUMENT_CONFIGURATION, APPLY_MUTATION, COMPILE, TEST_COMMAND, PARSE_OUTPUT, CLEANUP
+]
+
+
+@contextmanager
+def phase(timings: Optional[Dict[str, float]], name: str):
+    """ Adds the wall-clock time spent in the with block to the phase's timing
+
+    Timings accumulate, so a phase that happens twice for a mutant (e.g. a second test run) is counted in full.
+
+    :param timings: The timings of a mutant, nothing is recorded if this is None
+    :param name: Name of the phase
+    """
+    begin = perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + perf_counter() - begin
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """ Returns the nearest-rank percentile of sorted samples """
+    return ordered[max(ceil(fraction * len(ordered)) - 1, 0)]
+
+
+class PhaseStatistics:
+    """ Aggregates the per phase timings of the mutants of a campaign """
+
+    def __init__(self):
+        self.samples = {}  # type: Dict[str, List[float]]
+
+    @staticmethod
+    def from_mutations(mutations: Iterable) -> "PhaseStatistics":
+        """ Aggregates the timings of the mutations that were evaluated """
+        statistics = PhaseStatistics()
+        for mutation in mutations:
+            statistics.record(mutation.timings)
+        return statistics
+
+    def record(self, timings: Dict[str, float]) -> None:
+        """ Records the timings of a single mutant """
+        for name, seconds in timings.items():
+            self.samples.setdefault(name, []).append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """ Returns the count, total, p50 and p95 in seconds of every phase that was recorded """
+        ordered_phases = [name for name in PHASES if name in self.samples]
+        ordered_phases += sorted(name for name in self.samples if name not in PHASES)
+        result = {}
+        for name in ordered_phases:
+            ordered = sorted(self.samples[name])
+            result[name] = {
+                "count": len(ordered),
+                "total": sum(ordered),
+                "p50": _percentile(ordered, 0.5),
+                "p95": _percentile(ordered, 0.95),
+            }
+        return result
+
+    def to_json(self) -> str:
+        return json.dumps({"phases": self.summary()}, indent=2)
+
+    def to_prometheus(self) -> str:
+        """ Renders the statistics as a summary metric in the prometheus text format """
+        lines = [
+            "# HELP vertigo_phase_seconds Wall-clock time spent per mutant in each phase of its evaluation",
+            "# TYPE vertigo_phase_seconds summary",
+        ]
+        for name, summary in self.summary().items():
+            lines.append('vertigo_phase_seconds{{phase="{}",quantile="0.5"}} {}'.format(name, summary["p50"]))
+            lines.append('vertigo_phase_seconds{{phase="{}",quantile="0.95"}} {}'.format(name, summary["p95"]))
+            lines.append('vertigo_phase_seconds_sum{{phase="{}"}} {}'.format(name, summary["total"]))
+            lines.append('vertigo_phase_seconds_count{{phase="{}"}} {}'.format(name, summary["count"]))
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: Path) -> None:
+        path.write_text(self.to_json(), "utf-8")
+
+    def write_prometheus(self, path: Path) -> None:
+        path.write_text(self.to_prometheus(), "utf-8")
@@ -0,0 +1,3 @@
+from eth_vertigo.coverage.instrument import CoverageInstrumentation
+from eth_vertigo.coverage.index import CoverageIndex
+from eth_vertigo.coverage.suggester import CoverageSuggester
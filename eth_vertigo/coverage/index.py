@@ -0,0 +1,69 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from eth_vertigo.core import Mutation
+from eth_vertigo.coverage.instrument import CoverageInstrumentation
+
+
+class CoverageIndex:
+    """ Maps the statements of the instrumented sources to the tests that execute them """
+
+    def __init__(
+            self,
+            probes: Dict[str, List[Tuple[int, int, int]]],
+            tests: Dict[str, Set[int]],
+            global_probes: Set[int],
+            all_tests: Iterable[str],
+            reliable_tests: Set[str]
+    ):
+        """ Initializes the coverage index
+
+        :param probes: The (probe id, start, end) of every instrumented statement, per source file
+        :param tests: The probes that each test executed
+        :param global_probes: Probes that were executed outside of any test, these count as covered by all tests
+        :param all_tests: The names of all tests in the test suite
+        :param reliable_tests: Tests that passed on the instrumented sources, the coverage of other tests is unknown
+        """
+        self.probes = probes
+        self.tests = tests
+        self.global_probes = global_probes
+        self.all_tests = sorted(all_tests)
+        self.reliable_tests = reliable_tests
+
+    @staticmethod
+    def from_report(instrumentation: CoverageInstrumentation, report: dict, all_tests: Iterable[str]):
+        """ Builds the index from the report of the coverage reporter """
+        return CoverageIndex(
+            instrumentation.probes,
+            {title: set(probes) for title, probes in report.get("tests", {}).items()},
+            set(report.get("global", [])),
+            all_tests,
+            set(report.get("passes", []))
+        )
+
+    @property
+    def hit_count(self) -> int:
+        """ Amount of distinct probes that were executed """
+        return len(set().union(self.global_probes, *self.tests.values()))
+
+    def _probe(self, relative_path: str, start: int, end: int) -> Optional[int]:
+        """ Returns the probe of the innermost statement that contains the range """
+        best = None
+        for probe_id, probe_start, probe_end in self.probes.get(relative_path, []):
+            if probe_start <= start and end <= probe_end:
+                if best is None or probe_end - probe_start < best[1]:
+                    best = (probe_id, probe_end - probe_start)
+        return best[0] if best else None
+
+    def covering_tests(self, mutation: Mutation) -> Optional[List[str]]:
+        """ Returns the tests that can detect the mutation
+
+        :return: The covering tests, or None if the coverage of the mutated code is not known
+        """
+        start = mutation.location[0]
+        probe = self._probe(mutation.relative_path, start, start + mutation.location[1])
+        if probe is None or probe in self.global_probes:
+            return None
+        return [
+            title for title in self.all_tests
+            if title not in self.reliable_tests or probe in self.tests.get(title, ())
+        ]
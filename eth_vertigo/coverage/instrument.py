@@ -0,0 +1,78 @@
+from typing import Dict, List, Tuple
+
+from eth_vertigo.mutator.schemata import _walk, _get_src
+
+# Probes log through the console.log precompile of hardhat network, which prints the message in the test process
+CONSOLE_ADDRESS = "0x000000000000000000636F6e736F6c652e6c6f67"
+PROBE_PREFIX = "__vertigo_probe:"
+
+_PROBE_HELPER = \
+    "\n    function __vertigoProbeView{id}(string memory __vertigoMessage) internal view {{" \
+    " (bool __vertigoOk, ) = address(" + CONSOLE_ADDRESS + ").staticcall(" \
+    "abi.encodeWithSignature(\"log(string)\", __vertigoMessage)); __vertigoOk; }}" \
+    "\n    function __vertigoProbeCast{id}(function(string memory) internal view __vertigoIn)" \
+    " internal pure returns (function(string memory) internal pure __vertigoOut) {{" \
+    " assembly {{ __vertigoOut := __vertigoIn }} }}" \
+    "\n    function __vertigoProbe{id}(string memory __vertigoMessage) internal pure {{" \
+    " __vertigoProbeCast{id}(__vertigoProbeView{id})(__vertigoMessage); }}\n"
+
+_PROBE = "__vertigoProbe{contract_id}(\"" + PROBE_PREFIX + "{probe_id}\"); "
+
+
+class CoverageInstrumentation:
+    """ Statement coverage instrumentation
+
+    A probe is inserted in front of every statement in the bodies of functions and modifiers. When the statement
+    is executed, the probe logs its id.
+    """
+
+    def __init__(self):
+        self.sources = {}  # type: Dict[str, str]
+        # The (start, end) range of the statement of each probe, per source file
+        self.probes = {}  # type: Dict[str, List[Tuple[int, int, int]]]
+        self._next_id = 1
+
+    def instrument(self, relative_path: str, ast: dict, text: str) -> None:
+        """ Instruments a source file
+
+        :param relative_path: Path of the file relative to the project directory
+        :param ast: The ast of the file
+        :param text: The content of the file
+        """
+        edits = []
+        probes = []
+        contracts = set()
+        for node, contract, in_body in _walk(ast):
+            if not in_body or contract is None or contract.get("contractKind") == "interface":
+                continue
+            if node["nodeType"] not in ("Block", "UncheckedBlock"):
+                continue
+            for statement in node.get("statements") or []:
+                try:
+                    src = _get_src(statement["src"])
+                except (KeyError, ValueError):
+                    continue
+                probe_id = self._next_id
+                self._next_id += 1
+                probes.append((probe_id, src[0], src[0] + src[1]))
+                edits.append((src[0], _PROBE.format(contract_id=contract["id"], probe_id=probe_id)))
+                contracts.add(contract["id"])
+
+        if not probes:
+            return
+
+        for node, _, _ in _walk(ast):
+            if node["nodeType"] == "ContractDefinition" and node["id"] in contracts:
+                src = _get_src(node["src"])
+                edits.append((src[0] + src[1] - 1, _PROBE_HELPER.format(id=node["id"])))
+
+        result = []
+        cursor = 0
+        for position, edit_text in sorted(edits, key=lambda e: e[0]):
+            result.append(text[cursor:position])
+            result.append(edit_text)
+            cursor = position
+        result.append(text[cursor:])
+
+        self.sources[relative_path] = "".join(result)
+        self.probes[relative_path] = probes
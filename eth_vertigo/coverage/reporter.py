@@ -0,0 +1,74 @@
+from json import loads, JSONDecodeError
+from typing import Optional
+
+from eth_vertigo.coverage.instrument import PROBE_PREFIX
+
+REPORTER_FILE_NAME = ".vertigo-coverage-reporter.js"
+REPORT_MARKER = "__vertigo_coverage__"
+REPORTER_CONFIGURATION = \
+    "\nmodule.exports.mocha = {reporter: require(\"path\").join(__dirname, \"" + REPORTER_FILE_NAME + "\")};\n"
+
+# Mocha reporter that attributes the probes that are logged while a test or hook runs to the tests involved.
+# Probes logged in a hook count for all tests of the hook's suite, unless the hook runs for a single test.
+# Probes logged outside of any test or hook are reported as global.
+REPORTER_SOURCE = """
+const Mocha = require("mocha");
+const constants = Mocha.Runner.constants;
+const PROBE = /PROBE_PREFIX(\\d+)/;
+
+function allTests(suite) {
+  return suite.tests.concat(...suite.suites.map(allTests)).map(test => test.fullTitle());
+}
+
+class VertigoCoverageReporter {
+  constructor(runner) {
+    const tests = {};
+    const global = new Set();
+    const passes = [];
+    const hooks = [];
+    let current = null;
+
+    const write = process.stdout.write.bind(process.stdout);
+    process.stdout.write = (chunk, ...args) => {
+      const lines = chunk.toString().split("\\n").filter(line => {
+        const match = PROBE.exec(line);
+        if (!match) return true;
+        const scope = current ? [current] : hooks[hooks.length - 1];
+        if (!scope) {
+          global.add(Number(match[1]));
+        } else {
+          scope.forEach(title => (tests[title] = tests[title] || new Set()).add(Number(match[1])));
+        }
+        return false;
+      });
+      const text = lines.join("\\n");
+      return text ? write(text, ...args) : true;
+    };
+
+    runner.on(constants.EVENT_TEST_BEGIN, test => { current = test.fullTitle(); });
+    runner.on(constants.EVENT_TEST_END, () => { current = null; });
+    runner.on(constants.EVENT_TEST_PASS, test => passes.push(test.fullTitle()));
+    runner.on(constants.EVENT_HOOK_BEGIN, hook => hooks.push(hook.parent ? allTests(hook.parent) : null));
+    runner.on(constants.EVENT_HOOK_END, () => hooks.pop());
+    runner.once(constants.EVENT_RUN_END, () => {
+      process.stdout.write = write;
+      const report = {tests: {}, global: [...global], passes: passes};
+      for (const title in tests) report.tests[title] = [...tests[title]];
+      write("\\nREPORT_MARKER" + JSON.stringify(report) + "\\n");
+    });
+  }
+}
+
+module.exports = VertigoCoverageReporter;
+""".replace("PROBE_PREFIX", PROBE_PREFIX).replace("REPORT_MARKER", REPORT_MARKER)
+
+
+def parse_report(output: str) -> Optional[dict]:
+    """ Extracts the report of the coverage reporter from the output of a test run """
+    for line in output.splitlines():
+        if line.startswith(REPORT_MARKER):
+            try:
+                return loads(line[len(REPORT_MARKER):])
+            except JSONDecodeError:
+                return None
+    return None
@@ -0,0 +1,18 @@
+from typing import List, Optional
+
+from eth_vertigo.core import Mutation, TestSuggester
+from eth_vertigo.coverage.index import CoverageIndex
+
+
+class CoverageSuggester(TestSuggester):
+    """ Suggests exactly the tests that execute the mutated statement """
+
+    def __init__(self, index: CoverageIndex):
+        self._index = index
+
+    @property
+    def is_strict(self) -> bool:
+        return True
+
+    def suggest_tests(self, mutation: Mutation) -> Optional[List]:
+        return self._index.covering_tests(mutation)
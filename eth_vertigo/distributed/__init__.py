@@ -0,0 +1,2 @@
+from eth_vertigo.distributed.coordinator import Coordinator
+from eth_vertigo.distributed.worker import Worker
@@ -0,0 +1,176 @@
+import json
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from queue import Queue
+from time import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from eth_vertigo.core import Mutation
+from eth_vertigo.core.campaign import EVALUATION_ATTEMPTS
+from eth_vertigo.distributed.protocol import DEFAULT_LEASE_TIMEOUT, LEASE_PATH, HEARTBEAT_PATH, RESULT_PATH
+from eth_vertigo.distributed.protocol import work_item, apply_result
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    """ Http server that handles every request on its own thread (http.server.ThreadingHTTPServer needs python 3.7) """
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    coordinator = None  # type: Coordinator
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+            worker = str(request.get("worker", self.client_address[0]))
+            if self.path == LEASE_PATH:
+                response = self.coordinator.lease(worker)
+            elif self.path == HEARTBEAT_PATH:
+                response = self.coordinator.heartbeat(worker)
+            elif self.path == RESULT_PATH:
+                response = self.coordinator.complete(worker, request)
+            else:
+                self.send_error(404)
+                return
+        except (ValueError, TypeError) as e:
+            self.send_error(400, str(e))
+            return
+
+        body = json.dumps(response).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("Coordinator: " + format % args)
+
+
+class Coordinator:
+    """ Hands out mutations to workers over http, and collects their results
+
+    A worker leases one mutation at a time. A lease expires when the worker does not send a heartbeat in time, after
+    which the mutation is handed to another worker.
+    """
+
+    def __init__(
+            self,
+            mutations: List[Mutation],
+            host: str = "127.0.0.1",
+            port: int = 0,
+            lease_timeout: float = DEFAULT_LEASE_TIMEOUT
+    ):
+        """ Initializes the coordinator
+
+        :param mutations: The mutations to evaluate, in the order in which they should be handed out
+        :param host: Address to listen on, workers are not authenticated so only expose the coordinator on trusted
+            networks
+        :param port: Port to listen on, 0 picks a free port
+        :param lease_timeout: Duration in seconds after which the mutations of a silent worker are handed out again
+        """
+        self.lease_timeout = lease_timeout
+        # Identical mutations (e.g. created by different mutators) are evaluated once
+        self.mutations = {}  # type: Dict[str, List[Mutation]]
+        for mutation in mutations:
+            self.mutations.setdefault(mutation.identity, []).append(mutation)
+        self.pending = deque(self.mutations.keys())
+        self._count = len(mutations)
+        self.leases = {}  # type: Dict[str, Tuple[str, float]]
+        # Mutations whose result was streamed, and how often workers could not evaluate a mutation
+        self.completed = set()
+        self.attempts = {}  # type: Dict[str, int]
+        self.lock = threading.Lock()
+        self.results = Queue()
+
+        handler = type("CoordinatorHandler", (_Handler,), {"coordinator": self})
+        self.server = _Server((host, port), handler)
+        self._thread = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server.server_address[:2]
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _requeue_expired(self) -> None:
+        now = time()
+        for identity, (worker, deadline) in list(self.leases.items()):
+            if deadline < now:
+                logger.warning(f"Worker {worker} did not finish {identity} in time, handing it out again")
+                del self.leases[identity]
+                self.pending.appendleft(identity)
+
+    def lease(self, worker: str) -> Dict:
+        """ Hands out the next mutation to the worker
+
+        :return: The work item, or no item and whether the campaign is done
+        """
+        with self.lock:
+            self._requeue_expired()
+            if not self.pending:
+                return {"item": None, "done": not self.leases}
+            identity = self.pending.popleft()
+            self.leases[identity] = (worker, time() + self.lease_timeout)
+            return {"item": work_item(self.mutations[identity][0]), "done": False}
+
+    def heartbeat(self, worker: str) -> Dict:
+        """ Extends the leases of the worker """
+        with self.lock:
+            deadline = time() + self.lease_timeout
+            for identity, (owner, _) in list(self.leases.items()):
+                if owner == worker:
+                    self.leases[identity] = (owner, deadline)
+        return {}
+
+    def complete(self, worker: str, record: Dict) -> Dict:
+        """ Stores the result of a mutation
+
+        Late results of mutations that were handed out again are accepted too, the first result wins. A mutation that
+        a worker could not evaluate (e.g. because it had no network available) is handed out again, until it was
+        attempted EVALUATION_ATTEMPTS times. Only the worker that holds the lease of a mutation can give it back.
+        """
+        identity = record["identity"]
+        with self.lock:
+            mutations = self.mutations.get(identity)
+            if not mutations or identity in self.completed:
+                return {"accepted": False}
+            if record.get("result") is None:
+                if self.leases.get(identity, (None, None))[0] != worker:
+                    return {"accepted": False}
+                del self.leases[identity]
+                self.attempts[identity] = self.attempts.get(identity, 0) + 1
+                if self.attempts[identity] < EVALUATION_ATTEMPTS:
+                    logger.warning(f"Worker {worker} could not evaluate {identity}, handing it out again")
+                    if identity not in self.pending:
+                        self.pending.append(identity)
+                    return {"accepted": False}
+            self.leases.pop(identity, None)
+            self.completed.add(identity)
+            if identity in self.pending:
+                self.pending.remove(identity)
+            for mutation in mutations:
+                apply_result(mutation, record)
+        for mutation in mutations:
+            self.results.put(mutation)
+        return {"accepted": True}
+
+    def stream(self) -> Iterator[Mutation]:
+        """ Serves the mutations to workers, yielding every mutation as soon as a worker reports its result """
+        self.start()
+        try:
+            for _ in range(self._count):
+                yield self.results.get()
+        finally:
+            self.stop()
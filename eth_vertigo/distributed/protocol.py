@@ -0,0 +1,54 @@
+from typing import Dict
+
+from eth_vertigo.core import Mutation, MutationResult
+
+DEFAULT_LEASE_TIMEOUT = 60.0
+
+# Endpoints of the coordinator, all of them take and return json objects
+LEASE_PATH = "/lease"
+HEARTBEAT_PATH = "/heartbeat"
+RESULT_PATH = "/result"
+
+
+def work_item(mutation: Mutation) -> Dict:
+    """ Serializes a mutation into a work item """
+    return {
+        "identity": mutation.identity,
+        "relative_path": mutation.relative_path,
+        "location": list(mutation.location),
+        "value": mutation.value,
+    }
+
+
+def result_record(identity: str, mutation: Mutation) -> Dict:
+    """ Serializes the result of an evaluated work item """
+    return {
+        "identity": identity,
+        "result": mutation.result.name if mutation.result else None,
+        "crime_scenes": mutation.crime_scenes,
+        "duration": mutation.duration,
+        "timings": mutation.timings,
+    }
+
+
+def error_record(identity: str) -> Dict:
+    """ Serializes the result of a work item that could not be evaluated """
+    return {
+        "identity": identity,
+        "result": MutationResult.ERROR.name,
+        "crime_scenes": [],
+        "duration": None,
+        "timings": {},
+    }
+
+
+def apply_result(mutation: Mutation, record: Dict) -> None:
+    """ Stores the result in the record on the mutation, a record without a result was not evaluated """
+    result = record.get("result")
+    if result is None:
+        mutation.result = None
+    else:
+        mutation.result = MutationResult[result] if result in MutationResult.__members__ else MutationResult.ERROR
+    mutation.crime_scenes = record.get("crime_scenes") or []
+    mutation.duration = record.get("duration")
+    mutation.timings = record.get("timings") or {}
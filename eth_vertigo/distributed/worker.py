@@ -0,0 +1,123 @@
+import json
+import threading
+import uuid
+from time import sleep
+from typing import Dict, Optional
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from loguru import logger
+
+from eth_vertigo.core import Mutation
+from eth_vertigo.core.campaign import Campaign
+from eth_vertigo.distributed.protocol import DEFAULT_LEASE_TIMEOUT, LEASE_PATH, HEARTBEAT_PATH, RESULT_PATH
+from eth_vertigo.distributed.protocol import result_record, error_record
+
+
+class Worker:
+    """ Evaluates mutations that it leases from a coordinator
+
+    The worker uses its own campaign, so its own network pool and sandboxes. Work items are matched with the
+    mutations of the local campaign by their identity, such that settings like mutant schemata apply. Items that
+    are not known locally are reported as errors without being applied, a worker only ever changes its project the
+    way its own campaign would.
+    """
+
+    def __init__(
+            self,
+            coordinator_url: str,
+            campaign: Campaign,
+            threads: int = 1,
+            name: str = None,
+            poll_interval: float = 1.0,
+            heartbeat_interval: float = DEFAULT_LEASE_TIMEOUT / 3
+    ):
+        """ Initializes the worker
+
+        :param coordinator_url: Url of the coordinator, e.g. http://coordinator:8000
+        :param campaign: A campaign that is set up and validated
+        :param threads: Amount of mutations to evaluate in parallel
+        :param name: Name of this worker, used to track its leases
+        :param poll_interval: Time to wait before asking for work again when none is available
+        :param heartbeat_interval: Time in between heartbeats, this should be well below the lease timeout
+        """
+        self.coordinator_url = coordinator_url.rstrip("/")
+        self.campaign = campaign
+        self.threads = threads
+        self.name = name or uuid.uuid4().hex
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.evaluated = 0
+        self._local = {mutation.identity: mutation for mutation in campaign.mutations}  # type: Dict[str, Mutation]
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def _request(self, path: str, payload: Dict) -> Dict:
+        payload = dict(payload, worker=self.name)
+        request = Request(
+            self.coordinator_url + path,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urlopen(request, timeout=30) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    def _resolve(self, item: Dict) -> Optional[Mutation]:
+        """ Returns the local mutation of the work item, or None if the item is not a mutation of this campaign """
+        mutation = self._local.get(item.get("identity"))
+        if mutation is None:
+            return None
+        mutation.result = None
+        mutation.crime_scenes = []
+        return mutation
+
+    def _work(self) -> None:
+        while not self._stopped.is_set():
+            response = self._request(LEASE_PATH, {})
+            item = response.get("item")
+            if item is None:
+                if response.get("done"):
+                    return
+                sleep(self.poll_interval)
+                continue
+
+            mutation = self._resolve(item)
+            if mutation is None:
+                logger.warning(f"Mutation {item.get('identity')} is not known to this worker, reporting an error")
+                self._request(RESULT_PATH, error_record(item.get("identity")))
+                continue
+
+            self.campaign.evaluate_mutation(mutation)
+            self._request(RESULT_PATH, result_record(item["identity"], mutation))
+            with self._lock:
+                self.evaluated += 1
+
+    def _work_until_done(self) -> None:
+        try:
+            self._work()
+        except (URLError, OSError, ValueError) as e:
+            logger.warning(f"Lost connection with the coordinator: {e}")
+            self._stopped.set()
+
+    def _heartbeat(self) -> None:
+        while not self._stopped.wait(self.heartbeat_interval):
+            try:
+                self._request(HEARTBEAT_PATH, {})
+            except (URLError, OSError, ValueError) as e:
+                logger.debug(f"Could not send heartbeat: {e}")
+
+    def run(self) -> int:
+        """ Evaluates mutations until the coordinator has no work left
+
+        :return: The amount of mutations that this worker evaluated
+        """
+        heartbeat = threading.Thread(target=self._heartbeat, daemon=True)
+        heartbeat.start()
+        workers = [threading.Thread(target=self._work_until_done) for _ in range(max(self.threads, 1))]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self._stopped.set()
+        return self.evaluated
@@ -1,7 +1,7 @@
 from typing import List
 
 from eth_vertigo.incremental.store import MutationRecord, IncrementalMutationStore
-from eth_vertigo.core import Mutation
+from eth_vertigo.core import Mutation, MutationResult
 
 
 class IncrementalRecorder:
@@ -13,6 +13,18 @@ class IncrementalRecorder:
                 [m for m in mutations if m.crime_scenes]
             )
         )
+
+        durations = {}
+        for mutation in mutations:
+            if mutation.duration is not None:
+                durations.setdefault(mutation.source_file_name, []).append(mutation.duration)
+        store.file_durations = {name: sum(values) / len(values) for name, values in durations.items()}
+
+        kills = {}
+        for mutation in mutations:
+            if mutation.result in (MutationResult.KILLED, MutationResult.LIVED):
+                kills.setdefault(mutation.source_file_name, []).append(mutation.result == MutationResult.KILLED)
+        store.file_kill_rates = {name: sum(values) / len(values) for name, values in kills.items()}
         return store
 
     @staticmethod
@@ -24,4 +36,5 @@ class IncrementalRecorder:
         result.location = ":".join(map(str, mutation.location))
         result.line_number = mutation.line_number
         result.crime_scenes = mutation.crime_scenes
+        result.duration = mutation.duration
         return result
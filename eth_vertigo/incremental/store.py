@@ -6,16 +6,26 @@ from pathlib import Path
 class IncrementalMutationStore:
     def __init__(self):
         self.known_mutations = []  # type: List[MutationRecord]
+        # Average duration in seconds of evaluating a mutation, per source file name
+        self.file_durations = {}  # type: Dict[str, float]
+        # Fraction of the killed or surviving mutations that were killed, per source file name
+        self.file_kill_rates = {}  # type: Dict[str, float]
 
     @property
     def yaml(self):
-        return yaml.dump({"known_mutations": [m.as_dict for m in self.known_mutations]})
+        return yaml.dump({
+            "known_mutations": [m.as_dict for m in self.known_mutations],
+            "file_durations": self.file_durations,
+            "file_kill_rates": self.file_kill_rates
+        })
 
     @staticmethod
     def from_yaml(data):
         values = yaml.safe_load(data)
         result = IncrementalMutationStore()
         result.known_mutations = [MutationRecord.from_dict(record) for record in values.get("known_mutations", [])]
+        result.file_durations = values.get("file_durations", {})
+        result.file_kill_rates = values.get("file_kill_rates", {})
         return result
 
     @staticmethod
@@ -41,6 +51,7 @@ class MutationRecord:
         self.source_file_name = None
         self.new_text = None
         self.crime_scenes = []  # type: List[str]
+        self.duration = None
 
     @staticmethod
     def from_dict(data: Dict):
@@ -51,6 +62,7 @@ class MutationRecord:
         result.source_file_name = data.get("source_file_name", "")
         result.new_text = data.get("new_text", "")
         result.crime_scenes = data.get("crime_scenes", [])
+        result.duration = data.get("duration")
         return result
 
     @property
@@ -0,0 +1,144 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, Type
+
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on windows
+    fcntl = None
+
+# ioctl request number to clone a file on copy-on-write file systems (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+DEFAULT_DEPENDENCY_DIRECTORIES = ("node_modules",)
+
+
+class CloneBackend:
+    """ A clone backend implements the strategy used to clone directories that vertigo never modifies
+
+    The default implementation copies the bytes of every file.
+    """
+    name = "copy"
+    # Whether clones have to be on the file system of the original to be cheap (hard links and reflinks are)
+    same_file_system = False
+
+    def clone_file(self, source: Path, target: Path) -> None:
+        """ Clones a single file
+
+        :param source: The file to clone
+        :param target: The location of the clone
+        """
+        shutil.copy2(str(source), str(target))
+
+    def clone_tree(self, source: Path, target: Path) -> None:
+        """ Clones a directory tree
+
+        :param source: The directory to clone
+        :param target: The location of the clone, this should not exist yet
+        """
+        target.mkdir()
+        with os.scandir(str(source)) as entries:
+            for entry in entries:
+                entry_target = target / entry.name
+                if entry.is_symlink():
+                    os.symlink(os.readlink(entry.path), str(entry_target))
+                elif entry.is_dir():
+                    self.clone_tree(Path(entry.path), entry_target)
+                else:
+                    self.clone_file(Path(entry.path), entry_target)
+
+
+class HardlinkBackend(CloneBackend):
+    """ Clones files by creating hard links, this falls back to copying if linking is not possible """
+    name = "hardlink"
+    same_file_system = True
+
+    def __init__(self):
+        self._supported = True
+
+    def clone_file(self, source: Path, target: Path) -> None:
+        if self._supported:
+            try:
+                os.link(str(source), str(target))
+                return
+            except OSError as e:
+                logger.warning(f"Could not create hard links, dependency directories are copied instead: {e}")
+                self._supported = False
+        super().clone_file(source, target)
+
+
+class ReflinkBackend(CloneBackend):
+    """ Clones files using copy-on-write reflinks, this falls back to copying if reflinks are not supported """
+    name = "reflink"
+    same_file_system = True
+
+    def __init__(self):
+        self._supported = fcntl is not None
+
+    def clone_file(self, source: Path, target: Path) -> None:
+        if self._supported:
+            try:
+                with open(str(source), "rb") as src, open(str(target), "wb") as dst:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                shutil.copystat(str(source), str(target))
+                return
+            except OSError as e:
+                logger.warning(f"Could not create reflinks, dependency directories are copied instead: {e}")
+                self._supported = False
+        super().clone_file(source, target)
+
+
+class SymlinkBackend(CloneBackend):
+    """ Does not clone directories at all, instead it creates a symbolic link to the original directory """
+    name = "symlink"
+
+    def clone_tree(self, source: Path, target: Path) -> None:
+        os.symlink(str(source.absolute()), str(target), target_is_directory=True)
+
+
+CLONE_BACKENDS = {
+    backend.name: backend for backend in (CloneBackend, HardlinkBackend, ReflinkBackend, SymlinkBackend)
+}  # type: Dict[str, Type[CloneBackend]]
+
+
+class ProjectCloner:
+    """ Clones a project directory
+
+    Dependency directories such as node_modules are never modified by vertigo, they are cloned using the
+    configured backend. Everything else (contracts, tests, configuration files) is copied, since vertigo rewrites
+    these files in place.
+    """
+
+    def __init__(self, backend: CloneBackend = None, dependency_directories: Iterable[str] = None):
+        """ Initializes the project cloner
+
+        :param backend: The backend to use for dependency directories
+        :param dependency_directories: Names of top level directories that are never modified
+        """
+        self.backend = backend or CloneBackend()
+        self.dependency_directories = set(dependency_directories or DEFAULT_DEPENDENCY_DIRECTORIES)
+
+    def clone(self, source: str, target: str) -> None:
+        """ Clones the project at source into the (existing) target directory """
+        source_path = Path(source)
+        target_path = Path(target)
+        for item in source_path.iterdir():
+            item_target = target_path / item.name
+            if item.is_symlink():
+                os.symlink(os.readlink(str(item)), str(item_target))
+            elif item.is_dir() and item.name in self.dependency_directories:
+                self.backend.clone_tree(item, item_target)
+            elif item.is_dir():
+                shutil.copytree(str(item), str(item_target), symlinks=True)
+            else:
+                shutil.copy2(str(item), str(item_target))
+
+    @staticmethod
+    def from_name(name: str) -> "ProjectCloner":
+        """ Creates a project cloner using the backend with the given name """
+        if name not in CLONE_BACKENDS:
+            raise ValueError(f"Unknown clone backend: {name}")
+        return ProjectCloner(CLONE_BACKENDS[name]())
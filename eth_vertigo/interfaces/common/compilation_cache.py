@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from tempfile import mkdtemp
+from time import time
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+DEFAULT_CACHE_SIZE = 1024 * 1024 * 1024
+
+_LOCK_FILES = ("package-lock.json", "yarn.lock", "pnpm-lock.yaml")
+_IGNORED_DIRECTORIES = ("node_modules", ".git", "build", "artifacts", "cache")
+
+
+def _directory_size(directory: Path) -> int:
+    size = 0
+    for root, _, files in os.walk(str(directory)):
+        for file in files:
+            try:
+                size += os.lstat(os.path.join(root, file)).st_size
+            except OSError:
+                continue
+    return size
+
+
+def project_fingerprint(project_directory: str, configuration_files: Iterable[str] = ()) -> str:
+    """ Computes a hash of everything in the project that influences compilation
+
+    This covers the solidity sources of the project, the framework configuration and the dependency lock files.
+    """
+    digest = hashlib.sha256()
+    project = Path(project_directory)
+    for name in sorted(set(configuration_files) | set(_LOCK_FILES)):
+        path = project / name
+        if path.is_file():
+            digest.update(name.encode("utf-8"))
+            digest.update(path.read_bytes())
+
+    for root, directories, files in os.walk(str(project)):
+        directories[:] = sorted(d for d in directories if d not in _IGNORED_DIRECTORIES)
+        for file in sorted(files):
+            if not file.endswith(".sol"):
+                continue
+            path = Path(root) / file
+            digest.update(str(path.relative_to(project)).encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class CompilationCache:
+    """ Content addressed cache of compilation results
+
+    Entries are keyed by the hash of a mutated source together with the compiler settings, and hold the build
+    outputs and the (metadata stripped) bytecodes of the compilation. The cache is bounded in size, the least
+    recently used entries are evicted first.
+    """
+
+    def __init__(self, directory: Path, max_size: int = DEFAULT_CACHE_SIZE):
+        """ Initializes the compilation cache
+
+        :param directory: Directory where the cache entries are stored
+        :param max_size: Maximum size of the cache in bytes
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._size = sum(entry["size"] for entry in self._entries())
+
+    @staticmethod
+    def key(settings: str, relative_path: str, content: bytes) -> str:
+        """ Computes the cache key for a compilation
+
+        :param settings: Fingerprint of the compiler settings and the unmodified project
+        :param relative_path: Path of the mutated source file
+        :param content: Content of the mutated source file
+        """
+        digest = hashlib.sha256()
+        for part in (settings.encode("utf-8"), relative_path.encode("utf-8"), content):
+            digest.update(len(part).to_bytes(8, "big"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def _entry_directory(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def _entries(self) -> List[Dict]:
+        entries = []
+        for meta_file in self.directory.glob("*/*/meta.json"):
+            try:
+                meta = json.loads(meta_file.read_text("utf-8"))
+                meta["directory"] = meta_file.parent
+                meta["last_used"] = meta_file.stat().st_mtime
+                entries.append(meta)
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def get(self, key: str, target_directory: str, build_directories: List[str]) -> Optional[Dict[str, str]]:
+        """ Restores the cached build outputs into the target directory
+
+        :return: The cached bytecodes, or None if there is no entry for this key
+        """
+        entry = self._entry_directory(key)
+        try:
+            bytecodes = json.loads((entry / "bytecodes.json").read_text("utf-8"))
+            for build_directory in build_directories:
+                target = Path(target_directory) / build_directory
+                if target.is_dir():
+                    shutil.rmtree(str(target))
+                cached = entry / "build" / build_directory
+                if cached.is_dir():
+                    shutil.copytree(str(cached), str(target), symlinks=True)
+            os.utime(str(entry / "meta.json"), None)
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+        return bytecodes
+
+    def put(self, key: str, source_directory: str, build_directories: List[str], bytecodes: Dict[str, str]):
+        """ Stores the build outputs in the source directory and the bytecodes under the given key """
+        entry = self._entry_directory(key)
+        if entry.exists():
+            return
+
+        staging = Path(mkdtemp(dir=str(self.directory), prefix=".staging-"))
+        try:
+            for build_directory in build_directories:
+                source = Path(source_directory) / build_directory
+                if source.is_dir():
+                    shutil.copytree(str(source), str(staging / "build" / build_directory), symlinks=True)
+            (staging / "bytecodes.json").write_text(json.dumps(bytecodes), "utf-8")
+            size = _directory_size(staging)
+            (staging / "meta.json").write_text(json.dumps({"key": key, "size": size, "created": time()}), "utf-8")
+
+            entry.parent.mkdir(exist_ok=True)
+            os.rename(str(staging), str(entry))
+        except OSError as e:
+            # Another worker might have stored the same compilation in the mean time
+            logger.debug(f"Could not store compilation {key} in the cache: {e}")
+            shutil.rmtree(str(staging), ignore_errors=True)
+            return
+
+        with self.lock:
+            self._size += size
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self) -> None:
+        """ Removes the least recently used entries until the cache fits its maximum size """
+        entries = sorted(self._entries(), key=lambda e: e["last_used"])
+        self._size = sum(entry["size"] for entry in entries)
+        for entry in entries:
+            if self._size <= self.max_size:
+                break
+            shutil.rmtree(str(entry["directory"]), ignore_errors=True)
+            self._size -= entry["size"]
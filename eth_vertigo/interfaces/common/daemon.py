@@ -0,0 +1,140 @@
+import json
+import threading
+from collections import deque
+from queue import Queue, Empty
+from subprocess import Popen, PIPE, STDOUT
+from time import time
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from eth_vertigo.interfaces.common.tester import MochaStreamParser, parse_mocha_stream_line, _kill_process_group
+from eth_vertigo.test_runner import TestResult
+from eth_vertigo.test_runner.exceptions import TestRunException, TimedOut
+
+# Prefix of the lines that the daemon writes for vertigo, any other output of the tests is ignored
+DAEMON_MARKER = "__vertigo_daemon__"
+# Seconds that a daemon may take to load the framework
+DAEMON_START_TIMEOUT = 120
+
+
+class TestDaemon:
+    """ A long-lived test process in a sandbox
+
+    The daemon loads the test framework once, and then runs the tests of the sandbox whenever it is asked to. Requests
+    are json lines on the daemon's stdin, the daemon answers with json lines on stdout that are prefixed with the
+    DAEMON_MARKER. The answers use the events of mocha's json-stream reporter ("pass", "fail" and "end"), and an
+    "error" event for runs that could not be started. The daemon announces that it is ready with a "ready" event.
+    """
+
+    def __init__(
+            self,
+            command: List[str],
+            working_directory: str,
+            environment: Dict[str, str] = None,
+            network: Optional[str] = None
+    ):
+        """ Initializes the daemon
+
+        :param command: Command that starts the daemon
+        :param working_directory: The sandbox in which the daemon runs
+        :param environment: Environment of the daemon process
+        :param network: Name of the network that the tests of the daemon use
+        """
+        self.command = command
+        self.working_directory = working_directory
+        self.environment = environment
+        self.network = network
+        self._process = None  # type: Optional[Popen]
+        self._events = Queue()
+        self._output = deque(maxlen=20)
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self, timeout=DAEMON_START_TIMEOUT) -> None:
+        """ Starts the daemon and waits until it is ready """
+        self._events = Queue()
+        self._process = Popen(
+            self.command, stdin=PIPE, stdout=PIPE, stderr=STDOUT, cwd=self.working_directory, env=self.environment,
+            start_new_session=True
+        )
+        threading.Thread(target=self._read, args=(self._process, self._events), daemon=True).start()
+        kind, data = self._next_event(time() + timeout)
+        if kind != "ready":
+            self.stop()
+            raise TestRunException(f"The test daemon did not start: {data.get('message', kind)}")
+        logger.debug(f"Started test daemon in {self.working_directory}")
+
+    def stop(self) -> None:
+        """ Stops the daemon """
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        _kill_process_group(self._process)
+        self._process = None
+
+    def run(
+            self,
+            grep: Optional[str] = None,
+            compile: bool = True,
+            bail: bool = False,
+            environment: Dict[str, str] = None,
+            timeout=None
+    ) -> Dict[str, TestResult]:
+        """ Runs the tests of the sandbox
+
+        The daemon is stopped if the run times out or the daemon crashes, start has to be called before it can be
+        used again.
+
+        :param grep: Only run the tests whose full title matches this regular expression
+        :param compile: Whether the sources have to be compiled before the tests run
+        :param bail: Stop the test run at the first failing test
+        :param environment: Environment variables that are set for this run
+        :param timeout: Maximum duration that the test run is allowed to take
+        :return: Test results
+        """
+        request = {"grep": grep, "compile": compile, "bail": bail, "environment": environment or {}}
+        try:
+            self._process.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+            self._process.stdin.flush()
+        except OSError:
+            self.stop()
+            raise TestRunException("The test daemon stopped unexpectedly")
+
+        deadline = time() + timeout if timeout else None
+        parser = MochaStreamParser()
+        while True:
+            kind, data = self._next_event(deadline)
+            if kind == "end":
+                parser.finished = True
+                return parser.result()
+            if kind == "error":
+                raise TestRunException(data.get("message", "The test daemon could not run the tests"))
+            parser.handle(kind, data)
+
+    def _next_event(self, deadline: Optional[float]):
+        try:
+            event = self._events.get(timeout=max(deadline - time(), 0) if deadline else None)
+        except Empty:
+            self.stop()
+            raise TimedOut
+        if event is None:
+            self.stop()
+            raise TestRunException("The test daemon stopped unexpectedly:\n" + "\n".join(self._output))
+        return event
+
+    def _read(self, process: Popen, events: Queue) -> None:
+        for raw_line in process.stdout:
+            line = raw_line.decode("utf-8", errors="replace").rstrip("\r\n")
+            if not line.startswith(DAEMON_MARKER):
+                self._output.append(line)
+                continue
+            event = parse_mocha_stream_line(line[len(DAEMON_MARKER):])
+            if event is not None:
+                events.put(event)
+        events.put(None)
@@ -0,0 +1,247 @@
+import os
+import shutil
+import threading
+from distutils.dir_util import copy_tree
+from pathlib import Path
+from queue import Queue
+from tempfile import mkdtemp
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from eth_vertigo.core import Mutation
+from eth_vertigo.interfaces.common.clone import ProjectCloner
+from eth_vertigo.test_runner.file_editor import FileEditor
+
+
+def _sandbox_parent(original_dir: str) -> Optional[str]:
+    """ Returns the directory in which sandboxes are created next to the project, None if it is not writable """
+    parent = Path(original_dir).absolute().parent
+    return str(parent) if os.access(str(parent), os.W_OK) else None
+
+
+def make_temp_directory(original_dir: str, cloner: ProjectCloner = None):
+    """ Creates a working copy of the project in a new temporary directory
+
+    Hard links and reflinks only work within a file system, so with those clone backends the working copy is created
+    next to the project instead of in the system's temporary directory (which is often a tmpfs).
+    """
+    parent = None
+    if cloner is not None and cloner.backend.same_file_system:
+        parent = _sandbox_parent(original_dir)
+        if parent is None:
+            logger.warning(f"Can not create sandboxes next to {original_dir}, they are created in the temporary "
+                           f"directory where the {cloner.backend.name} backend might have to copy")
+    td = mkdtemp(prefix=".vertigo-sandbox-", dir=parent) if parent else mkdtemp()
+    if cloner is None:
+        copy_tree(original_dir, td, preserve_symlinks=1)
+    else:
+        cloner.clone(original_dir, td)
+    return td
+
+
+def clean_build_directory(project_path: str, build_directory: str = "build"):
+    build_dir = Path(project_path) / build_directory
+    if build_dir.is_dir():
+        shutil.rmtree(build_dir)
+
+
+def rm_temp_directory(temp_dir: str):
+    shutil.rmtree(temp_dir)
+
+
+class Sandbox:
+    """ A persistent working copy of a project
+
+    A sandbox is created once and then re-used for many test runs. Every file that is modified during a run is
+    tracked, such that the sandbox can be brought back to its pristine state by rewriting only the touched files
+    and the build outputs.
+    """
+
+    def __init__(self, project_directory: str, build_directories: List[str] = None, cloner: ProjectCloner = None):
+        """ Initializes a sandbox
+
+        :param project_directory: The project directory that this sandbox mirrors
+        :param build_directories: Directories (relative to the project) that hold build outputs
+        :param cloner: Cloner used to create the working copy, defaults to a plain copy
+        """
+        self.project_directory = project_directory
+        self.build_directories = build_directories or []
+        self.cloner = cloner
+        self.directory = None  # type: Optional[str]
+        self._originals = {}  # type: Dict[str, Optional[bytes]]
+        self._pristine_build_directories = []  # type: List[str]
+        # Directory holding the pristine build outputs, defaults to the project directory
+        self._pristine_directory = project_directory
+        self._snapshot_directory = None  # type: Optional[str]
+        # Content of the files that were committed, they differ from the project (e.g. schematized sources)
+        self._committed_files = {}  # type: Dict[str, bytes]
+
+    def create(self) -> "Sandbox":
+        """ Creates the working copy """
+        self.directory = make_temp_directory(self.project_directory, self.cloner)
+        clean_build_directory(self.directory)
+        self._originals = {}
+        self._pristine_build_directories = [
+            d for d in self.build_directories if (Path(self.directory) / d).is_dir()
+        ]
+        return self
+
+    def destroy(self) -> None:
+        """ Removes the working copy """
+        if self._snapshot_directory is not None:
+            shutil.rmtree(self._snapshot_directory, ignore_errors=True)
+            self._snapshot_directory = None
+            self._pristine_directory = self.project_directory
+        if self.directory is None:
+            return
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory = None
+
+    def commit(self, relative_paths: Iterable[str] = ()) -> None:
+        """ Makes the current state of the working copy the state that reset restores
+
+        The build outputs are snapshotted outside of the working copy.
+
+        :param relative_paths: Files that differ from the project, they are restored when the sandbox is recreated
+        """
+        self._committed_files = {
+            relative_path: (Path(self.directory) / relative_path).read_bytes() for relative_path in relative_paths
+        }
+        self._originals = {}
+        if self._snapshot_directory is not None:
+            shutil.rmtree(self._snapshot_directory, ignore_errors=True)
+        self._snapshot_directory = mkdtemp()
+        self._pristine_build_directories = []
+        for build_directory in self.build_directories:
+            source = Path(self.directory) / build_directory
+            if not source.is_dir():
+                continue
+            shutil.copytree(str(source), str(Path(self._snapshot_directory) / build_directory), symlinks=True)
+            self._pristine_build_directories.append(build_directory)
+        self._pristine_directory = self._snapshot_directory
+
+    def recreate(self) -> None:
+        """ Replaces the working copy with a fresh copy of the project, in the state that was committed """
+        if self._snapshot_directory is None:
+            self.destroy()
+            self.create()
+            return
+
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory = make_temp_directory(self.project_directory, self.cloner)
+        clean_build_directory(self.directory)
+        for relative_path, content in self._committed_files.items():
+            (Path(self.directory) / relative_path).write_bytes(content)
+        self._originals = {}
+        self.reset()
+
+    def track(self, *relative_paths: str) -> None:
+        """ Stores the current content of the given files, so they can be restored on reset
+
+        :param relative_paths: Paths relative to the sandbox root
+        """
+        for relative_path in relative_paths:
+            if relative_path in self._originals:
+                continue
+            path = Path(self.directory) / relative_path
+            self._originals[relative_path] = path.read_bytes() if path.is_file() else None
+
+    def apply_mutation(self, mutation: Mutation) -> None:
+        """ Applies the mutation to the working copy """
+        self.track(mutation.relative_path)
+        FileEditor.edit(str(Path(self.directory) / mutation.relative_path), mutation.location, mutation.value)
+
+    def reset(self, restore_build: bool = True) -> None:
+        """ Restores all touched files and build outputs to their pristine state
+
+        :param restore_build: Whether the build outputs might have changed and have to be restored
+        """
+        for relative_path, content in self._originals.items():
+            path = Path(self.directory) / relative_path
+            if content is None:
+                if path.is_file():
+                    path.unlink()
+                continue
+            path.write_bytes(content)
+        self._originals = {}
+
+        if not restore_build:
+            return
+
+        for build_directory in self.build_directories:
+            target = Path(self.directory) / build_directory
+            if target.is_dir():
+                shutil.rmtree(target)
+            if build_directory in self._pristine_build_directories:
+                shutil.copytree(str(Path(self._pristine_directory) / build_directory), str(target), symlinks=True)
+
+
+class SandboxPool:
+    """ A pool of sandboxes, usually one for each network that a campaign can use in parallel """
+
+    def __init__(
+            self,
+            project_directory: str,
+            size: int,
+            build_directories: List[str] = None,
+            cloner: ProjectCloner = None
+    ):
+        """ Initializes the sandbox pool
+
+        :param project_directory: The project directory that the sandboxes mirror
+        :param size: Amount of sandboxes to create
+        :param build_directories: Directories (relative to the project) that hold build outputs
+        :param cloner: Cloner used to create the working copies
+        """
+        self.project_directory = project_directory
+        self.size = size
+        self.build_directories = build_directories or []
+        self.cloner = cloner
+        self.sandboxes = []  # type: List[Sandbox]
+        self._available = Queue()
+        self.lock = threading.Lock()
+
+    def create(self) -> None:
+        """ Creates all sandboxes in the pool """
+        for _ in range(self.size):
+            sandbox = Sandbox(self.project_directory, self.build_directories, self.cloner).create()
+            self.sandboxes.append(sandbox)
+            self._available.put(sandbox)
+
+    def claim(self) -> Sandbox:
+        """ Claims a sandbox, blocks until one is available """
+        return self._available.get()
+
+    def restrict(self, index: int) -> None:
+        """ Restricts the pool to a single sandbox
+
+        Used by worker processes that inherit the pool, so that no two processes share a sandbox.
+
+        :param index: Index of the sandbox that is kept
+        """
+        with self.lock:
+            self.sandboxes = [self.sandboxes[index]]
+            self._available = Queue()
+            self._available.put(self.sandboxes[0])
+
+    def yield_sandbox(self, sandbox: Sandbox, restore_build: bool = True) -> None:
+        """ Resets the sandbox and puts it back in the pool
+
+        If the sandbox can not be reset, then it is replaced by a fresh working copy in the committed state, such that
+        e.g. installed schemata are kept.
+        """
+        try:
+            sandbox.reset(restore_build)
+        except Exception as e:
+            logger.warning(f"Could not reset sandbox {sandbox.directory}, recreating it: {e}")
+            sandbox.recreate()
+        self._available.put(sandbox)
+
+    def destroy(self) -> None:
+        """ Removes all sandboxes in the pool """
+        with self.lock:
+            for sandbox in self.sandboxes:
+                sandbox.destroy()
+            self.sandboxes = []
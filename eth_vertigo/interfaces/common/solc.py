@@ -0,0 +1,161 @@
+import json
+import threading
+from subprocess import run, PIPE, TimeoutExpired
+from typing import Dict, List, Optional, Set
+
+from loguru import logger
+
+from eth_vertigo.core import Mutation
+from eth_vertigo.interfaces.common import strip_metadata
+
+DEFAULT_SOLC_TIMEOUT = 300
+
+
+class SolcSource:
+    """ A source unit as it was passed to the compiler """
+
+    def __init__(self, name: str, content: str, imports: List[str], settings: Dict):
+        """ Initializes the source unit
+
+        :param name: The source unit name, this is the absolutePath in the ast
+        :param content: The source code of the unit
+        :param imports: Names of the source units imported by this unit
+        :param settings: Standard json compiler settings that were used to compile this unit
+        """
+        self.name = name
+        self.content = content
+        self.imports = imports
+        self.settings = settings
+
+
+def get_imports(ast: Dict) -> List[str]:
+    """ Returns the source unit names imported by the given source unit ast """
+    return [
+        node["absolutePath"] for node in ast.get("nodes", [])
+        if node.get("nodeType") == "ImportDirective" and "absolutePath" in node
+    ]
+
+
+class SolcEquivalenceChecker:
+    """ Trivial compiler equivalence check that calls solc directly
+
+    Instead of running the compilation of the framework for the entire project, this compiles only the mutated
+    source unit, the units that depend on it and their imports with solc's standard json interface.
+
+    The first time a source unit is checked, its original content is compiled as well. If that does not reproduce
+    the baseline bytecodes of the campaign (e.g. because the local solc version or settings differ from the ones used
+    by the framework), then the checker declines to judge mutants of that unit.
+    """
+
+    def __init__(self, solc_binary: str, sources: Dict[str, SolcSource], timeout: int = DEFAULT_SOLC_TIMEOUT):
+        """ Initializes the equivalence checker
+
+        :param solc_binary: Path of the solc binary
+        :param sources: The source units of the project, indexed by their name
+        :param timeout: Maximum duration of a single solc invocation
+        """
+        self.solc_binary = solc_binary
+        self.sources = sources
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self._reproducible = {}  # type: Dict[str, bool]
+
+        self._dependents = {name: set() for name in sources}  # type: Dict[str, Set[str]]
+        for name, source in sources.items():
+            for imported in source.imports:
+                self._dependents.setdefault(imported, set()).add(name)
+
+    def _targets(self, unit: str) -> List[str]:
+        """ The unit and all units that (transitively) import it """
+        targets = {unit}
+        todo = [unit]
+        while todo:
+            for dependent in self._dependents.get(todo.pop(), ()):
+                if dependent not in targets:
+                    targets.add(dependent)
+                    todo.append(dependent)
+        return sorted(targets)
+
+    def _closure(self, units: List[str]) -> List[str]:
+        """ The units and all units that they (transitively) import """
+        closure = set()
+        todo = list(units)
+        while todo:
+            unit = todo.pop()
+            if unit in closure or unit not in self.sources:
+                continue
+            closure.add(unit)
+            todo.extend(self.sources[unit].imports)
+        return sorted(closure)
+
+    def _compile(self, contents: Dict[str, str], targets: List[str], settings: Dict) -> Optional[Dict[str, str]]:
+        settings = dict(settings)
+        settings["outputSelection"] = {target: {"*": ["evm.bytecode.object"]} for target in targets}
+        standard_input = {
+            "language": "Solidity",
+            "sources": {name: {"content": content} for name, content in contents.items()},
+            "settings": settings,
+        }
+        try:
+            process = run(
+                [self.solc_binary, "--standard-json"],
+                input=json.dumps(standard_input).encode("utf-8"),
+                stdout=PIPE,
+                stderr=PIPE,
+                timeout=self.timeout
+            )
+            output = json.loads(process.stdout.decode("utf-8"))
+        except (OSError, TimeoutExpired, ValueError) as e:
+            logger.debug(f"Could not run solc: {e}")
+            return None
+
+        if any(error.get("severity") == "error" for error in output.get("errors", [])):
+            return None
+
+        bytecodes = {}
+        for target in targets:
+            for contract_name, contract in output.get("contracts", {}).get(target, {}).items():
+                bytecodes[contract_name] = strip_metadata("0x" + contract["evm"]["bytecode"]["object"])
+        return bytecodes
+
+    def _is_reproducible(self, unit: str, targets: List[str], original_bytecode: Dict[str, str]) -> bool:
+        with self.lock:
+            if unit in self._reproducible:
+                return self._reproducible[unit]
+
+        contents = {name: self.sources[name].content for name in self._closure(targets)}
+        bytecodes = self._compile(contents, targets, self.sources[unit].settings)
+        reproducible = bytecodes is not None and all(
+            original_bytecode.get(name) == bytecode for name, bytecode in bytecodes.items()
+        )
+        if not reproducible:
+            logger.warning(f"solc does not reproduce the bytecode of {unit}, falling back to the framework compiler")
+
+        with self.lock:
+            self._reproducible[unit] = reproducible
+        return reproducible
+
+    def check(self, mutation: Mutation, original_bytecode: Dict[str, str]) -> Optional[bool]:
+        """ Checks whether the mutation is trivially equivalent to the original program
+
+        :param mutation: The mutation to check
+        :param original_bytecode: The original bytecodes of the campaign {'contractName': '0x00'}
+        :return: Whether the mutant is equivalent, or None if this checker can't tell
+        """
+        unit = getattr(mutation.source, "ast", {}).get("absolutePath")
+        if unit not in self.sources:
+            return None
+
+        targets = self._targets(unit)
+        if not self._is_reproducible(unit, targets, original_bytecode):
+            return None
+
+        original = self.sources[unit].content
+        offset, length = mutation.location[0], mutation.location[1]
+        contents = {name: self.sources[name].content for name in self._closure(targets)}
+        contents[unit] = original[:offset] + mutation.value + original[offset + length:]
+
+        bytecodes = self._compile(contents, targets, self.sources[unit].settings)
+        if bytecodes is None:
+            return None
+        return all(original_bytecode.get(name) == bytecode for name, bytecode in bytecodes.items())
@@ -1,17 +1,31 @@
+import asyncio
+import os
+import re
+import signal
+import threading
 from abc import ABC, abstractmethod
+from functools import partial
 
+from loguru import logger
 from pathlib import Path
-from tempfile import mkdtemp
-from distutils.dir_util import copy_tree
 import shutil
 
 from eth_vertigo.core import Mutation
+from eth_vertigo.core.timing import phase, SANDBOX_COPY, INSTRUMENT_CONFIGURATION, APPLY_MUTATION, COMPILE, \
+    TEST_COMMAND, PARSE_OUTPUT, CLEANUP
+from eth_vertigo.interfaces.common.clone import ProjectCloner
+from eth_vertigo.interfaces.common.compilation_cache import CompilationCache, project_fingerprint
+from eth_vertigo.interfaces.common.sandbox import Sandbox, SandboxPool
+from eth_vertigo.interfaces.common.sandbox import make_temp_directory, clean_build_directory, rm_temp_directory
+from eth_vertigo.interfaces.common.solc import SolcEquivalenceChecker
+from eth_vertigo.coverage.reporter import REPORTER_FILE_NAME, REPORTER_SOURCE, parse_report
 from eth_vertigo.test_runner.file_editor import FileEditor
 from eth_vertigo.interfaces.generics import Tester
+from eth_vertigo.mutator.schemata import MutantSchemata, SWITCH_ENVIRONMENT_VARIABLE
 from json import loads, JSONDecodeError
-from subprocess import Popen, TimeoutExpired
+from subprocess import Popen, TimeoutExpired, PIPE, STDOUT, DEVNULL
 from tempfile import TemporaryFile
-from typing import Dict, Union
+from typing import Dict, Optional, Union
 from eth_vertigo.test_runner.exceptions import TestRunException, TimedOut
 from eth_vertigo.test_runner import TestResult
 
@@ -29,20 +43,118 @@ def normalize_mocha(mocha_json: dict) -> Dict[str, TestResult]:
     return tests
 
 
-def make_temp_directory(original_dir: str):
-    td = mkdtemp()
-    copy_tree(original_dir, td, preserve_symlinks=1)
-    return td
+def parse_mocha_stream_line(line: str):
+    """ Parses a line of output of mocha's json-stream reporter
 
+    :return: (event, data) for lines of the reporter, or None for any other output
+    """
+    if not line.startswith("["):
+        return None
+    try:
+        event = loads(line)
+    except JSONDecodeError:
+        return None
+    if not isinstance(event, list) or len(event) != 2 or not isinstance(event[1], dict):
+        return None
+    return event[0], event[1]
 
-def clean_build_directory(project_path: str, build_directory: str = "build"):
-    build_dir = Path(project_path) / build_directory
-    if build_dir.is_dir():
-        shutil.rmtree(build_dir)
 
+def parse_mocha_output(output: str) -> Dict[str, TestResult]:
+    """ Parses the output of a test command that uses mocha's json reporter """
+    split = output.split("\n")
+    errors = []
+    test_result = []
+    preamble = True
+    for line in split:
+        if line.startswith("Error"):
+            errors.append(line)
+        if line.startswith("{"):
+            preamble = False
+        if preamble:
+            continue
+        test_result.append(line)
 
-def rm_temp_directory(temp_dir: str):
-    shutil.rmtree(temp_dir)
+    test_result = "\n".join(test_result)
+
+    if errors:
+        raise TestRunException("\n".join(errors))
+    try:
+        return normalize_mocha(loads(test_result))
+    except JSONDecodeError:
+        raise TestRunException("Encountered error during test output analysis")
+
+
+class MochaStreamParser:
+    """ Collects test results from the output of mocha's json-stream reporter, line by line """
+
+    def __init__(self):
+        self.tests = {}  # type: Dict[str, TestResult]
+        self.errors = []  # type: List[str]
+        self.finished = False
+        self.failed = False
+
+    def feed(self, line: str) -> bool:
+        """ Processes a line of output
+
+        :return: Whether a test failed, after which the test run can be stopped
+        """
+        if line.startswith("Error"):
+            self.errors.append(line)
+        event = parse_mocha_stream_line(line)
+        if event is None:
+            return False
+        return self.handle(*event)
+
+    def handle(self, kind: str, data: dict) -> bool:
+        """ Processes an event of the reporter
+
+        :return: Whether a test failed, after which the test run can be stopped
+        """
+        if kind in ("pass", "fail"):
+            self.tests[data["fullTitle"]] = TestResult(
+                data["title"], data["fullTitle"], data.get("duration", 0), kind == "pass"
+            )
+            if kind == "fail":
+                self.failed = True
+        elif kind == "end":
+            self.finished = True
+        return self.failed
+
+    def result(self) -> Dict[str, TestResult]:
+        """ Returns the collected results, the tests up to and including the first failure if a test failed """
+        if self.failed:
+            return self.tests
+        if self.errors and not self.finished:
+            raise TestRunException("\n".join(self.errors))
+        if not self.finished:
+            raise TestRunException("Encountered error during test output analysis")
+        return self.tests
+
+
+def _kill_process_group(proc: Popen):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        proc.kill()
+    proc.wait()
+
+
+async def _kill_process_group_async(proc: asyncio.subprocess.Process):
+    if proc.returncode is not None:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+    await proc.wait()
+
+
+def include_tests_pattern(test_names: List[str]) -> str:
+    """ Returns a regular expression that matches the full titles of the given tests """
+    return "({})".format("|".join(re.escape(name) for name in test_names))
 
 
 def apply_mutation(mutation: Mutation, working_directory):
@@ -51,6 +163,175 @@ def apply_mutation(mutation: Mutation, working_directory):
 
 
 class MochaStdoutTester(Tester):
+    # Files that instrument_configuration rewrites, relative to the project directory
+    configuration_files = []  # type: List[str]
+    # Directories that hold the build outputs of the framework, relative to the project directory
+    build_directories = []  # type: List[str]
+
+    sandbox_pool = None  # type: SandboxPool
+    cloner = None  # type: ProjectCloner
+    schemata = None  # type: MutantSchemata
+    compilation_cache = None  # type: CompilationCache
+    equivalence_checker = None  # type: SolcEquivalenceChecker
+    # Stop the test run at the first failing test
+    bail = False
+    # Run the tests with a long-lived test daemon in every sandbox, if the framework supports it
+    persistent = False
+    _daemons = None  # type: Dict[str, TestDaemon]
+    _compilation_settings = None
+
+    def prepare(self, workers: int, schemata: MutantSchemata = None) -> None:
+        """ Creates one persistent sandbox for each worker
+
+        If schemata are passed, then the schematized sources are compiled once and installed in every sandbox.
+        """
+        self.cleanup()
+        self._daemons = {}
+        self.sandbox_pool = SandboxPool(self.project_directory, workers, self.build_directories, self.cloner)
+        self.sandbox_pool.create()
+        if schemata is not None and schemata.sources:
+            self._install_schemata(schemata)
+
+    def cleanup(self) -> None:
+        """ Removes the persistent sandboxes """
+        self.schemata = None
+        for daemon in (self._daemons or {}).values():
+            daemon.stop()
+        self._daemons = {}
+        if self.sandbox_pool is None:
+            return
+        self.sandbox_pool.destroy()
+        self.sandbox_pool = None
+
+    def bind_worker(self, index: int) -> None:
+        """ Keeps only the sandbox of the given worker process """
+        # The daemons that were inherited from the parent process belong to the parent process
+        self._daemons = {}
+        if self.sandbox_pool is not None:
+            self.sandbox_pool.restrict(index)
+
+    def create_daemon(self, directory: str, network: Optional[str] = None) -> Optional["TestDaemon"]:
+        """ Creates a test daemon for the sandbox in the given directory
+
+        :param directory: The directory of the sandbox
+        :param network: Name of the network that the tests of the daemon should be using
+        :return: The daemon, or None if the framework does not support test daemons
+        """
+        return None
+
+    def _claim_daemon(self, sandbox: Sandbox, network: Optional[str] = None) -> Optional["TestDaemon"]:
+        """ Returns the running daemon of the claimed sandbox, the daemon is (re)started when necessary
+
+        A daemon is bound to the network that it was started with, it is replaced if the sandbox is used with another
+        network.
+        """
+        daemon = self._daemons.get(sandbox.directory)
+        if daemon is not None and daemon.network != network:
+            daemon.stop()
+            daemon = None
+        if daemon is None:
+            daemon = self.create_daemon(sandbox.directory, network)
+            if daemon is None:
+                return None
+            self._daemons[sandbox.directory] = daemon
+        if not daemon.alive:
+            daemon.start()
+        return daemon
+
+    def _install_schemata(self, schemata: MutantSchemata) -> None:
+        first, others = self.sandbox_pool.sandboxes[0], self.sandbox_pool.sandboxes[1:]
+        self._compile_schemata(first.directory, schemata)
+        if not schemata.sources:
+            logger.warning("None of the schematized sources compile, mutants are evaluated one by one")
+            return
+        first.commit(schemata.sources.keys())
+
+        for sandbox in others:
+            for relative_path, content in schemata.sources.items():
+                (Path(sandbox.directory) / relative_path).write_text(content, "utf-8")
+            for build_directory in self.build_directories:
+                source = Path(first.directory) / build_directory
+                target = Path(sandbox.directory) / build_directory
+                if target.is_dir():
+                    shutil.rmtree(str(target))
+                if source.is_dir():
+                    shutil.copytree(str(source), str(target), symlinks=True)
+            sandbox.commit(schemata.sources.keys())
+        self.schemata = schemata
+
+    def _compile_schemata(self, directory: str, schemata: MutantSchemata) -> None:
+        """ Compiles the schematized sources, dropping the files that do not compile from the schemata """
+
+        def write(schematized):
+            for relative_path in schemata.sources.keys():
+                content = schemata.sources[relative_path] if relative_path in schematized \
+                    else schemata.original_sources[relative_path]
+                (Path(directory) / relative_path).write_text(content, "utf-8")
+
+        def compiles(schematized):
+            write(schematized)
+            try:
+                self.compiler.run_compilation(directory)
+                return True
+            except Exception as e:
+                logger.debug(f"Schematized compilation failed: {e}")
+                return False
+
+        if compiles(list(schemata.sources.keys())):
+            return
+
+        logger.warning("Schematized sources do not compile, looking for the offending files")
+        for relative_path in list(schemata.sources.keys()):
+            if not compiles([relative_path]):
+                logger.warning(f"Evaluating mutants of {relative_path} one by one")
+                write([])
+                schemata.discard(relative_path)
+
+        if not compiles(list(schemata.sources.keys())):
+            write([])
+            for relative_path in list(schemata.sources.keys()):
+                schemata.discard(relative_path)
+
+    def _claim_sandbox(self) -> Sandbox:
+        if self.sandbox_pool is None:
+            return Sandbox(self.project_directory, self.build_directories, self.cloner).create()
+        return self.sandbox_pool.claim()
+
+    def _yield_sandbox(self, sandbox: Sandbox, restore_build: bool = True) -> None:
+        if self.sandbox_pool is None:
+            sandbox.destroy()
+            return
+        directory = sandbox.directory
+        self.sandbox_pool.yield_sandbox(sandbox, restore_build)
+        if sandbox.directory != directory and self._daemons and directory in self._daemons:
+            # The sandbox was recreated, the daemon of its old working copy is of no use anymore
+            self._daemons.pop(directory).stop()
+
+    def _restore_original_sources(self, sandbox: Sandbox) -> None:
+        for relative_path, content in self.schemata.original_sources.items():
+            sandbox.track(relative_path)
+            (Path(sandbox.directory) / relative_path).write_text(content, "utf-8")
+
+    def _compile(self, sandbox: Sandbox, mutation: Mutation) -> Dict[str, str]:
+        """ Compiles the sandbox, re-using the build outputs of an earlier compilation of the same mutated source
+
+        :return: The bytecodes of the compilation
+        """
+        if self._compilation_settings is None:
+            self._compilation_settings = "{}:{}:{}".format(
+                type(self.compiler).__name__,
+                " ".join(self.build_test_command(None)),
+                project_fingerprint(self.project_directory, self.configuration_files)
+            )
+        content = (Path(sandbox.directory) / mutation.relative_path).read_bytes()
+        key = CompilationCache.key(self._compilation_settings, mutation.relative_path, content)
+
+        bytecodes = self.compilation_cache.get(key, sandbox.directory, self.build_directories)
+        if bytecodes is None:
+            bytecodes = self.compiler.get_bytecodes(sandbox.directory)
+            self.compilation_cache.put(key, sandbox.directory, self.build_directories, bytecodes)
+        return bytecodes
+
     def run_tests(
             self,
             coverage: bool = False,
@@ -73,41 +354,233 @@ class MochaStdoutTester(Tester):
         if coverage:
             raise NotImplementedError
 
-        temp_dir = make_temp_directory(self.project_directory)
-        clean_build_directory(temp_dir)
+        timings = mutation.timings if mutation else None
+        sandbox, compile, environment, use_schemata = self._prepare_test_run(
+            mutation, original_bytecode, keep_test_names
+        )
+        try:
+            daemon = self._claim_daemon(sandbox, network) if self.persistent else None
+            if daemon is not None:
+                with phase(timings, TEST_COMMAND):
+                    return daemon.run(
+                        grep=include_tests_pattern(keep_test_names) if keep_test_names else None,
+                        compile=compile,
+                        bail=self.bail,
+                        environment={
+                            k: v for k, v in (environment or {}).items() if k == SWITCH_ENVIRONMENT_VARIABLE
+                        },
+                        timeout=timeout
+                    )
+            return self.run_test_command(
+                self.build_test_command(network, compile=compile), sandbox.directory, timeout=timeout,
+                environment=environment, bail=self.bail, timings=timings
+            )
+        finally:
+            with phase(timings, CLEANUP):
+                self._yield_sandbox(sandbox, restore_build=not use_schemata)
 
-        self.instrument_configuration(temp_dir, keep_test_names)
+    async def run_tests_async(
+            self,
+            mutation: Mutation = None,
+            timeout=None,
+            network: str = None,
+            original_bytecode: Dict[str, str] = None,
+            keep_test_names: List[str] = None,
+    ) -> dict:
+        """ Asynchronous variant of run_tests
 
-        if mutation:
-            apply_mutation(mutation, temp_dir)
+        Preparing the sandbox (e.g. compilation) happens on a thread, the test command itself is awaited without
+        occupying a thread. Cancelling the coroutine kills the test process. Test daemons are driven from a thread.
+        """
+        if self.persistent:
+            return await super().run_tests_async(mutation, timeout, network, original_bytecode, keep_test_names)
+
+        loop = asyncio.get_event_loop()
+        sandbox, compile, environment, use_schemata = await loop.run_in_executor(
+            None, partial(self._prepare_test_run, mutation, original_bytecode, keep_test_names)
+        )
+        timings = mutation.timings if mutation else None
+        try:
+            return await self.run_test_command_async(
+                self.build_test_command(network, compile=compile), sandbox.directory, timeout=timeout,
+                environment=environment, bail=self.bail, timings=timings
+            )
+        finally:
+            with phase(timings, CLEANUP):
+                await loop.run_in_executor(None, partial(self._yield_sandbox, sandbox, not use_schemata))
+
+    def _prepare_test_run(
+            self,
+            mutation: Optional[Mutation],
+            original_bytecode: Optional[Dict[str, str]],
+            keep_test_names: Optional[List[str]]
+    ):
+        """ Claims a sandbox and prepares it for a test run of the mutation
+
+        :return: (sandbox, whether the test run has to compile, environment, whether the schemata are used), the
+            caller yields the sandbox
+        """
+        # With schemata the sandboxes hold a compiled meta-mutant, and only mutations outside of it need a build
+        use_schemata = self.schemata is not None and (mutation is None or mutation.schema_id is not None)
+        environment = None
+        timings = mutation.timings if mutation else None
+
+        # The solc fast path compiles only the affected sources, this also works for schematized mutants
+        equivalent = None
+        if mutation and original_bytecode and self.equivalence_checker is not None:
+            with phase(timings, COMPILE):
+                equivalent = self.equivalence_checker.check(mutation, original_bytecode)
+            if equivalent:
+                raise EquivalentMutant
+
+        with phase(timings, SANDBOX_COPY):
+            sandbox = self._claim_sandbox()
         try:
-            if original_bytecode is not None and original_bytecode != {}:
-                if self.compiler.check_bytecodes(temp_dir, original_bytecode):
+            with phase(timings, INSTRUMENT_CONFIGURATION):
+                sandbox.track(*self.configuration_files)
+                self.instrument_configuration(sandbox.directory, keep_test_names)
+
+                if self.schemata is not None:
+                    self.instrument_mutant_switch(sandbox.directory)
+                    environment = dict(os.environ)
+                    environment[SWITCH_ENVIRONMENT_VARIABLE] = str(
+                        mutation.schema_id if use_schemata and mutation else 0
+                    )
+
+            if mutation and not use_schemata:
+                with phase(timings, APPLY_MUTATION):
+                    if self.schemata is not None:
+                        self._restore_original_sources(sandbox)
+                    sandbox.apply_mutation(mutation)
+
+            # With a compilation cache the test run re-uses the build of the equivalence check
+            compiled = False
+            if mutation and not use_schemata and self.compilation_cache is not None:
+                with phase(timings, COMPILE):
+                    bytecodes = self._compile(sandbox, mutation)
+                compiled = True
+                if original_bytecode and self.compiler.compare_bytecodes(bytecodes, original_bytecode):
+                    raise EquivalentMutant
+            elif not use_schemata and equivalent is None and original_bytecode:
+                with phase(timings, COMPILE):
+                    unchanged = self.compiler.check_bytecodes(sandbox.directory, original_bytecode)
+                if unchanged:
                     raise EquivalentMutant
-            test_command = self.build_test_command(network)
-            result = self.run_test_command(test_command, temp_dir, timeout=timeout)
+        except BaseException:
+            with phase(timings, CLEANUP):
+                self._yield_sandbox(sandbox, restore_build=not use_schemata)
+            raise
+
+        return sandbox, not (use_schemata or compiled), environment, use_schemata
+
+    def run_coverage(self, sources: Dict[str, str], network: str = None, timeout=None) -> Optional[dict]:
+        """ Runs the test suite on sources that are instrumented with coverage probes
+
+        :param sources: The instrumented sources, indexed by their path relative to the project directory
+        :param network: Name of the network that the test should be using
+        :param timeout: Maximum duration that the test is allowed to take
+        :return: The report of the coverage reporter, or None if the test run did not produce one
+        """
+        sandbox = self._claim_sandbox()
+        try:
+            sandbox.track(*self.configuration_files)
+            sandbox.track(REPORTER_FILE_NAME, *sources.keys())
+            for relative_path, content in sources.items():
+                (Path(sandbox.directory) / relative_path).write_text(content, "utf-8")
+            (Path(sandbox.directory) / REPORTER_FILE_NAME).write_text(REPORTER_SOURCE, "utf-8")
+            self.instrument_configuration(sandbox.directory, None)
+            self.instrument_coverage(sandbox.directory)
+
+            output = self._execute(self.build_test_command(network), sandbox.directory, timeout=timeout)
         finally:
-            rm_temp_directory(temp_dir)
+            self._yield_sandbox(sandbox)
 
-        return result
+        return parse_report(output)
 
     @abstractmethod
     def instrument_configuration(self, directory, keep_test_names):
         pass
 
     @abstractmethod
-    def build_test_command(self, network: str):
+    def instrument_mutant_switch(self, directory):
+        """ Instruments the configuration such that the test run enables the mutant selected by the environment """
+        pass
+
+    @abstractmethod
+    def instrument_coverage(self, directory):
+        """ Instruments the configuration such that mocha uses the coverage reporter """
+        pass
+
+    @abstractmethod
+    def build_test_command(self, network: str, compile: bool = True):
         pass
 
     @staticmethod
     def run_test_command(
             command: str,
             working_directory: str,
-            timeout=None
+            timeout=None,
+            environment: Dict[str, str] = None,
+            bail: bool = False,
+            timings: Dict[str, float] = None
     ) -> Union[Dict[str, TestResult], None]:
+        """ Runs the test command and parses its output
+
+        :param timings: If passed, the time spent running the command and parsing its output is added to it
+        """
+        if bail:
+            # The output is parsed while the tests are running
+            with phase(timings, TEST_COMMAND):
+                return MochaStdoutTester.run_streaming_test_command(command, working_directory, timeout, environment)
+
+        with phase(timings, TEST_COMMAND):
+            output = MochaStdoutTester._execute(command, working_directory, timeout, environment)
+        with phase(timings, PARSE_OUTPUT):
+            return parse_mocha_output(output)
+
+    @staticmethod
+    async def run_test_command_async(
+            command: List[str],
+            working_directory: str,
+            timeout=None,
+            environment: Dict[str, str] = None,
+            bail: bool = False,
+            timings: Dict[str, float] = None
+    ) -> Dict[str, TestResult]:
+        """ Asynchronous variant of run_test_command, the test process is killed when the coroutine is cancelled """
+        proc = await asyncio.create_subprocess_exec(
+            *command, stdin=DEVNULL, stdout=PIPE, stderr=STDOUT, cwd=working_directory, env=environment,
+            start_new_session=True
+        )
+        parser = MochaStreamParser()
+
+        async def read():
+            async for raw_line in proc.stdout:
+                if parser.feed(raw_line.decode("utf-8", errors="replace").rstrip("\r\n")):
+                    return
+
+        with phase(timings, TEST_COMMAND):
+            try:
+                if bail:
+                    await asyncio.wait_for(read(), timeout)
+                else:
+                    output, _ = await asyncio.wait_for(proc.communicate(), timeout)
+            except asyncio.TimeoutError:
+                raise TimedOut
+            finally:
+                await _kill_process_group_async(proc)
+
+        if bail:
+            return parser.result()
+        with phase(timings, PARSE_OUTPUT):
+            return parse_mocha_output(output.decode("utf-8"))
+
+    @staticmethod
+    def _execute(command, working_directory: str, timeout=None, environment: Dict[str, str] = None) -> str:
+        """ Runs the command and returns its output """
         with TemporaryFile() as stdin, TemporaryFile() as stdout:
             stdin.seek(0)
-            proc = Popen(command, stdin=stdin, stdout=stdout, stderr=stdout, cwd=working_directory)
+            proc = Popen(command, stdin=stdin, stdout=stdout, stderr=stdout, cwd=working_directory, env=environment)
             try:
                 proc.wait(timeout=timeout)
             except TimeoutExpired:
@@ -115,26 +588,40 @@ class MochaStdoutTester(Tester):
                 raise TimedOut
 
             stdout.seek(0)
-            output = stdout.read()
-
-        split = output.decode('utf-8').split("\n")
-        errors = []
-        test_result = []
-        preamble = True
-        for line in split:
-            if line.startswith("Error"):
-                errors.append(line)
-            if line.startswith("{"):
-                preamble = False
-            if preamble:
-                continue
-            test_result.append(line)
-
-        test_result = "\n".join(test_result)
-
-        if errors:
-            raise TestRunException("\n".join(errors))
+            return stdout.read().decode('utf-8')
+
+    @staticmethod
+    def run_streaming_test_command(
+            command: str,
+            working_directory: str,
+            timeout=None,
+            environment: Dict[str, str] = None
+    ) -> Dict[str, TestResult]:
+        """ Runs a test command that uses mocha's json-stream reporter
+
+        The output is parsed while the tests are running, the test process is killed as soon as a test fails.
+        The result then only holds the tests that finished up to and including the first failure.
+        """
+        proc = Popen(
+            command, stdin=DEVNULL, stdout=PIPE, stderr=STDOUT, cwd=working_directory, env=environment,
+            start_new_session=True
+        )
+        parser = MochaStreamParser()
+
+        def read():
+            for raw_line in proc.stdout:
+                if parser.feed(raw_line.decode("utf-8", errors="replace").rstrip("\r\n")):
+                    return
+
+        reader = threading.Thread(target=read, daemon=True)
+        reader.start()
+        reader.join(timeout)
         try:
-            return normalize_mocha(loads(test_result))
-        except JSONDecodeError:
-            raise TestRunException("Encountered error during test output analysis")
\ No newline at end of file
+            if reader.is_alive():
+                raise TimedOut
+        finally:
+            _kill_process_group(proc)
+            reader.join()
+            proc.stdout.close()
+
+        return parser.result()
@@ -1,3 +1,5 @@
+import asyncio
+from functools import partial
 from typing import Dict, Union, List
 from eth_vertigo.test_runner.test_result import TestResult
 from abc import ABC, abstractmethod
@@ -29,8 +31,18 @@ class Compiler:
         :return: Whether the bytecodes match up
         """
         current_bytecodes = self.get_bytecodes(working_directory)
-        for contractName, bytecode in current_bytecodes.items():
-            if original_bytecode[contractName] != bytecode:
+        return self.compare_bytecodes(current_bytecodes, original_bytecode)
+
+    @staticmethod
+    def compare_bytecodes(current_bytecode: Dict[str, str], original_bytecode: Dict[str, str]) -> bool:
+        """ Returns whether all of the current bytecodes match up with the original bytecodes
+
+        :param current_bytecode: The bytecodes to check {'contractName': '0x00'}
+        :param original_bytecode: The original bytecodes {'contractName': '0x00'}
+        :return: Whether the bytecodes match up
+        """
+        for contractName, bytecode in current_bytecode.items():
+            if original_bytecode.get(contractName) != bytecode:
                 return False
         return True
 
@@ -38,6 +50,35 @@ class Compiler:
 class Tester(ABC):
     """Tester interface exposes testing functionality from testing frame work"""
 
+    def prepare(self, workers: int, schemata=None) -> None:
+        """ Prepares the tester for a campaign run
+
+        :param workers: The amount of test runs that can be executed in parallel
+        :param schemata: Optional MutantSchemata that should be compiled once for all test runs
+        """
+        pass
+
+    def cleanup(self) -> None:
+        """ Releases the resources acquired by prepare """
+        pass
+
+    def bind_worker(self, index: int) -> None:
+        """ Restricts the tester to the resources of a single worker process
+
+        :param index: Index of the worker process, smaller than the amount of workers passed to prepare
+        """
+        pass
+
+    def run_coverage(self, sources: Dict[str, str], network: str = None, timeout=None) -> Union[None, Dict]:
+        """ Runs the test suite on sources that are instrumented with coverage probes
+
+        :param sources: The instrumented sources, indexed by their path relative to the project directory
+        :param network: Name of the network that the test should be using
+        :param timeout: Maximum duration that the test is allowed to take
+        :return: The report of the coverage reporter, or None if coverage is not supported
+        """
+        return None
+
     @abstractmethod
     def run_tests(
             self,
@@ -50,3 +91,21 @@ class Tester(ABC):
     ) -> Union[None, Dict[str, TestResult]]:
         pass
 
+    async def run_tests_async(
+            self,
+            mutation: Mutation = None,
+            timeout=None,
+            network: str = None,
+            original_bytecode: Dict[str, str] = None,
+            keep_test_names: List[str] = None,
+    ) -> Union[None, Dict[str, TestResult]]:
+        """ Asynchronous variant of run_tests, by default run_tests is executed on a thread """
+        return await asyncio.get_event_loop().run_in_executor(None, partial(
+            self.run_tests,
+            mutation=mutation,
+            timeout=timeout,
+            network=network,
+            original_bytecode=original_bytecode,
+            keep_test_names=keep_test_names
+        ))
+
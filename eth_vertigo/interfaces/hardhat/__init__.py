@@ -1,8 +1,13 @@
 from eth_vertigo.core.campaign import BaseCampaign
-from typing import List
+from typing import Dict, List
 from eth_vertigo.mutator.mutator import Mutator
 from pathlib import Path
 from eth_vertigo.core.network import NetworkPool
+from eth_vertigo.core.timeout import TimeoutPolicy
+from eth_vertigo.interfaces.common.clone import ProjectCloner
+from eth_vertigo.interfaces.common.compilation_cache import CompilationCache
+from eth_vertigo.interfaces.common.solc import SolcSource, get_imports
+from eth_vertigo.interfaces.hardhat.build_info import BuildInfoCache
 from json import loads
 
 
@@ -14,14 +19,26 @@ class HardhatCampaign(BaseCampaign):
             mutators: List[Mutator],
             network_pool: NetworkPool,
             filters=None,
-            suggesters=None
+            suggesters=None,
+            cloner: ProjectCloner = None,
+            schemata: bool = False,
+            compilation_cache: CompilationCache = None,
+            solc_binary: str = None,
+            bail: bool = False,
+            timeout_policy: TimeoutPolicy = None,
+            persistent: bool = False,
+            network_urls: Dict[str, str] = None,
+            mutation_processes: int = 1
     ):
         from eth_vertigo.interfaces.hardhat.tester import HardhatTester
         from eth_vertigo.interfaces.hardhat.compile import HardhatCompiler
         from eth_vertigo.interfaces.hardhat.mutator import HardhatSourceFile
 
         compiler = HardhatCompiler(hardhat_command)
-        tester = HardhatTester(hardhat_command, str(project_directory), compiler)
+        tester = HardhatTester(
+            hardhat_command, str(project_directory), compiler, cloner, compilation_cache, bail, persistent,
+            network_urls
+        )
         source_file_builder = lambda ast, full_path: HardhatSourceFile(ast, full_path)
 
         super().__init__(
@@ -34,7 +51,11 @@ class HardhatCampaign(BaseCampaign):
             source_file_builder=source_file_builder,
 
             filters=filters,
-            suggesters=suggesters
+            suggesters=suggesters,
+            schemata=schemata,
+            solc_binary=solc_binary,
+            timeout_policy=timeout_policy,
+            mutation_processes=mutation_processes
         )
 
     def _get_sources(self):
@@ -53,19 +74,41 @@ class HardhatCampaign(BaseCampaign):
 
         explore_contracts(contracts_dir)
 
+        build_infos = BuildInfoCache()
+        source_names = set()
         for contract_dir in contract_directories:
             for contract in [c for c in contract_dir.iterdir() if "dbg.json" not in c.name]:
 
                 dbg_json = contract_dir / contract.name.replace('.json', '.dbg.json')
 
                 contract = loads(contract.read_text("utf-8"))
-                dbg = loads(dbg_json.read_text("utf-8"))
-
                 source_name = contract["sourceName"]
+                # Every contract in a source file has an artifact, the source file is mutated once
+                if source_name in source_names:
+                    continue
+                source_names.add(source_name)
+
+                dbg = loads(dbg_json.read_text("utf-8"))
                 build_info_file = contract_dir / dbg["buildInfo"]
-                build_info = loads(build_info_file.read_text("utf-8"))
 
-                ast = build_info["output"]["sources"][source_name]["ast"]
+                ast = build_infos.source_asts(build_info_file)[source_name]
                 absolute_path = self.project_directory / ast["absolutePath"]
 
                 yield self.source_file_builder(ast, absolute_path)
+
+    def _get_solc_sources(self):
+        """ Reads the compiler input of every source unit from the hardhat build info files """
+        sources = {}
+        build_info_dir = self.project_directory / "artifacts" / "build-info"
+        if not build_info_dir.exists():
+            return sources
+
+        for build_info_file in sorted(build_info_dir.glob("*.json")):
+            build_info = loads(build_info_file.read_text("utf-8"))
+            settings = build_info["input"].get("settings", {})
+            for name, source in build_info["input"]["sources"].items():
+                if name in sources or "content" not in source:
+                    continue
+                ast = build_info["output"]["sources"].get(name, {}).get("ast", {})
+                sources[name] = SolcSource(name, source["content"], get_imports(ast), settings)
+        return sources
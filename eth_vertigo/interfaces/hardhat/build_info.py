@@ -0,0 +1,51 @@
+from json import loads
+from pathlib import Path
+from typing import Dict
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional, the build info files are parsed with json instead
+    ijson = None
+
+
+def _read_source_asts(build_info_file: Path) -> Dict[str, Dict]:
+    """ Reads the asts of the source units in a hardhat build info file
+
+    With ijson installed only output.sources is materialized, the compiler input (all source code) and the output's
+    contracts (bytecode, metadata) are streamed past.
+    """
+    if ijson is not None:
+        with build_info_file.open("rb") as stream:
+            return {
+                source_name: unit["ast"]
+                for source_name, unit in ijson.kvitems(stream, "output.sources", use_float=True)
+                if "ast" in unit
+            }
+
+    build_info = loads(build_info_file.read_text("utf-8"))
+    return {
+        source_name: unit["ast"]
+        for source_name, unit in build_info["output"]["sources"].items()
+        if "ast" in unit
+    }
+
+
+class BuildInfoCache:
+    """ Parses every hardhat build info file once
+
+    All artifacts of a compilation job reference the same build info file, which holds the asts of every source unit
+    in the job, so the file only has to be read for the first artifact.
+    """
+
+    def __init__(self):
+        self._asts = {}  # type: Dict[Path, Dict[str, Dict]]
+
+    def source_asts(self, build_info_file: Path) -> Dict[str, Dict]:
+        """ Returns the asts of the source units in a build info file by their source name
+
+        :param build_info_file: Path to the build info file
+        """
+        key = build_info_file.resolve()
+        if key not in self._asts:
+            self._asts[key] = _read_source_asts(key)
+        return self._asts[key]
@@ -1,7 +1,7 @@
-from jsonpath_rw import parse
 from json import loads
 from pathlib import Path
 from eth_vertigo.mutator.source_file import SourceFile
+from eth_vertigo.mutator.solidity.ast_index import AstIndex
 from typing import Dict
 
 def _get_src(src_str: str):
@@ -55,36 +55,32 @@ def _get_op_info(node: dict):
 class HardhatSourceFile(SourceFile):
     def __init__(self, ast: Dict, file: Path):
         self.ast = ast
+        self._index = None
         super().__init__(file)
 
+    @property
+    def index(self) -> AstIndex:
+        """ Index of the nodes of the ast by their type, it is built on first use """
+        if self._index is None:
+            self._index = AstIndex(self.ast)
+        return self._index
+
     def get_binary_op_locations(self):
-        path_expr = parse('*..nodeType.`parent`')
-        for match in path_expr.find(self.ast):
-            if match.value["nodeType"] != "BinaryOperation":
-                continue
-            yield _get_binaryop_info(match.value)
+        for node in self.index.find("BinaryOperation"):
+            yield _get_binaryop_info(node)
 
     def get_if_statement_binary_ops(self):
-        path_expr = parse('*..nodeType.`parent`')
-        for match in path_expr.find(self.ast):
-            if match.value["nodeType"] != "IfStatement":
-                continue
-            condition = match.value["children"][0]
+        for node in self.index.find("IfStatement"):
+            condition = node["children"][0]
             yield _get_binaryop_info(condition)
 
     def get_assignments(self):
-        path_expr = parse('*..nodeType.`parent`')
-        for match in path_expr.find(self.ast):
-            if match.value["nodeType"] != "Assignment":
-                continue
-            yield _get_op_info(match.value)
+        for node in self.index.find("Assignment"):
+            yield _get_op_info(node)
 
     def get_void_calls(self):
-        path_expr = parse('*..nodeType.`parent`')
-        for match in path_expr.find(self.ast):
-            if match.value["nodeType"] != "FunctionCall":
-                continue
-            function_identifier = match.value["expression"]
+        for node in self.index.find("FunctionCall"):
+            function_identifier = node["expression"]
 
             function_typedef = function_identifier["typeDescriptions"]["typeString"]
             if "returns" in function_typedef:
@@ -99,11 +95,8 @@ class HardhatSourceFile(SourceFile):
                     continue
             except KeyError:
                 continue
-            yield (None, _get_src(match.value["src"]))
+            yield (None, _get_src(node["src"]))
 
     def get_modifier_invocations(self):
-        path_expr = parse('*..nodeType.`parent`')
-        for match in path_expr.find(self.ast):
-            if match.value["nodeType"] != "ModifierInvocation":
-                continue
-            yield (None, _get_src(match.value["src"]))
+        for node in self.index.find("ModifierInvocation"):
+            yield (None, _get_src(node["src"]))
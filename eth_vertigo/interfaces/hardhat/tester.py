@@ -1,43 +1,211 @@
+import json
+import os
+import re
 from abc import ABC
 from eth_vertigo.interfaces.hardhat.core import HardhatCore
+from eth_vertigo.coverage.reporter import REPORTER_CONFIGURATION
+from eth_vertigo.interfaces.common.clone import ProjectCloner
+from eth_vertigo.interfaces.common.compilation_cache import CompilationCache
+from eth_vertigo.interfaces.common.daemon import DAEMON_MARKER, TestDaemon
 from eth_vertigo.interfaces.common.tester import MochaStdoutTester
 from eth_vertigo.interfaces.generics import Tester, Compiler
+from eth_vertigo.mutator.schemata import SWITCH_ADDRESS, SWITCH_ENVIRONMENT_VARIABLE
 
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pathlib import Path
 
+# hardhat_reset and evm_revert drop the code of the switch, so it is set again after either is sent by the tests
+_MUTANT_SWITCH_HOOK = """
+const vertigoSetSwitch = async function (provider) {{
+  const id = parseInt(process.env.{variable} || "0");
+  if (!id) return;
+  const params = ["{address}", "0x" + "00".repeat(id)];
+  try {{ await provider.send("hardhat_setCode", params); }} catch (e) {{ await provider.send("evm_setAccountCode", params); }}
+}};
+const vertigoKeepSwitch = async function () {{
+  const provider = require("hardhat").network.provider;
+  if (!provider.vertigoKeepsSwitch) {{
+    provider.vertigoKeepsSwitch = true;
+    const drops = (method) => method === "hardhat_reset" || method === "evm_revert";
+    const request = provider.request.bind(provider);
+    provider.request = async (args) => {{
+      const result = await request(args);
+      if (drops(args.method)) await vertigoSetSwitch(provider);
+      return result;
+    }};
+    const send = provider.send.bind(provider);
+    provider.send = async (method, params) => {{
+      const result = await send(method, params);
+      if (drops(method)) await vertigoSetSwitch(provider);
+      return result;
+    }};
+  }}
+  await vertigoSetSwitch(provider);
+}};
+module.exports.mocha.rootHooks = {{beforeAll: vertigoKeepSwitch, beforeEach: vertigoKeepSwitch}};
+""".format(variable=SWITCH_ENVIRONMENT_VARIABLE, address=SWITCH_ADDRESS)
 
-def _set_reporter(directory: str):
+# Loads the hardhat runtime environment once, and runs the tests with mocha whenever vertigo sends a request
+_TEST_DAEMON = """
+const readline = require("readline");
+const hre = require("hardhat");
+const Mocha = require(require.resolve("mocha", {{paths: [require.resolve("hardhat")]}}));
+
+const emit = (event, data) => process.stdout.write("{marker}" + JSON.stringify([event, data]) + "\\n");
+
+// Sets the environment of a run, and returns a function that restores the environment from before the run
+function applyEnvironment(environment) {{
+  const previous = {{}};
+  Object.keys(environment || {{}}).forEach((key) => {{
+    previous[key] = process.env[key];
+    process.env[key] = environment[key];
+  }});
+  return () => Object.keys(previous).forEach((key) => {{
+    if (previous[key] === undefined) delete process.env[key];
+    else process.env[key] = previous[key];
+  }});
+}}
+
+async function run(request) {{
+  const restoreEnvironment = applyEnvironment(request.environment);
+  try {{
+    await runTests(request);
+  }} finally {{
+    restoreEnvironment();
+  }}
+  emit("end", {{}});
+}}
+
+async function runTests(request) {{
+  if (request.compile) await hre.run("compile", {{quiet: true}});
+  if (hre.artifacts.clearCache) hre.artifacts.clearCache();
+  if (hre.network.name === "hardhat") await hre.network.provider.send("hardhat_reset");
+
+  const files = await hre.run("test:get-test-files", {{testFiles: []}});
+  const mocha = new Mocha(Object.assign({{}}, hre.config.mocha, {{
+    reporter: Mocha.reporters.Base,
+    grep: request.grep ? new RegExp(request.grep) : undefined,
+    bail: request.bail
+  }}));
+  files.forEach((file) => mocha.addFile(file));
+  try {{
+    await new Promise((resolve) => {{
+      const runner = mocha.run(resolve);
+      const report = (kind) => (test) => emit(kind, {{title: test.title, fullTitle: test.fullTitle(), duration: test.duration || 0}});
+      runner.on("pass", report("pass"));
+      runner.on("fail", report("fail"));
+    }});
+  }} finally {{
+    mocha.dispose();
+  }}
+}}
+
+let queue = Promise.resolve();
+readline.createInterface({{input: process.stdin}})
+  .on("line", (line) => {{
+    queue = queue.then(() => run(JSON.parse(line))).catch((e) => emit("error", {{message: String(e && e.stack || e)}}));
+  }})
+  .on("close", () => queue.then(() => process.exit(0)));
+emit("ready", {{}});
+""".format(marker=DAEMON_MARKER)
+
+
+def _set_reporter(directory: str, bail: bool = False):
     config = Path(directory) / "hardhat.config.js"
     content = config.read_text("utf-8")
-    content += "\nmodule.exports.mocha = {reporter: \"json\"};\n"
+    if bail:
+        content += "\nmodule.exports.mocha = {reporter: \"json-stream\", bail: true};\n"
+    else:
+        content += "\nmodule.exports.mocha = {reporter: \"json\"};\n"
     content += "\nmodule.exports.solc = {optimizer: { enabled: true, runs: 200 }};\n"
     config.write_text(content, "utf-8")
 
 
+def _set_networks(directory: str, network_urls: Dict[str, str]):
+    config = Path(directory) / "hardhat.config.js"
+    content = config.read_text("utf-8")
+    networks = {name: {"url": url} for name, url in network_urls.items()}
+    content += "\nmodule.exports.networks = Object.assign({}, module.exports.networks, " + json.dumps(networks) + ");\n"
+    config.write_text(content, "utf-8")
+
+
+def _set_mutant_switch(directory: str):
+    config = Path(directory) / "hardhat.config.js"
+    content = config.read_text("utf-8")
+    content += _MUTANT_SWITCH_HOOK
+    config.write_text(content, "utf-8")
+
+
+def _set_coverage_reporter(directory: str):
+    config = Path(directory) / "hardhat.config.js"
+    content = config.read_text("utf-8")
+    content += REPORTER_CONFIGURATION
+    config.write_text(content, "utf-8")
+
+
 def _set_include_tests(directory: str, test_names: List[str]):
     config = Path(directory) / "hardhat.config.js"
 
     content = config.read_text("utf-8")
 
-    test_regex = "({})".format("|".join(test_names))
-    content += "\nmodule.exports.mocha.grep= \"" + test_regex + "\";\n"
+    test_regex = "({})".format("|".join(re.escape(name) for name in test_names))
+    content += "\nmodule.exports.mocha.grep = " + json.dumps(test_regex) + ";\n"
     config.write_text(content, "utf-8")
 
 
 class HardhatTester(HardhatCore, MochaStdoutTester):
-    def __init__(self, hardhat_command: List[str], project_directory, compiler: Compiler):
+    configuration_files = ["hardhat.config.js"]
+    build_directories = ["artifacts", "cache"]
+
+    def __init__(
+            self,
+            hardhat_command: List[str],
+            project_directory,
+            compiler: Compiler,
+            cloner: ProjectCloner = None,
+            compilation_cache: CompilationCache = None,
+            bail: bool = False,
+            persistent: bool = False,
+            network_urls: Dict[str, str] = None
+    ):
+        """ Initializes the tester
+
+        :param network_urls: Json rpc urls of the standalone networks that the tests can be pointed to, the tests of
+            any other network run on hardhat's in-process network
+        """
         self.project_directory = project_directory
         self.compiler = compiler
+        self.cloner = cloner
+        self.compilation_cache = compilation_cache
+        self.bail = bail
+        self.persistent = persistent
+        self.network_urls = network_urls or {}
         HardhatCore.__init__(self, hardhat_command)
 
     def instrument_configuration(self, directory, keep_test_names: Optional[List[str]]):
-        _set_reporter(directory)
+        _set_reporter(directory, self.bail)
+        if self.network_urls:
+            _set_networks(directory, self.network_urls)
         if keep_test_names:
-            _set_include_tests(self.directory, keep_test_names)
+            _set_include_tests(directory, keep_test_names)
+
+    def create_daemon(self, directory: str, network: Optional[str] = None) -> TestDaemon:
+        environment = None
+        if network in self.network_urls:
+            environment = dict(os.environ)
+            environment["HARDHAT_NETWORK"] = network
+        return TestDaemon(["node", "-e", _TEST_DAEMON], directory, environment, network)
+
+    def instrument_mutant_switch(self, directory):
+        _set_mutant_switch(directory)
+
+    def instrument_coverage(self, directory):
+        _set_coverage_reporter(directory)
 
-    def build_test_command(self, network: Optional[str]) -> List[str]:
+    def build_test_command(self, network: Optional[str], compile: bool = True) -> List[str]:
         result = self.hardhat_command + ['test']
-        # if network:
-        #     result.extend(['--network', network])
+        if not compile:
+            result.append('--no-compile')
+        if network in self.network_urls:
+            result.extend(['--network', network])
         return result
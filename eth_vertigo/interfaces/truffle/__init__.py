@@ -3,6 +3,11 @@ from typing import List
 from eth_vertigo.mutator.mutator import Mutator
 from pathlib import Path
 from eth_vertigo.core.network import NetworkPool
+from eth_vertigo.core.timeout import TimeoutPolicy
+from eth_vertigo.interfaces.common.clone import ProjectCloner
+from eth_vertigo.interfaces.common.compilation_cache import CompilationCache
+from eth_vertigo.interfaces.common.solc import SolcSource, get_imports
+from json import loads
 
 
 class TruffleCampaign(BaseCampaign):
@@ -13,14 +18,24 @@ class TruffleCampaign(BaseCampaign):
             mutators: List[Mutator],
             network_pool: NetworkPool,
             filters=None,
-            suggesters=None
+            suggesters=None,
+            cloner: ProjectCloner = None,
+            schemata: bool = False,
+            compilation_cache: CompilationCache = None,
+            solc_binary: str = None,
+            bail: bool = False,
+            timeout_policy: TimeoutPolicy = None,
+            persistent: bool = False,
+            mutation_processes: int = 1
     ):
         from eth_vertigo.interfaces.truffle.tester import TruffleTester
         from eth_vertigo.interfaces.truffle.compiler import TruffleCompiler
         from eth_vertigo.interfaces.truffle.mutator import SolidityFile
 
         compiler = TruffleCompiler(truffle_location)
-        tester = TruffleTester(truffle_location, str(project_directory), compiler)
+        tester = TruffleTester(
+            truffle_location, str(project_directory), compiler, cloner, compilation_cache, bail, persistent
+        )
         source_file_builder = lambda path: SolidityFile(path)
 
         super().__init__(
@@ -33,7 +48,11 @@ class TruffleCampaign(BaseCampaign):
             source_file_builder=source_file_builder,
 
             filters=filters,
-            suggesters=suggesters
+            suggesters=suggesters,
+            schemata=schemata,
+            solc_binary=solc_binary,
+            timeout_policy=timeout_policy,
+            mutation_processes=mutation_processes
         )
 
     def _get_sources(self, dir=None):
@@ -47,4 +66,19 @@ class TruffleCampaign(BaseCampaign):
                 continue
             if not source_file.name.endswith(".json"):
                 continue
-            yield self.source_file_builder(source_file)
\ No newline at end of file
+            yield self.source_file_builder(source_file)
+
+    def _get_solc_sources(self):
+        """ Reads the source units from the truffle artifacts
+
+        Truffle artifacts do not record the compiler settings, the default settings of solc are used.
+        """
+        sources = {}
+        for artifact_file in sorted(self.source_directory.glob("*.json")):
+            artifact = loads(artifact_file.read_text("utf-8"))
+            ast = artifact.get("ast") or {}
+            name = ast.get("absolutePath")
+            if not name or name in sources or "source" not in artifact:
+                continue
+            sources[name] = SolcSource(name, artifact["source"], get_imports(ast), {})
+        return sources
@@ -1,21 +1,75 @@
+import json
+import re
 from pathlib import Path
 from typing import List, Optional
 
+from eth_vertigo.coverage.reporter import REPORTER_CONFIGURATION
+from eth_vertigo.interfaces.common.clone import ProjectCloner
+from eth_vertigo.interfaces.common.compilation_cache import CompilationCache
 from eth_vertigo.interfaces.common.tester import MochaStdoutTester
 from eth_vertigo.interfaces.generics import Compiler
 from eth_vertigo.interfaces.truffle.core import TruffleCore
+from eth_vertigo.mutator.schemata import SWITCH_ADDRESS, SWITCH_ENVIRONMENT_VARIABLE
 
+# Reverting a snapshot drops the code of the switch, so it is set again after every evm_revert
+_MUTANT_SWITCH_HOOK = """
+const vertigoSetSwitch = async function () {{
+  const id = parseInt(process.env.{variable} || "0");
+  if (!id) return;
+  const send = (method) => new Promise((resolve, reject) => web3.currentProvider.send(
+    {{jsonrpc: "2.0", id: Date.now(), method: method, params: ["{address}", "0x" + "00".repeat(id)]}},
+    (error, result) => (error || (result && result.error)) ? reject(error || result.error) : resolve(result)
+  ));
+  try {{ await send("evm_setAccountCode"); }} catch (e) {{ await send("hardhat_setCode"); }}
+}};
+const vertigoKeepSwitch = async function () {{
+  const provider = web3.currentProvider;
+  if (!provider.vertigoKeepsSwitch) {{
+    provider.vertigoKeepsSwitch = true;
+    const send = provider.send.bind(provider);
+    provider.send = (payload, callback) => {{
+      if (payload.method !== "evm_revert") return send(payload, callback);
+      const done = (error, result) => () => callback(error, result);
+      send(payload, (error, result) => vertigoSetSwitch().then(done(error, result), done(error, result)));
+    }};
+  }}
+  await vertigoSetSwitch();
+}};
+module.exports.mocha.rootHooks = {{beforeAll: vertigoKeepSwitch, beforeEach: vertigoKeepSwitch}};
+""".format(variable=SWITCH_ENVIRONMENT_VARIABLE, address=SWITCH_ADDRESS)
 
-def _set_reporter(directory: str):
+
+def _set_reporter(directory: str, bail: bool = False):
     config = Path(directory) / "truffle.js"
     if not config.is_file():
         config = Path(directory) / "truffle-config.js"
     content = config.read_text("utf-8")
-    content += "\nmodule.exports.mocha = {reporter: \"json\"};\n"
+    if bail:
+        content += "\nmodule.exports.mocha = {reporter: \"json-stream\", bail: true};\n"
+    else:
+        content += "\nmodule.exports.mocha = {reporter: \"json\"};\n"
     content += "\nmodule.exports.solc = {optimizer: { enabled: true, runs: 200}};\n"
     config.write_text(content, "utf-8")
 
 
+def _set_mutant_switch(directory: str):
+    config = Path(directory) / "truffle.js"
+    if not config.is_file():
+        config = Path(directory) / "truffle-config.js"
+    content = config.read_text("utf-8")
+    content += _MUTANT_SWITCH_HOOK
+    config.write_text(content, "utf-8")
+
+
+def _set_coverage_reporter(directory: str):
+    config = Path(directory) / "truffle.js"
+    if not config.is_file():
+        config = Path(directory) / "truffle-config.js"
+    content = config.read_text("utf-8")
+    content += REPORTER_CONFIGURATION
+    config.write_text(content, "utf-8")
+
+
 def _set_include_tests(directory: str, test_names: List[str]):
     config = Path(directory) / "truffle.js"
     if not config.is_file():
@@ -23,24 +77,49 @@ def _set_include_tests(directory: str, test_names: List[str]):
 
     content = config.read_text("utf-8")
 
-    test_regex = "({})".format("|".join(test_names))
-    content += "\nmodule.exports.mocha.grep= \"" + test_regex + "\";\n"
+    test_regex = "({})".format("|".join(re.escape(name) for name in test_names))
+    content += "\nmodule.exports.mocha.grep = " + json.dumps(test_regex) + ";\n"
     config.write_text(content, "utf-8")
 
 
 class TruffleTester(TruffleCore, MochaStdoutTester):
-    def __init__(self, truffle_location, project_directory, compiler: Compiler):
+    configuration_files = ["truffle.js", "truffle-config.js"]
+    build_directories = ["build"]
+
+    def __init__(
+            self,
+            truffle_location,
+            project_directory,
+            compiler: Compiler,
+            cloner: ProjectCloner = None,
+            compilation_cache: CompilationCache = None,
+            bail: bool = False,
+            persistent: bool = False
+    ):
         self.project_directory = project_directory
         self.compiler = compiler
+        self.cloner = cloner
+        self.compilation_cache = compilation_cache
+        self.bail = bail
+        # Truffle has no test daemon, so every test run still starts truffle
+        self.persistent = persistent
         TruffleCore.__init__(self, truffle_location)
 
     def instrument_configuration(self, working_directory, keep_test_names: Optional[List[str]]):
-        _set_reporter(working_directory)
+        _set_reporter(working_directory, self.bail)
         if keep_test_names:
             _set_include_tests(working_directory, keep_test_names)
 
-    def build_test_command(self, network: Optional[str]) -> List[str]:
+    def instrument_mutant_switch(self, working_directory):
+        _set_mutant_switch(working_directory)
+
+    def instrument_coverage(self, working_directory):
+        _set_coverage_reporter(working_directory)
+
+    def build_test_command(self, network: Optional[str], compile: bool = True) -> List[str]:
         result = [self.truffle_location, 'test']
         if network:
             result.extend(['--network', network])
+        if not compile:
+            result.append('--compile-none')
         return result
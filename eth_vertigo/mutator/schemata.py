@@ -0,0 +1,278 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from eth_vertigo.core.mutation import Mutation
+
+# The active mutant is read from the code size of this account, the test harness sets its code before each run
+SWITCH_ADDRESS = "0x00000000000000000000000000000000000057ee"
+SWITCH_ENVIRONMENT_VARIABLE = "VERTIGO_ACTIVE_MUTANT"
+
+_SWITCH_HELPER = \
+    "\n    function __vertigoSwitchView{id}() internal view returns (uint256 __vertigoId) {{" \
+    " assembly {{ __vertigoId := extcodesize(" + SWITCH_ADDRESS + ") }} }}" \
+    "\n    function __vertigoSwitchCast{id}(function() internal view returns (uint256) __vertigoIn)" \
+    " internal pure returns (function() internal pure returns (uint256) __vertigoOut) {{" \
+    " assembly {{ __vertigoOut := __vertigoIn }} }}" \
+    "\n    function __vertigoSwitch{id}() internal pure returns (uint256) {{" \
+    " return __vertigoSwitchCast{id}(__vertigoSwitchView{id})(); }}\n"
+
+_CONSTANT_TYPES = ("int_const", "rational_const", "literal_string")
+
+
+def _get_src(src_str: str):
+    return [int(e) for e in src_str.split(":")]
+
+
+def _operator_hole(node: dict, left: str, right: str) -> Tuple[int, int]:
+    """ Returns the (start, end) range in between the two operands of the node """
+    left_src = _get_src(node[left]["src"])
+    right_src = _get_src(node[right]["src"])
+    return left_src[0] + left_src[1], right_src[0]
+
+
+class _Site:
+    """ A location in a source file that can be guarded by the mutant switch """
+
+    def __init__(self, span: Tuple[int, int], hole: Tuple[int, int], is_statement: bool, contract_id: int):
+        self.span = span
+        self.hole = hole
+        self.is_statement = is_statement
+        self.contract_id = contract_id
+        self.mutations = []  # type: List[Mutation]
+        self.variants = []  # type: List[Tuple[int, str]]
+        self.children = []  # type: List[_Site]
+
+
+def _walk(ast: dict):
+    """ Iteratively walks the ast, yielding (node, contract, in_body) triples
+
+    contract is the enclosing contract definition, in_body signals whether the node is part of a function or
+    modifier body.
+    """
+    stack = [(ast, None, False)]
+    while stack:
+        node, contract, in_body = stack.pop()
+        if isinstance(node, list):
+            stack.extend((child, contract, in_body) for child in reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+        if "nodeType" in node:
+            if node["nodeType"] == "ContractDefinition":
+                contract = node
+            yield node, contract, in_body
+
+        children = []
+        for key, value in node.items():
+            if not isinstance(value, (dict, list)):
+                continue
+            child_in_body = in_body
+            if node.get("nodeType") in ("FunctionDefinition", "ModifierDefinition"):
+                child_in_body = key == "body"
+            children.append((value, contract, child_in_body))
+        stack.extend(reversed(children))
+
+
+def _find_sites(ast: dict, text: str) -> Dict[Tuple[int, int], _Site]:
+    """ Finds all locations in the ast that can be guarded, indexed by the range that mutations rewrite """
+    sites = {}
+    for node, contract, in_body in _walk(ast):
+        if not in_body or contract is None or contract.get("contractKind") == "interface":
+            continue
+        node_type = node["nodeType"]
+        try:
+            if node_type == "BinaryOperation":
+                type_string = node.get("typeDescriptions", {}).get("typeString") or ""
+                if type_string.startswith(_CONSTANT_TYPES):
+                    continue
+                hole = _operator_hole(node, "leftExpression", "rightExpression")
+                is_statement = False
+                src = _get_src(node["src"])
+                span = (src[0], src[0] + src[1])
+            elif node_type == "Assignment":
+                hole = _operator_hole(node, "leftHandSide", "rightHandSide")
+                is_statement = False
+                src = _get_src(node["src"])
+                span = (src[0], src[0] + src[1])
+            elif node_type == "ExpressionStatement" and node["expression"]["nodeType"] == "FunctionCall":
+                src = _get_src(node["expression"]["src"])
+                span = (src[0], src[0] + src[1] + 1)
+                if text[span[1] - 1:span[1]] != ";":
+                    continue
+                hole = span
+                is_statement = True
+            else:
+                continue
+        except (KeyError, TypeError, ValueError):
+            continue
+        sites[(hole[0], hole[1] - hole[0])] = _Site(span, hole, is_statement, contract["id"])
+    return sites
+
+
+def _nest(sites: List[_Site]) -> Tuple[List[_Site], List[_Site]]:
+    """ Arranges the sites in a tree, returns the top level sites and the sites that could not be nested """
+    top_level = []
+    rejected = []
+    stack = []  # type: List[_Site]
+    for site in sorted(sites, key=lambda s: (s.span[0], -s.span[1])):
+        while stack and stack[-1].span[1] <= site.span[0]:
+            stack.pop()
+        if not stack:
+            top_level.append(site)
+            stack.append(site)
+            continue
+        parent = stack[-1]
+        inside_parent = parent.span[0] <= site.span[0] and site.span[1] <= parent.span[1]
+        in_hole = parent.hole[0] < site.span[1] and site.span[0] < parent.hole[1]
+        if not inside_parent or in_hole or parent.span == site.span:
+            rejected.append(site)
+            continue
+        parent.children.append(site)
+        stack.append(site)
+    return top_level, rejected
+
+
+def _render_range(text: str, start: int, end: int, children: List[_Site], hole=None, replacement=None) -> str:
+    edits = []
+    for child in children:
+        if hole is not None and hole[0] <= child.span[0] and child.span[1] <= hole[1]:
+            continue
+        edits.append((child.span[0], child.span[1], _render_site(text, child)))
+    if hole is not None:
+        edits.append((hole[0], hole[1], replacement))
+
+    result = []
+    cursor = start
+    for edit_start, edit_end, edit_text in sorted(edits, key=lambda e: e[0]):
+        result.append(text[cursor:edit_start])
+        result.append(edit_text)
+        cursor = edit_end
+    result.append(text[cursor:end])
+    return "".join(result)
+
+
+def _render_site(text: str, site: _Site) -> str:
+    switch = "__vertigoSwitch{}()".format(site.contract_id)
+    original = _render_range(text, site.span[0], site.span[1], site.children)
+
+    if site.is_statement:
+        result = "{ " + original + " }"
+        for mutant_id, value in reversed(site.variants):
+            mutated = _render_range(text, site.span[0], site.span[1], site.children, site.hole, value)
+            result = "if ({} == {}) {{ {} }} else {}".format(switch, mutant_id, mutated, result)
+        return "{ " + result + " }"
+
+    result = "(" + original + ")"
+    for mutant_id, value in reversed(site.variants):
+        mutated = _render_range(text, site.span[0], site.span[1], site.children, site.hole, value)
+        result = "({} == {} ? ({}) : {})".format(switch, mutant_id, mutated, result)
+    return result
+
+
+class MutantSchemata:
+    """ Mutant schemata (meta-mutants)
+
+    A schematized source file contains all of its mutants at once, each guarded by a runtime switch. This allows
+    vertigo to compile the project once, and then select the active mutant for each test run.
+
+    Mutations that can be schematized are assigned a schema_id, which is the value of the switch that enables them.
+    """
+
+    def __init__(self):
+        self.sources = {}  # type: Dict[str, str]
+        self.original_sources = {}  # type: Dict[str, str]
+        self.mutations = {}  # type: Dict[str, List[Mutation]]
+
+    @property
+    def mutation_count(self) -> int:
+        """ Amount of mutations that are schematized """
+        return sum(len(mutations) for mutations in self.mutations.values())
+
+    def covers(self, relative_path: str) -> bool:
+        """ Returns whether the file with the given path is schematized """
+        return relative_path in self.sources
+
+    def discard(self, relative_path: str) -> None:
+        """ Drops a file from the schemata, its mutations will be evaluated one by one again """
+        for mutation in self.mutations.pop(relative_path, []):
+            mutation.schema_id = None
+        self.sources.pop(relative_path, None)
+        self.original_sources.pop(relative_path, None)
+
+    @staticmethod
+    def build(mutations: List[Mutation]) -> "MutantSchemata":
+        """ Builds schematized sources for the given mutations """
+        schemata = MutantSchemata()
+        by_source = {}
+        for mutation in mutations:
+            by_source.setdefault(mutation.relative_path, []).append(mutation)
+
+        next_id = 1
+        for relative_path, file_mutations in by_source.items():
+            schematized = schemata._schematize(file_mutations, next_id)
+            if schematized is None:
+                continue
+            next_id += len(schemata.mutations[relative_path])
+            schemata.sources[relative_path] = schematized
+        return schemata
+
+    def _schematize(self, mutations: List[Mutation], first_id: int) -> Optional[str]:
+        source = mutations[0].source
+        ast = getattr(source, "ast", None)
+        if not isinstance(ast, dict) or "nodeType" not in ast:
+            return None
+
+        relative_path = mutations[0].relative_path
+        text = Path(source.file).read_text("utf-8")
+        sites = _find_sites(ast, text)
+
+        used_sites = {}
+        for mutation in mutations:
+            site = sites.get((mutation.location[0], mutation.location[1]))
+            if site is None:
+                continue
+            used_sites[id(site)] = site
+            site.mutations.append(mutation)
+
+        if not used_sites:
+            return None
+
+        top_level, rejected = _nest(list(used_sites.values()))
+        rejected_mutations = [mutation for site in rejected for mutation in site.mutations]
+
+        schematized_mutations = []
+        contracts = set()
+
+        def assign(site_list):
+            for site in site_list:
+                for mutation in site.mutations:
+                    mutation.schema_id = first_id + len(schematized_mutations)
+                    schematized_mutations.append(mutation)
+                    site.variants.append((mutation.schema_id, mutation.value))
+                contracts.add(site.contract_id)
+                assign(site.children)
+
+        assign(top_level)
+        logger.debug(f"Schematized {len(schematized_mutations)} mutations in {relative_path}, "
+                     f"{len(rejected_mutations)} overlapping mutations are evaluated separately")
+
+        edits = [(site.span[0], site.span[1], _render_site(text, site)) for site in top_level]
+        for node, _, _ in _walk(ast):
+            if node["nodeType"] == "ContractDefinition" and node["id"] in contracts:
+                src = _get_src(node["src"])
+                closing_brace = src[0] + src[1] - 1
+                edits.append((closing_brace, closing_brace, _SWITCH_HELPER.format(id=node["id"])))
+
+        result = []
+        cursor = 0
+        for edit_start, edit_end, edit_text in sorted(edits, key=lambda e: e[0]):
+            result.append(text[cursor:edit_start])
+            result.append(edit_text)
+            cursor = edit_end
+        result.append(text[cursor:])
+
+        self.mutations[relative_path] = schematized_mutations
+        self.original_sources[relative_path] = text
+        return "".join(result)
@@ -0,0 +1,40 @@
+from typing import Dict, List, Union
+
+
+class AstIndex:
+    """ Index of the nodes of a solc ast by their type
+
+    The index is built with a single iterative pass over the ast. It holds the same nodes, in the same (pre-order)
+    order, as the jsonpath query `*..<type_key>.`parent`` that was used to look up nodes before: every object below
+    the root that has a type_key field.
+    """
+
+    def __init__(self, ast: Union[Dict, List], type_key: str = "nodeType"):
+        """ Builds the index
+
+        :param ast: The ast to index
+        :param type_key: Field that holds the type of a node, "nodeType" for compact asts and "name" for legacy asts
+        """
+        self.type_key = type_key
+        self._nodes = {}  # type: Dict[str, List[Dict]]
+
+        if isinstance(ast, dict):
+            stack = list(reversed(list(ast.values())))
+        elif isinstance(ast, list):
+            stack = list(reversed(ast))
+        else:
+            stack = []
+
+        while stack:
+            item = stack.pop()
+            if isinstance(item, dict):
+                node_type = item.get(type_key)
+                if isinstance(node_type, str):
+                    self._nodes.setdefault(node_type, []).append(item)
+                stack.extend(reversed(list(item.values())))
+            elif isinstance(item, list):
+                stack.extend(reversed(item))
+
+    def find(self, node_type: str) -> List[Dict]:
+        """ Returns the nodes of the given type, in the order in which they appear in the ast """
+        return self._nodes.get(node_type, [])
@@ -1,9 +1,9 @@
-from jsonpath_rw import parse
 from subprocess import Popen, PIPE
 import re
 from json import loads, JSONDecodeError
 from pathlib import Path
 from eth_vertigo.mutator.source_file import SourceFile
+from eth_vertigo.mutator.solidity.ast_index import AstIndex
 
 
 def _get_ast(file: Path):
@@ -96,35 +96,31 @@ class SolidityFile(SourceFile):
     def __init__(self, file: Path):
         super().__init__(file)
         self.ast = _get_ast(file)
+        self._index = None
+
+    @property
+    def index(self) -> AstIndex:
+        """ Index of the nodes of the ast by their type, it is built on first use """
+        if self._index is None:
+            self._index = AstIndex(self.ast, type_key="name")
+        return self._index
 
     def get_binary_op_locations(self):
-        path_expr = parse('*..name.`parent`')
-        for match in path_expr.find(self.ast):
-            if match.value["name"] != "BinaryOperation":
-                continue
-            yield _get_binaryop_info(match.value)
+        for node in self.index.find("BinaryOperation"):
+            yield _get_binaryop_info(node)
 
     def get_if_statement_binary_ops(self):
-        path_expr = parse('*..name.`parent`')
-        for match in path_expr.find(self.ast):
-            if match.value["name"] != "IfStatement":
-                continue
-            condition = match.value["children"][0]
+        for node in self.index.find("IfStatement"):
+            condition = node["children"][0]
             yield _get_binaryop_info(condition)
 
     def get_assignments(self):
-        path_expr = parse('*..name.`parent`')
-        for match in path_expr.find(self.ast):
-            if match.value["name"] != "Assignment":
-                continue
-            yield _get_op_info(match.value)
+        for node in self.index.find("Assignment"):
+            yield _get_op_info(node)
 
     def get_void_calls(self):
-        path_expr = parse('*..name.`parent`')
-        for match in path_expr.find(self.ast):
-            if match.value["name"] != "FunctionCall":
-                continue
-            function_identifier = match.value["childen"][0]
+        for node in self.index.find("FunctionCall"):
+            function_identifier = node["childen"][0]
             function_typedef = function_identifier["attributes"]["type"]
             if "returns" in function_typedef:
                 continue
@@ -132,7 +128,7 @@ class SolidityFile(SourceFile):
                 continue
             if "require" in function_identifier["attributes"]["value"]:
                 continue
-            yield (None, _get_src(match.value["src"]))
+            yield (None, _get_src(node["src"]))
 
     def get_modifier_invocations(self):
         return []
@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+from eth_vertigo.core import MutationResult
+from eth_vertigo.core.network import StaticNetworkPool
+from eth_vertigo.interfaces.hardhat import HardhatCampaign
+from eth_vertigo.interfaces.truffle import TruffleCampaign
+
+sys.path.insert(0, str(Path(__file__).absolute().parent.parent.parent / "benchmarks"))
+
+from stubs import create_project, generate_contract, install_stubs  # noqa: E402
+
+
+def _nodes(node):
+    if isinstance(node, dict):
+        if "nodeType" in node:
+            yield node
+        for value in node.values():
+            yield from _nodes(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _nodes(value)
+
+
+def test_generated_locations():
+    # Act
+    source, ast = generate_contract("Token", 2, 3)
+
+    # Assert
+    for node in _nodes(ast):
+        if node["nodeType"] != "Identifier":
+            continue
+        start, length, index = [int(part) for part in node["src"].split(":")]
+        assert source[start:start + length] == node["name"]
+        assert index == 3
+
+
+def _evaluate(tmp_path, framework):
+    project = create_project(tmp_path, framework, contracts=2, functions=1, tests=2)
+    stubs = install_stubs(tmp_path / "bin")
+    network_pool = StaticNetworkPool(["bench"])
+    if framework == "truffle":
+        campaign = TruffleCampaign(stubs["framework"], project, [], network_pool)
+    else:
+        campaign = HardhatCampaign([stubs["framework"]], project, [], network_pool)
+    try:
+        campaign.setup()
+        valid = campaign.valid()
+        campaign.store_compilation_results()
+        campaign.run(lambda: None)
+    finally:
+        campaign.teardown()
+    return valid, campaign.mutations
+
+
+def test_hardhat_campaign_on_stubs(tmp_path):
+    # Act
+    valid, mutations = _evaluate(tmp_path, "hardhat")
+
+    # Assert
+    assert valid
+    assert len(mutations) == 14
+    assert {MutationResult.KILLED, MutationResult.LIVED} == {mutation.result for mutation in mutations}
+
+
+def test_truffle_campaign_on_stubs(tmp_path):
+    # Act
+    valid, mutations = _evaluate(tmp_path, "truffle")
+
+    # Assert
+    assert valid
+    assert len(mutations) == 14
+    assert all(mutation.result in (MutationResult.KILLED, MutationResult.LIVED) for mutation in mutations)
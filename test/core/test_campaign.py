@@ -0,0 +1,201 @@
+from pathlib import Path
+from time import sleep
+from unittest.mock import MagicMock
+
+from eth_vertigo.core import Mutation, MutationResult
+from eth_vertigo.core.campaign import Campaign, BaseCampaign
+from eth_vertigo.core.network import ProcessStaticNetworkPool, StaticNetworkPool
+from eth_vertigo.mutator.mutator import Mutator
+from eth_vertigo.mutator.source_file import SourceFile
+
+
+class _Campaign(Campaign):
+    def __init__(self, mutations):
+        super().__init__()
+        self.mutations = mutations
+        self.is_set_up = True
+        self.tested = []
+
+    def test_mutation(self, mutation, done_callback):
+        self.tested.append(mutation)
+        sleep(0.01)
+        mutation.result = MutationResult.LIVED
+        done_callback()
+
+
+def _mutations(tmp_path: Path, amount: int):
+    source = SourceFile(tmp_path / "C.sol")
+    return [Mutation((1, 1, 0), source, "X", tmp_path) for _ in range(amount)]
+
+
+def test_stream_yields_finished_mutations(tmp_path):
+    # Arrange
+    campaign = _Campaign(_mutations(tmp_path, 3))
+
+    # Act
+    streamed = list(campaign.stream())
+
+    # Assert
+    assert sorted(map(id, streamed)) == sorted(map(id, campaign.mutations))
+    assert all(m.result == MutationResult.LIVED and m.duration is not None for m in streamed)
+
+
+def test_stream_stops_when_closed(tmp_path):
+    # Arrange
+    campaign = _Campaign(_mutations(tmp_path, 50))
+    results = campaign.stream()
+
+    # Act
+    first = next(results)
+    results.close()
+
+    # Assert
+    assert first.result == MutationResult.LIVED
+    assert len(campaign.tested) < 50
+
+
+class _ProcessCampaign(Campaign):
+    def __init__(self, mutations, network_pool):
+        super().__init__()
+        self.mutations = mutations
+        self.network_pool = network_pool
+        self.is_set_up = True
+        self.slot = None
+
+    def bind_worker(self, index):
+        self.slot = index
+
+    def test_mutation(self, mutation, done_callback):
+        network = self.network_pool.claim()
+        try:
+            sleep(0.01)
+            mutation.result = MutationResult.KILLED
+            mutation.crime_scenes = [network, str(self.slot)]
+        finally:
+            self.network_pool.yield_network(network)
+        done_callback()
+
+
+def test_stream_in_processes(tmp_path):
+    # Arrange
+    campaign = _ProcessCampaign(_mutations(tmp_path, 6), ProcessStaticNetworkPool(["a", "b"]))
+
+    # Act
+    streamed = list(campaign.stream(threads=2, processes=True))
+
+    # Assert
+    assert len(streamed) == 6
+    assert all(m.result == MutationResult.KILLED and m.duration is not None for m in campaign.mutations)
+    assert {m.crime_scenes[0] for m in campaign.mutations} <= {"a", "b"}
+    assert {m.crime_scenes[1] for m in campaign.mutations} <= {"0", "1"}
+    assert sorted(campaign.network_pool.claim() for _ in range(2)) == ["a", "b"]
+
+
+def test_stream_in_processes_stops_when_closed(tmp_path):
+    # Arrange
+    campaign = _ProcessCampaign(_mutations(tmp_path, 50), ProcessStaticNetworkPool(["a", "b"]))
+    results = campaign.stream(threads=2, processes=True)
+
+    # Act
+    first = next(results)
+    results.close()
+
+    # Assert
+    assert first.result == MutationResult.KILLED
+    assert len([m for m in campaign.mutations if m.result is not None]) < 50
+
+
+def test_stream_asynchronous(tmp_path):
+    # Arrange
+    campaign = _Campaign(_mutations(tmp_path, 5))
+
+    # Act
+    streamed = list(campaign.stream(threads=2, asynchronous=True))
+
+    # Assert
+    assert len(streamed) == 5
+    assert all(m.result == MutationResult.LIVED and m.duration is not None for m in campaign.mutations)
+
+
+def test_stream_asynchronous_stops_when_closed(tmp_path):
+    # Arrange
+    campaign = _Campaign(_mutations(tmp_path, 50))
+    results = campaign.stream(asynchronous=True)
+
+    # Act
+    first = next(results)
+    results.close()
+
+    # Assert
+    assert first.result == MutationResult.LIVED
+    assert len(campaign.tested) < 50
+
+
+class _Mutator(Mutator):
+    def mutate(self, source_file, project_directory):
+        return [
+            Mutation((offset, 1, 0), source_file, "{}:{}".format(source_file.file.name, offset), project_directory)
+            for offset in range(3)
+        ]
+
+
+class _SourceCampaign(BaseCampaign):
+    def _get_sources(self, dir=None):
+        return [SourceFile(self.project_directory / "C{}.sol".format(i)) for i in range(10)]
+
+
+def _generate(tmp_path: Path, mutation_processes: int):
+    campaign = _SourceCampaign(
+        tmp_path, [_Mutator()], StaticNetworkPool(["a"]), MagicMock(), MagicMock(), None,
+        mutation_processes=mutation_processes
+    )
+    campaign.setup()
+    return campaign
+
+
+def test_generate_mutations_in_processes(tmp_path):
+    # Arrange
+    expected = _generate(tmp_path, 1).mutations
+
+    # Act
+    campaign = _generate(tmp_path, 3)
+
+    # Assert
+    assert len(campaign.mutations) == 30
+    assert [(m.source.file, m.location, m.value) for m in campaign.mutations] == \
+           [(m.source.file, m.location, m.value) for m in expected]
+    assert all(mutation.source in campaign.sources for mutation in campaign.mutations)
+
+
+def test_mutation_without_network_is_not_counted(tmp_path):
+    # Arrange
+    campaign = _generate(tmp_path, 1)
+    campaign.tester.run_tests.return_value = {}
+    campaign.network_pool = MagicMock()
+    campaign.network_pool.claim.side_effect = ValueError("No network available")
+    mutation = campaign.mutations[0]
+    done = []
+
+    # Act
+    campaign.test_mutation(mutation, lambda: done.append(mutation))
+
+    # Assert
+    assert mutation.result is None
+    assert done == [mutation]
+    campaign.tester.run_tests.assert_not_called()
+
+
+def test_stream_evaluates_mutation_again_when_no_network_was_claimed(tmp_path):
+    # Arrange
+    campaign = _generate(tmp_path, 1)
+    campaign.mutations = campaign.mutations[:1]
+    campaign.tester.run_tests.return_value = {}
+    campaign.network_pool = MagicMock()
+    campaign.network_pool.claim.side_effect = [ValueError("No network available"), "a"]
+
+    # Act
+    streamed = list(campaign.stream())
+
+    # Assert
+    assert streamed[0].result == MutationResult.LIVED
+    assert campaign.network_pool.claim.call_count == 2
@@ -0,0 +1,119 @@
+import os
+import socket
+import sys
+from time import time
+
+import pytest
+
+from eth_vertigo.core.network.ganache import Ganache, NetworkStartError
+from eth_vertigo.core.network.hardhat import HardhatNode
+
+_NODE = """#!%s
+import json, sys, time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+port = int(sys.argv[sys.argv.index("--port") + 1])
+print("ganache v0.0.0", flush=True)
+time.sleep(0.2)
+
+class Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": "1337"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        print("request", flush=True)
+
+HTTPServer(("127.0.0.1", port), Handler).serve_forever()
+""" % sys.executable
+
+_CRASH = """#!%s
+import sys
+print("Error: something went wrong", flush=True)
+sys.exit(1)
+""" % sys.executable
+
+_SILENT = """#!%s
+import time
+time.sleep(30)
+""" % sys.executable
+
+
+def _binary(tmp_path, source):
+    binary = tmp_path / "ganache"
+    binary.write_text(source)
+    os.chmod(str(binary), 0o755)
+    return str(binary)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_ganache_ready_when_it_answers(tmp_path):
+    # Arrange
+    ganache = Ganache(_free_port(), [], _binary(tmp_path, _NODE))
+
+    # Act
+    ganache.start()
+
+    # Assert
+    assert ganache.process.poll() is None
+    ganache.stop()
+    assert ganache.process.poll() is not None
+
+
+def test_ganache_exits_during_startup(tmp_path):
+    # Arrange
+    ganache = Ganache(_free_port(), [], _binary(tmp_path, _CRASH))
+    begin = time()
+
+    # Act and Assert
+    with pytest.raises(NetworkStartError, match="something went wrong"):
+        ganache.start()
+    assert time() - begin < 10
+    assert ganache.process is None
+
+
+def test_ganache_does_not_answer(tmp_path):
+    # Arrange
+    ganache = Ganache(_free_port(), [], _binary(tmp_path, _SILENT), start_timeout=0.5)
+
+    # Act and Assert
+    with pytest.raises(NetworkStartError):
+        ganache.start()
+    assert ganache.process is None
+
+
+def test_ganache_port_in_use(tmp_path):
+    # Arrange
+    port = _free_port()
+    stale = Ganache(port, [], _binary(tmp_path, _NODE))
+    stale.start()
+    ganache = Ganache(port, [], _binary(tmp_path, _NODE))
+
+    # Act and Assert
+    try:
+        with pytest.raises(NetworkStartError, match="already in use"):
+            ganache.start()
+        assert ganache.process is None
+    finally:
+        stale.stop()
+
+
+def test_hardhat_node_ready_when_it_answers(tmp_path):
+    # Arrange
+    node = HardhatNode([_binary(tmp_path, _NODE)], _free_port(), str(tmp_path))
+
+    # Act
+    node.start()
+
+    # Assert
+    assert node.process.args[1:4] == ["node", "--hostname", "127.0.0.1"]
+    node.stop()
+    assert node.process.poll() is not None
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from eth_vertigo.core import Mutation, MutationResult
+from eth_vertigo.core.journal import CampaignJournal
+from eth_vertigo.mutator.source_file import SourceFile
+
+
+def _mutations(tmp_path: Path):
+    file = tmp_path / "C.sol"
+    file.write_text("contract C { a + b }")
+    source = SourceFile(file)
+    return [Mutation((14, 3, 0), source, value, tmp_path) for value in (" - ", " * ")]
+
+
+def test_resume_from_journal(tmp_path):
+    # Arrange
+    journal_file = tmp_path / "journal.jsonl"
+    journal = CampaignJournal(journal_file)
+    first, _ = _mutations(tmp_path)
+    first.result = MutationResult.KILLED
+    first.crime_scenes = ["C test"]
+    journal.record(first)
+    journal.close()
+    with journal_file.open("a") as f:
+        f.write('{"identity": "trunc')
+
+    # Act
+    mutations = _mutations(tmp_path)
+    restored = CampaignJournal(journal_file).restore(mutations)
+
+    # Assert
+    assert 1 == restored
+    assert MutationResult.KILLED == mutations[0].result
+    assert ["C test"] == mutations[0].crime_scenes
+    assert mutations[1].result is None
+
+
+def test_identity_depends_on_file_content(tmp_path):
+    # Arrange
+    before = _mutations(tmp_path)[0].identity
+
+    # Act
+    file = tmp_path / "C.sol"
+    file.write_text("contract C { a + c }")
+    after = Mutation((14, 3, 0), SourceFile(file), " - ", tmp_path).identity
+
+    # Assert
+    assert before != after
@@ -0,0 +1,254 @@
+import json
+import threading
+from time import sleep, time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import pytest
+
+from eth_vertigo.core.network import DynamicNetworkPool, ProcessStaticNetworkPool, StaticNetworkPool
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _Node:
+    """ Fake network that answers evm_snapshot and evm_revert """
+
+    def __init__(self):
+        self.calls = []
+        self.refuse_revert = False
+        self.down = False
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                node.calls.append(request["method"])
+                if node.down:
+                    self.send_error(503)
+                    return
+                if request["method"] == "evm_snapshot":
+                    result = hex(len(node.calls))
+                else:
+                    result = not node.refuse_revert
+                body = json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result}).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _Server(("127.0.0.1", 0), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+class _Provider:
+    def __init__(self, providers):
+        self.running = False
+        providers.append(self)
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+
+@pytest.fixture
+def node():
+    node = _Node()
+    yield node
+    node.server.shutdown()
+
+
+def test_snapshots_keep_network_running(node):
+    # Arrange
+    providers = []
+    pool = DynamicNetworkPool([("a", node.port)], lambda port: _Provider(providers), snapshots=True)
+
+    # Act
+    for _ in range(3):
+        pool.yield_network(pool.claim())
+
+    # Assert
+    assert len(providers) == 1 and providers[0].running
+    assert node.calls == ["evm_snapshot"] + ["evm_revert", "evm_snapshot", "net_version"] * 3
+
+    pool.close()
+    assert not providers[0].running
+
+
+def test_snapshots_restart_network_that_can_not_revert(node):
+    # Arrange
+    providers = []
+    pool = DynamicNetworkPool([("a", node.port)], lambda port: _Provider(providers), snapshots=True)
+    node.refuse_revert = True
+
+    # Act
+    pool.yield_network(pool.claim())
+    pool.yield_network(pool.claim())
+
+    # Assert
+    assert len(providers) == 2
+    assert not any(provider.running for provider in providers)
+
+
+def test_without_snapshots_networks_restart(node):
+    # Arrange
+    providers = []
+    pool = DynamicNetworkPool([("a", node.port)], lambda port: _Provider(providers))
+
+    # Act
+    pool.yield_network(pool.claim())
+    pool.yield_network(pool.claim())
+
+    # Assert
+    assert len(providers) == 2
+    assert node.calls == []
+
+
+class _SlowProvider(_Provider):
+    def start(self):
+        sleep(0.3)
+        super().start()
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time() + timeout
+    while not condition() and time() < deadline:
+        sleep(0.01)
+
+
+def test_standby_networks_are_started_in_the_background():
+    # Arrange
+    providers = []
+    pool = DynamicNetworkPool([("a", 1), ("b", 2)], lambda port: _SlowProvider(providers), standby=1)
+    _wait_until(lambda: any(provider.running for provider in providers))
+
+    # Act
+    network = pool.claim()
+
+    # Assert
+    assert pool.claim_waits[0] < 0.2
+    _wait_until(lambda: len([provider for provider in providers if provider.running]) == 2)
+    assert len([provider for provider in providers if provider.running]) == 2
+
+    pool.yield_network(network)
+    pool.close()
+    assert not any(provider.running for provider in providers)
+
+
+def test_claim_waits_for_network_that_is_starting():
+    # Arrange
+    providers = []
+    pool = DynamicNetworkPool([("a", 1)], lambda port: _SlowProvider(providers), standby=1)
+
+    # Act
+    network = pool.claim()
+
+    # Assert
+    assert network == "a"
+    assert len(providers) == 1 and providers[0].running
+    with pytest.raises(ValueError):
+        pool.claim()
+
+
+def test_static_network_is_quarantined_while_it_does_not_respond(node):
+    # Arrange
+    pool = StaticNetworkPool(["a", "b"], endpoints={"a": "http://127.0.0.1:{}".format(node.port)})
+    claimed = [pool.claim(), pool.claim()]
+    node.down = True
+
+    # Act
+    for network in claimed:
+        pool.report_failure(network)
+        pool.yield_network(network)
+
+    # Assert
+    assert pool.quarantined_networks == ["a"]
+    assert pool.available_networks == ["b"]
+    assert pool.size == 2
+    assert pool.statistics["a"].failures == 1 and pool.statistics["a"].quarantines == 1
+
+    node.down = False
+    pool.check_health()
+    assert sorted(pool.available_networks) == ["a", "b"] and not pool.quarantined_networks
+    assert pool.statistics["a"].claims == 1 and pool.statistics["a"].latency is not None
+
+
+def test_static_claim_waits_while_a_network_is_quarantined(node):
+    # Arrange
+    pool = StaticNetworkPool(["a", "b"], endpoints={"a": "http://127.0.0.1:{}".format(node.port)})
+    claimed = [pool.claim(), pool.claim()]
+    node.down = True
+    pool.yield_network("a")
+    results = []
+    claimers = [threading.Thread(target=lambda: results.append(pool.claim())) for _ in range(2)]
+
+    # Act
+    for claimer in claimers:
+        claimer.start()
+    sleep(0.2)
+    waiting = not results
+    pool.yield_network("b")
+    sleep(0.2)
+    node.down = False
+    pool.check_health()
+    for claimer in claimers:
+        claimer.join(timeout=5)
+
+    # Assert
+    assert sorted(claimed) == ["a", "b"]
+    assert waiting
+    assert sorted(results) == ["a", "b"]
+
+
+def test_static_claim_fails_when_every_network_is_quarantined(node):
+    # Arrange
+    pool = StaticNetworkPool(["a"], endpoints={"a": "http://127.0.0.1:{}".format(node.port)})
+    network = pool.claim()
+    node.down = True
+
+    # Act
+    pool.yield_network(network)
+
+    # Assert
+    with pytest.raises(ValueError):
+        pool.claim()
+
+
+def test_dynamic_network_that_does_not_respond_is_restarted(node):
+    # Arrange
+    providers = []
+    pool = DynamicNetworkPool([("a", node.port)], lambda port: _Provider(providers), snapshots=True)
+    pool.yield_network(pool.claim())
+    node.down = True
+
+    # Act
+    pool.check_health()
+
+    # Assert
+    assert not providers[0].running
+    node.down = False
+    pool.yield_network(pool.claim())
+    assert len(providers) == 2 and providers[1].running
+    assert pool.statistics["a"].claims == 2 and pool.statistics["a"].quarantines == 1
+
+
+def test_process_claim_wait_follows_test_timeout():
+    # Arrange
+    pool = ProcessStaticNetworkPool(["a"])
+    pool.limit_claim_wait(0.1)
+    short_wait = pool.claim_timeout
+
+    # Act
+    pool.limit_claim_wait(60)
+
+    # Assert
+    assert short_wait == 5
+    assert pool.claim_timeout == 60
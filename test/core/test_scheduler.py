@@ -0,0 +1,84 @@
+from pathlib import Path
+
+from eth_vertigo.core import Mutation
+from eth_vertigo.core.scheduler import CostAwareScheduler, CostModel
+from eth_vertigo.incremental.store import IncrementalMutationStore, MutationRecord
+from eth_vertigo.mutator.source_file import SourceFile
+
+
+class _FixedCosts(CostModel):
+    def __init__(self, costs):
+        super().__init__(0)
+        self.costs = costs
+
+    def predict(self, mutation):
+        return self.costs[mutation.value]
+
+
+def _mutation(tmp_path: Path, file_name: str, value: str) -> Mutation:
+    file = tmp_path / file_name
+    file.write_text("contract C { a + b }")
+    return Mutation((14, 3, 0), SourceFile(file), value, tmp_path)
+
+
+def test_schedule_longest_first(tmp_path):
+    # Arrange
+    costs = {"a": 2, "b": 3, "c": 2, "d": 3, "e": 2}
+    mutations = [_mutation(tmp_path, "C.sol", value) for value in costs]
+    scheduler = CostAwareScheduler(_FixedCosts(costs))
+
+    # Act
+    schedule = scheduler.schedule(mutations, 2)
+
+    # Assert
+    assert [m.value for m in schedule.mutations] == ["b", "d", "a", "c", "e"]
+    assert schedule.expected_makespan == 7
+
+
+def test_cost_model_uses_history(tmp_path):
+    # Arrange
+    store = IncrementalMutationStore()
+    store.file_durations = {"Slow.sol": 10.0}
+    record = MutationRecord()
+    record.source_file_name = "Slow.sol"
+    record.original_text = " + "
+    record.new_text = " - "
+    record.line_number = 0
+    record.duration = 1.0
+    store.known_mutations = [record]
+    model = CostModel(4.0, store)
+
+    # Act
+    known = model.predict(_mutation(tmp_path, "Slow.sol", " - "))
+    same_file = model.predict(_mutation(tmp_path, "Slow.sol", " * "))
+    other_file = model.predict(_mutation(tmp_path, "Fast.sol", " - "))
+
+    # Assert
+    assert known == 1.0
+    assert same_file == 10.0
+    assert other_file == 4.0
+
+
+def test_cost_model_weighs_kill_rate(tmp_path):
+    # Arrange
+    store = IncrementalMutationStore()
+    store.file_kill_rates = {"Killed.sol": 0.75, "Lived.sol": 0.0}
+    record = MutationRecord()
+    record.source_file_name = "Killed.sol"
+    record.original_text = " + "
+    record.new_text = " - "
+    record.line_number = 0
+    record.duration = 2.0
+    store.known_mutations = [record]
+    model = CostModel(10.0, store)
+    likely_killed = _mutation(tmp_path, "Killed.sol", " * ")
+    likely_lived = _mutation(tmp_path, "Lived.sol", " * ")
+
+    # Act
+    cost = model.predict(likely_killed)
+    schedule = CostAwareScheduler(model).schedule([likely_killed, likely_lived], 1)
+
+    # Assert
+    assert cost == 0.75 * 2.0 + 0.25 * 10.0
+    assert model.kill_probability(likely_killed) == 0.75
+    assert schedule.mutations == [likely_lived, likely_killed]
@@ -0,0 +1,33 @@
+from eth_vertigo.core.timeout import TimeoutPolicy
+from eth_vertigo.test_runner.test_result import TestResult
+
+BASELINE = {
+    "fast": TestResult("fast", "fast", 1000, True),
+    "slow": TestResult("slow", "slow", 5000, True),
+}
+
+
+def test_timeout_of_selected_tests():
+    # Arrange
+    policy = TimeoutPolicy(multiplier=2, floor=1)
+
+    # Act
+    all_tests = policy.timeout(10, BASELINE)
+    fast_only = policy.timeout(10, BASELINE, ["fast"])
+    unknown = policy.timeout(10, BASELINE, ["fast", "new"])
+
+    # Assert
+    assert 20 == all_tests
+    assert 10 == fast_only
+    assert 20 == unknown
+
+
+def test_timeout_floor():
+    # Arrange
+    policy = TimeoutPolicy(multiplier=2, floor=3)
+
+    # Act
+    timeout = policy.timeout(0.4, {})
+
+    # Assert
+    assert 3 == timeout
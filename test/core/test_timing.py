@@ -0,0 +1,76 @@
+import json
+import sys
+
+from eth_vertigo.core.timing import phase, PhaseStatistics, TEST_COMMAND, PARSE_OUTPUT, COMPILE
+from eth_vertigo.interfaces.common.tester import MochaStdoutTester
+
+_SCRIPT = """
+import json
+print(json.dumps({"failures": [], "passes": [{"title": "a", "fullTitle": "C a", "duration": 1}]}))
+"""
+
+
+def test_phase_accumulates():
+    # Arrange
+    timings = {}
+
+    # Act
+    with phase(timings, COMPILE):
+        pass
+    first = timings[COMPILE]
+    with phase(timings, COMPILE):
+        pass
+
+    # Assert
+    assert timings[COMPILE] >= first
+    assert list(timings.keys()) == [COMPILE]
+
+
+def test_phase_without_timings():
+    # Act and Assert
+    with phase(None, COMPILE):
+        pass
+
+
+def test_summary_percentiles():
+    # Arrange
+    statistics = PhaseStatistics()
+    for seconds in range(1, 21):
+        statistics.record({COMPILE: float(seconds)})
+
+    # Act
+    summary = statistics.summary()
+
+    # Assert
+    assert summary[COMPILE] == {"count": 20, "total": 210.0, "p50": 10.0, "p95": 19.0}
+
+
+def test_exports():
+    # Arrange
+    statistics = PhaseStatistics()
+    statistics.record({TEST_COMMAND: 2.0, COMPILE: 1.0})
+
+    # Act
+    exported = json.loads(statistics.to_json())
+    prometheus = statistics.to_prometheus()
+
+    # Assert
+    assert list(exported["phases"].keys()) == [COMPILE, TEST_COMMAND]
+    assert "# TYPE vertigo_phase_seconds summary" in prometheus
+    assert 'vertigo_phase_seconds{phase="test_command",quantile="0.95"} 2.0' in prometheus
+    assert 'vertigo_phase_seconds_count{phase="compile"} 1' in prometheus
+
+
+def test_test_command_timed(tmp_path):
+    # Arrange
+    timings = {}
+
+    # Act
+    result = MochaStdoutTester.run_test_command(
+        [sys.executable, "-c", _SCRIPT], str(tmp_path), timeout=20, timings=timings
+    )
+
+    # Assert
+    assert result["C a"].success
+    assert set(timings.keys()) == {TEST_COMMAND, PARSE_OUTPUT}
+    assert timings[TEST_COMMAND] > 0
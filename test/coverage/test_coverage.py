@@ -0,0 +1,67 @@
+from pathlib import Path
+
+from eth_vertigo.core import Mutation
+from eth_vertigo.coverage import CoverageIndex, CoverageInstrumentation
+from eth_vertigo.mutator.source_file import SourceFile
+
+SOURCE = "contract C {\n    function f() public {\n        x = 1;\n        y = 2;\n    }\n}\n"
+
+
+def _src(fragment: str) -> str:
+    return "{}:{}:0".format(SOURCE.index(fragment), len(fragment))
+
+
+AST = {
+    "nodeType": "SourceUnit", "src": "0:{}:0".format(len(SOURCE)),
+    "nodes": [{
+        "nodeType": "ContractDefinition", "id": 3, "contractKind": "contract",
+        "src": "0:{}:0".format(len(SOURCE) - 1),
+        "nodes": [{
+            "nodeType": "FunctionDefinition",
+            "body": {"nodeType": "Block", "src": _src("{\n        x"), "statements": [
+                {"nodeType": "ExpressionStatement", "src": _src("x = 1;")},
+                {"nodeType": "ExpressionStatement", "src": _src("y = 2;")},
+            ]},
+        }],
+    }],
+}
+
+
+def test_instrument_inserts_probes():
+    # Arrange
+    instrumentation = CoverageInstrumentation()
+
+    # Act
+    instrumentation.instrument("contracts/C.sol", AST, SOURCE)
+
+    # Assert
+    instrumented = instrumentation.sources["contracts/C.sol"]
+    assert '__vertigoProbe3("__vertigo_probe:1"); x = 1;' in instrumented
+    assert '__vertigoProbe3("__vertigo_probe:2"); y = 2;' in instrumented
+    assert "function __vertigoProbe3(" in instrumented
+    assert [(1, SOURCE.index("x = 1;")), (2, SOURCE.index("y = 2;"))] == \
+        [probe[:2] for probe in instrumentation.probes["contracts/C.sol"]]
+
+
+def test_covering_tests(tmp_path):
+    # Arrange
+    (tmp_path / "contracts").mkdir()
+    file = tmp_path / "contracts" / "C.sol"
+    file.write_text(SOURCE)
+    instrumentation = CoverageInstrumentation()
+    instrumentation.instrument("contracts/C.sol", AST, SOURCE)
+    report = {"tests": {"first": [1], "second": [1, 2]}, "global": [], "passes": ["first", "second"]}
+    index = CoverageIndex.from_report(instrumentation, report, ["first", "second", "failing"])
+
+    def mutation(fragment):
+        return Mutation((SOURCE.index(fragment), 1, 0), SourceFile(file), "3", tmp_path)
+
+    # Act
+    covering_x = index.covering_tests(mutation("1;"))
+    covering_y = index.covering_tests(mutation("2;"))
+    outside = index.covering_tests(mutation("f()"))
+
+    # Assert
+    assert ["failing", "first", "second"] == covering_x
+    assert ["failing", "second"] == covering_y
+    assert outside is None
@@ -0,0 +1,115 @@
+import threading
+from pathlib import Path
+
+from eth_vertigo.core import Mutation, MutationResult
+from eth_vertigo.core.campaign import Campaign, EVALUATION_ATTEMPTS
+from eth_vertigo.distributed import Coordinator, Worker
+from eth_vertigo.distributed.protocol import LEASE_PATH
+from eth_vertigo.mutator.source_file import SourceFile
+
+
+class _Campaign(Campaign):
+    def __init__(self, project_directory: Path):
+        super().__init__()
+        self.project_directory = project_directory
+        self.mutations = _mutations(project_directory)
+        self.tested = []
+
+    def test_mutation(self, mutation, done_callback):
+        self.tested.append(mutation.value)
+        mutation.result = MutationResult.KILLED if mutation.value.startswith("k") else MutationResult.LIVED
+        done_callback()
+
+
+def _mutations(tmp_path: Path):
+    file = tmp_path / "C.sol"
+    file.write_text("contract C { a + b }")
+    return [Mutation((14, 3, 0), SourceFile(file), value, tmp_path) for value in ("k1", "l2", "k3", "l4", "k5")]
+
+
+def test_workers_on_localhost(tmp_path):
+    # Arrange
+    mutations = _mutations(tmp_path)
+    coordinator = Coordinator(mutations, "127.0.0.1", 0, lease_timeout=0.5)
+    url = "http://127.0.0.1:{}".format(coordinator.address[1])
+    streamed = []
+    collector = threading.Thread(target=lambda: streamed.extend(coordinator.stream()))
+    collector.start()
+
+    # A worker that disappears after leasing a mutation
+    Worker(url, _Campaign(tmp_path))._request(LEASE_PATH, {})
+
+    campaigns = [_Campaign(tmp_path), _Campaign(tmp_path)]
+    workers = [Worker(url, campaign, poll_interval=0.1) for campaign in campaigns]
+
+    # Act
+    threads = [threading.Thread(target=worker.run) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    collector.join()
+
+    # Assert
+    assert 5 == len(streamed)
+    assert sorted(m.value for m in mutations) == sorted(sum((c.tested for c in campaigns), []))
+    for mutation in mutations:
+        expected = MutationResult.KILLED if mutation.value.startswith("k") else MutationResult.LIVED
+        assert expected == mutation.result
+
+
+def test_unknown_work_items_are_not_applied(tmp_path):
+    # Arrange
+    campaign = _Campaign(tmp_path)
+    file = tmp_path / "C.sol"
+    foreign = Mutation((0, 8, 0), SourceFile(file), "selfdestruct", tmp_path)
+    coordinator = Coordinator([foreign], "127.0.0.1", 0)
+    collector = []
+    thread = threading.Thread(target=lambda: collector.extend(coordinator.stream()))
+    thread.start()
+    content = file.read_text()
+
+    # Act
+    evaluated = Worker("http://127.0.0.1:{}".format(coordinator.address[1]), campaign, poll_interval=0.1).run()
+    thread.join()
+
+    # Assert
+    assert 0 == evaluated
+    assert [] == campaign.tested
+    assert MutationResult.ERROR == foreign.result
+    assert content == file.read_text()
+
+
+def test_unevaluated_mutations_are_handed_out_again(tmp_path):
+    # Arrange
+    mutation = _mutations(tmp_path)[0]
+    coordinator = Coordinator([mutation], "127.0.0.1", 0)
+    record = {"identity": mutation.identity, "result": None, "crime_scenes": [], "duration": None, "timings": {}}
+
+    # Act
+    attempts = []
+    for _ in range(EVALUATION_ATTEMPTS):
+        item = coordinator.lease("worker")["item"]
+        attempts.append(coordinator.complete("worker", dict(record, identity=item["identity"]))["accepted"])
+
+    # Assert
+    assert attempts == [False] * (EVALUATION_ATTEMPTS - 1) + [True]
+    assert mutation.result is None
+    assert coordinator.results.get_nowait() is mutation
+    assert coordinator.lease("worker") == {"item": None, "done": True}
+
+
+def test_only_lease_owner_can_give_back_mutation(tmp_path):
+    # Arrange
+    mutation = _mutations(tmp_path)[0]
+    coordinator = Coordinator([mutation], "127.0.0.1", 0)
+    record = {"identity": mutation.identity, "result": None, "crime_scenes": [], "duration": None, "timings": {}}
+    coordinator.lease("owner")
+
+    # Act
+    accepted = coordinator.complete("other", record)["accepted"]
+
+    # Assert
+    assert not accepted
+    assert coordinator.leases[mutation.identity][0] == "owner"
+    assert coordinator.lease("other") == {"item": None, "done": False}
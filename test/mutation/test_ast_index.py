@@ -0,0 +1,47 @@
+from eth_vertigo.mutator.solidity.ast_index import AstIndex
+
+
+def _binary(operator, start):
+    return {
+        "nodeType": "BinaryOperation",
+        "operator": operator,
+        "leftExpression": {"nodeType": "Identifier", "src": "{}:1:0".format(start)},
+        "rightExpression": {"nodeType": "Identifier", "src": "{}:1:0".format(start + 4)},
+        "src": "{}:5:0".format(start)
+    }
+
+
+def test_nodes_in_document_order():
+    # Arrange
+    inner = _binary("*", 10)
+    outer = dict(_binary("+", 0), leftExpression=inner)
+    ast = {
+        "nodeType": "SourceUnit",
+        "nodes": [
+            {"nodeType": "Return", "expression": outer},
+            {"nodeType": "Return", "expression": _binary("-", 20)},
+        ]
+    }
+
+    # Act
+    index = AstIndex(ast)
+
+    # Assert
+    assert [node["operator"] for node in index.find("BinaryOperation")] == ["+", "*", "-"]
+    assert len(index.find("Identifier")) == 5
+    assert index.find("SourceUnit") == []
+    assert index.find("Assignment") == []
+
+
+def test_legacy_type_key():
+    # Arrange
+    ast = {"name": "SourceUnit", "children": [
+        {"name": "Assignment", "attributes": {"operator": "+="}, "children": []},
+        {"name": "Assignment", "attributes": {"operator": "="}, "children": []},
+    ]}
+
+    # Act
+    index = AstIndex(ast, type_key="name")
+
+    # Assert
+    assert [node["attributes"]["operator"] for node in index.find("Assignment")] == ["+=", "="]
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+from eth_vertigo.core.mutation import Mutation
+from eth_vertigo.mutator.source_file import SourceFile
+from eth_vertigo.mutator.schemata import MutantSchemata
+
+SOURCE = "contract C {\n    function f(uint a, uint b) public {\n        x = a + b * 2;\n        g();\n    }\n}\n"
+
+
+def _src(fragment: str, length: int = None) -> str:
+    return "{}:{}:0".format(SOURCE.index(fragment), len(fragment) if length is None else length)
+
+
+def _source_file(tmp_path: Path) -> SourceFile:
+    file = tmp_path / "C.sol"
+    file.write_text(SOURCE, "utf-8")
+    source = SourceFile(file)
+    multiplication = {
+        "nodeType": "BinaryOperation", "operator": "*", "src": _src("b * 2"),
+        "typeDescriptions": {"typeString": "uint256"},
+        "leftExpression": {"nodeType": "Identifier", "src": _src("b * 2", 1)},
+        "rightExpression": {"nodeType": "Literal", "src": _src("2;", 1)},
+    }
+    addition = {
+        "nodeType": "BinaryOperation", "operator": "+", "src": _src("a + b * 2"),
+        "typeDescriptions": {"typeString": "uint256"},
+        "leftExpression": {"nodeType": "Identifier", "src": _src("a + b", 1)},
+        "rightExpression": multiplication,
+    }
+    call = {"nodeType": "FunctionCall", "src": _src("g()")}
+    source.ast = {
+        "nodeType": "SourceUnit", "src": "0:{}:0".format(len(SOURCE)),
+        "nodes": [{
+            "nodeType": "ContractDefinition", "id": 7, "contractKind": "contract",
+            "src": "0:{}:0".format(len(SOURCE) - 1),
+            "nodes": [{
+                "nodeType": "FunctionDefinition",
+                "body": {"nodeType": "Block", "statements": [
+                    {"nodeType": "ExpressionStatement", "expression": addition},
+                    {"nodeType": "ExpressionStatement", "expression": call},
+                ]},
+            }],
+        }],
+    }
+    return source
+
+
+def _location(fragment: str, length: int):
+    return SOURCE.index(fragment), length, 0
+
+
+def test_schemata_guards_nested_mutations(tmp_path):
+    # Arrange
+    source = _source_file(tmp_path)
+    addition = Mutation(_location(" + ", 3), source, " - ", tmp_path)
+    multiplication = Mutation(_location(" * ", 3), source, " / ", tmp_path)
+    void_call = Mutation(_location("g()", 4), source, "", tmp_path)
+    unsupported = Mutation(_location("public", 6), source, "private", tmp_path)
+
+    # Act
+    schemata = MutantSchemata.build([addition, multiplication, void_call, unsupported])
+
+    # Assert
+    assert (addition.schema_id, multiplication.schema_id, void_call.schema_id) == (1, 2, 3)
+    assert unsupported.schema_id is None
+    assert schemata.mutation_count == 3
+
+    schematized = schemata.sources["C.sol"]
+    assert "x = (__vertigoSwitch7() == 1 ? (a - (__vertigoSwitch7() == 2 ? (b / 2) : (b * 2))) : " \
+           "(a + (__vertigoSwitch7() == 2 ? (b / 2) : (b * 2))));" in schematized
+    assert "{ if (__vertigoSwitch7() == 3) {  } else { g(); } }" in schematized
+    assert "function __vertigoSwitch7() internal pure returns (uint256)" in schematized
+    assert schematized.rstrip().endswith("}")
+
+
+def test_discard_resets_schema_ids(tmp_path):
+    # Arrange
+    source = _source_file(tmp_path)
+    mutation = Mutation(_location(" + ", 3), source, " - ", tmp_path)
+    schemata = MutantSchemata.build([mutation])
+
+    # Act
+    schemata.discard("C.sol")
+
+    # Assert
+    assert mutation.schema_id is None
+    assert not schemata.covers("C.sol")
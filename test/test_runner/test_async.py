@@ -0,0 +1,70 @@
+import asyncio
+import json
+import sys
+from time import time
+
+import pytest
+
+from eth_vertigo.interfaces.common.tester import MochaStdoutTester
+from eth_vertigo.test_runner.exceptions import TimedOut
+
+_STREAM_SCRIPT = """
+import json, sys, time
+print(json.dumps(["pass", {"title": "a", "fullTitle": "C a", "duration": 1}]))
+print(json.dumps(["fail", {"title": "b", "fullTitle": "C b", "duration": 2}]))
+sys.stdout.flush()
+time.sleep(30)
+"""
+
+_JSON_OUTPUT = {
+    "failures": [],
+    "passes": [{"title": "a", "fullTitle": "C a", "duration": 1}],
+}
+
+
+def _run(coroutine):
+    """ Runs the coroutine on a new event loop, asyncio.run is not available before python 3.7 """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def test_async_test_command(tmp_path):
+    # Arrange
+    command = [sys.executable, "-c", "print('Compiling'); print(%r)" % json.dumps(_JSON_OUTPUT)]
+
+    # Act
+    result = _run(MochaStdoutTester.run_test_command_async(command, str(tmp_path), timeout=20))
+
+    # Assert
+    assert ["C a"] == list(result.keys())
+    assert result["C a"].success
+
+
+def test_async_test_command_bail(tmp_path):
+    # Arrange
+    command = [sys.executable, "-c", _STREAM_SCRIPT]
+    begin = time()
+
+    # Act
+    result = _run(MochaStdoutTester.run_test_command_async(command, str(tmp_path), timeout=20, bail=True))
+
+    # Assert
+    assert time() - begin < 10
+    assert result["C a"].success
+    assert not result["C b"].success
+
+
+def test_async_test_command_timeout(tmp_path):
+    # Arrange
+    command = [sys.executable, "-c", "import time; time.sleep(30)"]
+    begin = time()
+
+    # Act and Assert
+    with pytest.raises(TimedOut):
+        _run(MochaStdoutTester.run_test_command_async(command, str(tmp_path), timeout=0.5))
+    assert time() - begin < 10
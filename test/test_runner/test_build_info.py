@@ -0,0 +1,67 @@
+import json
+
+from eth_vertigo.core.network import StaticNetworkPool
+from eth_vertigo.interfaces.hardhat import HardhatCampaign
+from eth_vertigo.interfaces.hardhat import build_info
+
+
+def _source_unit(source_name: str, file_index: int):
+    return {"id": file_index, "ast": {
+        "absolutePath": source_name, "nodeType": "SourceUnit", "src": "0:0:{}".format(file_index), "nodes": []
+    }}
+
+
+def _create_artifacts(directory, contracts):
+    """ Writes hardhat artifacts of one compilation job with the given contracts by source name """
+    artifacts = directory / "artifacts"
+    (artifacts / "build-info").mkdir(parents=True)
+    sources = {source_name: _source_unit(source_name, index) for index, source_name in enumerate(contracts)}
+    (artifacts / "build-info" / "job.json").write_text(json.dumps({
+        "input": {"sources": {name: {"content": ""} for name in contracts}},
+        "output": {"sources": sources, "contracts": {}}
+    }))
+
+    for source_name, names in contracts.items():
+        contract_dir = artifacts / source_name
+        contract_dir.mkdir(parents=True)
+        for name in names:
+            (contract_dir / "{}.json".format(name)).write_text(json.dumps({"sourceName": source_name}))
+            dbg = {"buildInfo": "../../build-info/job.json"}
+            (contract_dir / "{}.dbg.json".format(name)).write_text(json.dumps(dbg))
+
+
+def test_sources_deduplicated_by_source_name(tmp_path, monkeypatch):
+    # Arrange
+    _create_artifacts(tmp_path, {
+        "contracts/Token.sol": ["Token", "IToken", "TokenLib"],
+        "contracts/Vault.sol": ["Vault"]
+    })
+    reads = []
+    read_source_asts = build_info._read_source_asts
+
+    def counting_read(build_info_file):
+        reads.append(build_info_file)
+        return read_source_asts(build_info_file)
+
+    monkeypatch.setattr(build_info, "_read_source_asts", counting_read)
+
+    # Act
+    campaign = HardhatCampaign(["npx", "hardhat"], tmp_path, [], StaticNetworkPool(["hardhat_0"]))
+
+    # Assert
+    assert sorted(source.file.name for source in campaign.sources) == ["Token.sol", "Vault.sol"]
+    assert len(reads) == 1
+
+
+def test_build_info_source_asts(tmp_path):
+    # Arrange
+    _create_artifacts(tmp_path, {"contracts/Token.sol": ["Token"]})
+    cache = build_info.BuildInfoCache()
+
+    # Act
+    first = cache.source_asts(tmp_path / "artifacts" / "contracts" / ".." / "build-info" / "job.json")
+    second = cache.source_asts(tmp_path / "artifacts" / "build-info" / "job.json")
+
+    # Assert
+    assert first is second
+    assert first["contracts/Token.sol"]["absolutePath"] == "contracts/Token.sol"
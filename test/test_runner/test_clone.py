@@ -0,0 +1,66 @@
+import os
+from pathlib import Path
+
+from eth_vertigo.interfaces.common.clone import ProjectCloner, HardlinkBackend, SymlinkBackend
+from eth_vertigo.interfaces.common.sandbox import make_temp_directory, rm_temp_directory
+
+
+def _project(tmp_path: Path) -> Path:
+    project = tmp_path / "project"
+    (project / "contracts").mkdir(parents=True)
+    (project / "contracts" / "C.sol").write_text("contract C {}")
+    (project / "node_modules" / "pkg").mkdir(parents=True)
+    (project / "node_modules" / "pkg" / "index.js").write_text("module.exports = 1;")
+    (project / "truffle.js").write_text("module.exports = {};")
+    return project
+
+
+def test_hardlink_backend_links_dependencies(tmp_path):
+    # Arrange
+    project = _project(tmp_path)
+    target = tmp_path / "clone"
+    target.mkdir()
+
+    # Act
+    ProjectCloner(HardlinkBackend()).clone(str(project), str(target))
+
+    # Assert
+    original_module = project / "node_modules" / "pkg" / "index.js"
+    cloned_module = target / "node_modules" / "pkg" / "index.js"
+    assert os.stat(str(original_module)).st_ino == os.stat(str(cloned_module)).st_ino
+
+    # Contracts are copied, such that mutations don't leak into the original project
+    (target / "contracts" / "C.sol").write_text("mutated")
+    assert "contract C {}" == (project / "contracts" / "C.sol").read_text()
+    assert "module.exports = {};" == (target / "truffle.js").read_text()
+
+
+def test_symlink_backend_links_dependency_directories(tmp_path):
+    # Arrange
+    project = _project(tmp_path)
+    target = tmp_path / "clone"
+    target.mkdir()
+
+    # Act
+    ProjectCloner(SymlinkBackend()).clone(str(project), str(target))
+
+    # Assert
+    assert (target / "node_modules").is_symlink()
+    assert "module.exports = 1;" == (target / "node_modules" / "pkg" / "index.js").read_text()
+    assert not (target / "contracts").is_symlink()
+
+
+def test_sandbox_for_hardlinks_is_created_next_to_project(tmp_path):
+    # Arrange
+    project = _project(tmp_path)
+
+    # Act
+    sandbox = Path(make_temp_directory(str(project), ProjectCloner(HardlinkBackend())))
+
+    # Assert
+    try:
+        assert sandbox.parent == project.parent
+        assert os.stat(str(project / "node_modules" / "pkg" / "index.js")).st_ino == \
+            os.stat(str(sandbox / "node_modules" / "pkg" / "index.js")).st_ino
+    finally:
+        rm_temp_directory(str(sandbox))
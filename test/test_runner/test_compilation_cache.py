@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+
+from eth_vertigo.interfaces.common.compilation_cache import CompilationCache, project_fingerprint
+
+
+def _build(directory: Path, content: str) -> Path:
+    (directory / "build" / "contracts").mkdir(parents=True)
+    (directory / "build" / "contracts" / "C.json").write_text(content)
+    return directory
+
+
+def test_cache_round_trip(tmp_path):
+    # Arrange
+    cache = CompilationCache(tmp_path / "cache")
+    source = _build(tmp_path / "source", "compiled")
+    target = _build(tmp_path / "target", "stale")
+    key = CompilationCache.key("settings", "contracts/C.sol", b"contract C {}")
+
+    # Act
+    missing = cache.get(key, str(target), ["build"])
+    cache.put(key, str(source), ["build"], {"C": "0x00"})
+    bytecodes = cache.get(key, str(target), ["build"])
+
+    # Assert
+    assert missing is None
+    assert {"C": "0x00"} == bytecodes
+    assert "compiled" == (target / "build" / "contracts" / "C.json").read_text()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_key_depends_on_content():
+    assert CompilationCache.key("s", "C.sol", b"a") != CompilationCache.key("s", "C.sol", b"b")
+    assert CompilationCache.key("s", "C.sol", b"a") != CompilationCache.key("t", "C.sol", b"a")
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    # Arrange
+    source = _build(tmp_path / "source", "x" * 1000)
+    cache = CompilationCache(tmp_path / "cache", max_size=2500)
+    keys = [CompilationCache.key("settings", "C.sol", bytes([i])) for i in range(3)]
+
+    cache.put(keys[0], str(source), ["build"], {})
+    cache.put(keys[1], str(source), ["build"], {})
+    old = 1000000000
+    os.utime(str(tmp_path / "cache" / keys[0][:2] / keys[0] / "meta.json"), (old, old))
+
+    # Act
+    cache.put(keys[2], str(source), ["build"], {})
+
+    # Assert
+    assert not (tmp_path / "cache" / keys[0][:2] / keys[0]).exists()
+    assert (tmp_path / "cache" / keys[2][:2] / keys[2]).exists()
+
+
+def test_project_fingerprint_tracks_sources(tmp_path):
+    # Arrange
+    (tmp_path / "contracts").mkdir()
+    (tmp_path / "node_modules").mkdir()
+    contract = tmp_path / "contracts" / "C.sol"
+    contract.write_text("contract C {}")
+    before = project_fingerprint(str(tmp_path))
+
+    # Act
+    (tmp_path / "node_modules" / "D.sol").write_text("contract D {}")
+    unchanged = project_fingerprint(str(tmp_path))
+    contract.write_text("contract C { }")
+    changed = project_fingerprint(str(tmp_path))
+
+    # Assert
+    assert before == unchanged
+    assert before != changed
@@ -0,0 +1,66 @@
+import sys
+
+import pytest
+
+from eth_vertigo.interfaces.common.daemon import TestDaemon, DAEMON_MARKER
+from eth_vertigo.test_runner.exceptions import TestRunException, TimedOut
+
+_DAEMON = """
+import json, os, re, sys, time
+def emit(event, data):
+    print("%s" + json.dumps([event, data]), flush=True)
+emit("ready", {})
+for line in sys.stdin:
+    request = json.loads(line)
+    print("some test output", flush=True)
+    if request["environment"].get("CRASH"):
+        sys.exit(1)
+    if request["environment"].get("HANG"):
+        time.sleep(30)
+    for title, success in (("a", True), ("b", request["compile"])):
+        if request["grep"] and not re.search(request["grep"], "C " + title):
+            continue
+        emit("pass" if success else "fail", {"title": title, "fullTitle": "C " + title, "duration": os.getpid()})
+    emit("end", {})
+""" % DAEMON_MARKER
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    daemon = TestDaemon([sys.executable, "-c", _DAEMON], str(tmp_path))
+    daemon.start(timeout=20)
+    yield daemon
+    daemon.stop()
+
+
+def test_daemon_runs_tests_repeatedly(daemon):
+    # Act
+    first = daemon.run(compile=True, timeout=20)
+    second = daemon.run(compile=False, timeout=20)
+
+    # Assert
+    assert all(test.success for test in first.values())
+    assert not second["C b"].success
+    assert first["C a"].duration == second["C a"].duration
+
+
+def test_daemon_grep(daemon):
+    # Act
+    result = daemon.run(grep="(C\\ a)", timeout=20)
+
+    # Assert
+    assert ["C a"] == list(result.keys())
+
+
+def test_daemon_crash(daemon):
+    # Act and Assert
+    with pytest.raises(TestRunException):
+        daemon.run(environment={"CRASH": "1"}, timeout=20)
+    assert not daemon.alive
+
+
+def test_daemon_timeout(daemon):
+    # Act and Assert
+    with pytest.raises(TimedOut):
+        daemon.run(environment={"HANG": "1"}, timeout=0.5)
+    assert not daemon.alive
@@ -0,0 +1,95 @@
+import json
+import shutil
+
+import pytest
+
+from eth_vertigo.interfaces.hardhat.tester import HardhatTester
+
+_URLS = {"vertigo_0": "http://127.0.0.1:8600", "vertigo_1": "http://127.0.0.1:8601"}
+
+# Stand-ins for hardhat and mocha, the single test reports the value of VERTIGO_TEST_VALUE in its title
+_HARDHAT = """
+module.exports = {
+  run: async (task) => task === "test:get-test-files" ? [] : undefined,
+  artifacts: {}, network: {name: "vertigo_0"}, config: {mocha: {}}
+};
+"""
+_MOCHA = """
+const {EventEmitter} = require("events");
+class Mocha {
+  addFile() {}
+  dispose() {}
+  run(done) {
+    const runner = new EventEmitter();
+    const title = "value " + (process.env.VERTIGO_TEST_VALUE || "unset");
+    setImmediate(() => { runner.emit("pass", {title, fullTitle: () => title, duration: 1}); done(0); });
+    return runner;
+  }
+}
+Mocha.reporters = {Base: function () {}};
+module.exports = Mocha;
+"""
+
+
+def test_standalone_network_selected(tmp_path):
+    # Arrange
+    tester = HardhatTester(["npx", "hardhat"], str(tmp_path), None, network_urls=_URLS)
+
+    # Act
+    standalone = tester.build_test_command("vertigo_1")
+    in_process = tester.build_test_command("hardhat_0")
+
+    # Assert
+    assert standalone == ["npx", "hardhat", "test", "--network", "vertigo_1"]
+    assert in_process == ["npx", "hardhat", "test"]
+
+
+def test_standalone_networks_configured(tmp_path):
+    # Arrange
+    config = tmp_path / "hardhat.config.js"
+    config.write_text("module.exports = {networks: {hardhat: {}}};\n")
+    tester = HardhatTester(["npx", "hardhat"], str(tmp_path), None, network_urls=_URLS)
+
+    # Act
+    tester.instrument_configuration(str(tmp_path), None)
+
+    # Assert
+    content = config.read_text()
+    assert "Object.assign({}, module.exports.networks, " in content
+    assert json.dumps({"url": "http://127.0.0.1:8601"}) in content
+
+
+def test_daemon_bound_to_network(tmp_path):
+    # Arrange
+    tester = HardhatTester(["npx", "hardhat"], str(tmp_path), None, persistent=True, network_urls=_URLS)
+
+    # Act
+    standalone = tester.create_daemon(str(tmp_path), "vertigo_0")
+    in_process = tester.create_daemon(str(tmp_path), "hardhat_0")
+
+    # Assert
+    assert standalone.network == "vertigo_0"
+    assert standalone.environment["HARDHAT_NETWORK"] == "vertigo_0"
+    assert in_process.environment is None
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_daemon_restores_environment_after_run(tmp_path):
+    # Arrange
+    for name, source in (("hardhat", _HARDHAT), ("mocha", _MOCHA)):
+        module = tmp_path / "node_modules" / name
+        module.mkdir(parents=True)
+        (module / "index.js").write_text(source)
+    daemon = HardhatTester(["npx", "hardhat"], str(tmp_path), None, persistent=True).create_daemon(str(tmp_path))
+    daemon.start()
+
+    # Act
+    try:
+        mutant = daemon.run(compile=False, environment={"VERTIGO_TEST_VALUE": "1"}, timeout=20)
+        next_run = daemon.run(compile=False, timeout=20)
+    finally:
+        daemon.stop()
+
+    # Assert
+    assert ["value 1"] == list(mutant.keys())
+    assert ["value unset"] == list(next_run.keys())
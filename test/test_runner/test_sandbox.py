@@ -0,0 +1,98 @@
+from pathlib import Path
+
+from eth_vertigo.core import Mutation
+from eth_vertigo.mutator.source_file import SourceFile
+from eth_vertigo.interfaces.common.sandbox import Sandbox, SandboxPool
+
+
+def _project(tmp_path: Path) -> Path:
+    project = tmp_path / "project"
+    (project / "contracts").mkdir(parents=True)
+    (project / "contracts" / "C.sol").write_text("contract C {}")
+    (project / "truffle.js").write_text("module.exports = {};")
+    (project / "artifacts").mkdir()
+    (project / "artifacts" / "C.json").write_text("{}")
+    return project
+
+
+def test_sandbox_reset_restores_touched_files(tmp_path):
+    # Arrange
+    project = _project(tmp_path)
+    sandbox = Sandbox(str(project), ["artifacts"]).create()
+    mutation = Mutation((1, 1, 0), SourceFile(project / "contracts" / "C.sol"), "X", project)
+    sandbox_root = Path(sandbox.directory)
+
+    try:
+        sandbox.track("truffle.js", "new.js")
+        (sandbox_root / "truffle.js").write_text("changed")
+        (sandbox_root / "new.js").write_text("created")
+        sandbox.apply_mutation(mutation)
+        (sandbox_root / "artifacts" / "C.json").write_text("mutated")
+        (sandbox_root / "artifacts" / "D.json").write_text("new")
+
+        # Act
+        sandbox.reset()
+
+        # Assert
+        assert "contract C {}" == (sandbox_root / "contracts" / "C.sol").read_text()
+        assert "module.exports = {};" == (sandbox_root / "truffle.js").read_text()
+        assert not (sandbox_root / "new.js").exists()
+        assert "{}" == (sandbox_root / "artifacts" / "C.json").read_text()
+        assert not (sandbox_root / "artifacts" / "D.json").exists()
+    finally:
+        sandbox.destroy()
+
+
+def test_sandbox_pool_reuses_sandboxes(tmp_path):
+    # Arrange
+    project = _project(tmp_path)
+    pool = SandboxPool(str(project), 1)
+    pool.create()
+
+    try:
+        # Act
+        first = pool.claim()
+        pool.yield_sandbox(first)
+        second = pool.claim()
+
+        # Assert
+        assert first is second
+        assert Path(second.directory).is_dir()
+    finally:
+        pool.destroy()
+
+    assert first.directory is None
+
+
+def test_sandbox_pool_recreates_committed_state(tmp_path):
+    # Arrange
+    project = _project(tmp_path)
+    pool = SandboxPool(str(project), 1, ["artifacts"])
+    pool.create()
+    sandbox = pool.claim()
+    (Path(sandbox.directory) / "contracts" / "C.sol").write_text("contract C { schematized }")
+    (Path(sandbox.directory) / "artifacts" / "C.json").write_text("schematized")
+    sandbox.commit(["contracts/C.sol"])
+    broken = sandbox.directory
+    reset = sandbox.reset
+    failures = [OSError("reset failed")]
+
+    def failing_reset(restore_build=True):
+        if failures:
+            raise failures.pop()
+        reset(restore_build)
+
+    sandbox.reset = failing_reset
+
+    try:
+        # Act
+        pool.yield_sandbox(sandbox)
+        recreated = pool.claim()
+
+        # Assert
+        root = Path(recreated.directory)
+        assert recreated.directory != broken
+        assert "contract C { schematized }" == (root / "contracts" / "C.sol").read_text()
+        assert "schematized" == (root / "artifacts" / "C.json").read_text()
+    finally:
+        pool.destroy()
@@ -0,0 +1,57 @@
+import stat
+import sys
+from pathlib import Path
+
+from eth_vertigo.core import Mutation
+from eth_vertigo.interfaces.common.solc import SolcEquivalenceChecker, SolcSource
+from eth_vertigo.mutator.source_file import SourceFile
+
+# Stand-in for solc, the bytecode of contract C is its source with the whitespace removed
+FAKE_SOLC = """#!{python}
+import json, sys
+standard_input = json.load(sys.stdin)
+contracts = {{}}
+for target in standard_input["settings"]["outputSelection"]:
+    code = "".join(standard_input["sources"][target]["content"].split()).encode().hex()
+    contracts[target] = {{"C": {{"evm": {{"bytecode": {{"object": code}}}}}}}}
+json.dump({{"contracts": contracts}}, sys.stdout)
+"""
+
+
+def _checker(tmp_path: Path) -> SolcEquivalenceChecker:
+    solc = tmp_path / "solc"
+    solc.write_text(FAKE_SOLC.format(python=sys.executable))
+    solc.chmod(solc.stat().st_mode | stat.S_IEXEC)
+    sources = {"contracts/C.sol": SolcSource("contracts/C.sol", "contract C { a + b }", [], {})}
+    return SolcEquivalenceChecker(str(solc), sources)
+
+
+def _mutation(value: str) -> Mutation:
+    source = SourceFile(Path("contracts/C.sol"))
+    source.ast = {"absolutePath": "contracts/C.sol"}
+    return Mutation((14, 3, 0), source, value, Path("."))
+
+
+def test_solc_equivalence(tmp_path):
+    # Arrange
+    checker = _checker(tmp_path)
+    original_bytecode = {"C": "0x" + "contractC{a+b}".encode().hex()}
+
+    # Act
+    equivalent = checker.check(_mutation("  +"), original_bytecode)
+    not_equivalent = checker.check(_mutation(" - "), original_bytecode)
+
+    # Assert
+    assert equivalent is True
+    assert not_equivalent is False
+
+
+def test_solc_equivalence_declines_when_baseline_differs(tmp_path):
+    # Arrange
+    checker = _checker(tmp_path)
+
+    # Act
+    result = checker.check(_mutation("  +"), {"C": "0x00"})
+
+    # Assert
+    assert result is None
@@ -0,0 +1,53 @@
+import sys
+from time import time
+
+import pytest
+
+from eth_vertigo.interfaces.common.tester import MochaStdoutTester
+from eth_vertigo.test_runner.exceptions import TestRunException
+
+_SCRIPT = """
+import json, sys, time
+print("Compiling your contracts...")
+print(json.dumps(["start", {"total": 3}]))
+print(json.dumps(["pass", {"title": "a", "fullTitle": "C a", "duration": 1}]))
+print(json.dumps(["%s", {"title": "b", "fullTitle": "C b", "duration": 2}]))
+sys.stdout.flush()
+time.sleep(%d)
+print(json.dumps(["end", {}]))
+"""
+
+
+def _command(second: str, sleep: int):
+    return [sys.executable, "-c", _SCRIPT % (second, sleep)]
+
+
+def test_streaming_stops_at_first_failure(tmp_path):
+    # Arrange
+    begin = time()
+
+    # Act
+    result = MochaStdoutTester.run_test_command(_command("fail", 30), str(tmp_path), timeout=20, bail=True)
+
+    # Assert
+    assert time() - begin < 10
+    assert result["C a"].success
+    assert not result["C b"].success
+
+
+def test_streaming_full_run(tmp_path):
+    # Act
+    result = MochaStdoutTester.run_test_command(_command("pass", 0), str(tmp_path), bail=True)
+
+    # Assert
+    assert ["C a", "C b"] == sorted(result.keys())
+    assert all(test.success for test in result.values())
+
+
+def test_streaming_incomplete_output(tmp_path):
+    # Arrange
+    command = [sys.executable, "-c", "print('Error: something went wrong')"]
+
+    # Act and Assert
+    with pytest.raises(TestRunException):
+        MochaStdoutTester.run_test_command(command, str(tmp_path), bail=True)